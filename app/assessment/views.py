@@ -2,7 +2,7 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from core.models import FullAssessment
 from .serializers import FullAssessmentSerializer
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import JWTAuthentication
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 class IsInterviewerOrReadOnly(BasePermission):
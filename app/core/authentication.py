@@ -0,0 +1,72 @@
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.settings import api_settings
+from core import models
+from core.roles import ROLE_CLAIM
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    The user of a verified access token. id, pk, role and is_authenticated come from the token claims;
+    touching any other attribute loads the User row once, and rejects users deleted or deactivated since.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        user_id = uuid.UUID(str(token[api_settings.USER_ID_CLAIM]))
+
+        def load():
+            user = models.User.objects.filter(pk=user_id).first()
+            if user is None or not user.is_active:
+                raise AuthenticationFailed("User not found or inactive.", code='user_not_found')
+            return user
+
+        super().__init__(load)
+        # Written to __dict__ directly: LazyObject would otherwise forward the assignment to the loaded user
+        self.__dict__['id'] = self.__dict__['pk'] = user_id
+        self.__dict__['role'] = token[ROLE_CLAIM]
+
+    def __bool__(self):
+        # IsAuthenticated tests bool(request.user); answering it must not load the row
+        return True
+
+    @property
+    def is_loaded(self):
+        return self._wrapped is not empty
+
+
+def stateless_max_lifetime():
+    return getattr(settings, 'JWT_STATELESS_MAX_TOKEN_LIFETIME', timedelta(minutes=15))
+
+
+def is_stateless_token(validated_token):
+    """
+    Whether a token may authenticate without loading the user: JWT_STATELESS_USER is on, the token carries
+    the role claim, and it lives at most JWT_STATELESS_MAX_TOKEN_LIFETIME, which bounds how long a deleted
+    or deactivated user keeps access.
+    """
+    if not getattr(settings, 'JWT_STATELESS_USER', False) or ROLE_CLAIM not in validated_token:
+        return False
+    issued_at, expires_at = validated_token.get('iat'), validated_token.get('exp')
+    if issued_at is None or expires_at is None:
+        return False
+    return expires_at - issued_at <= stateless_max_lifetime().total_seconds()
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    simplejwt authentication that skips the per-request user SELECT for short-lived tokens carrying the
+    role claim when JWT_STATELESS_USER is on; other tokens load the user as before.
+    """
+
+    def get_user(self, validated_token):
+        if is_stateless_token(validated_token):
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise AuthenticationFailed("Token contained no recognizable user identification", code='token_not_valid')
+            return TokenUser(validated_token)
+        return super().get_user(validated_token)
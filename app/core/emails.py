@@ -0,0 +1,161 @@
+import hashlib
+import json
+from datetime import timedelta
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from sendgrid.helpers.mail import Mail, Personalization, To
+from core import models
+
+SENDGRID_API_URL = 'https://api.sendgrid.com/v3/mail/send'
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
+
+def content_hash(subject, html_content):
+    return hashlib.sha256(f"{subject}\n{html_content}".encode('utf-8')).hexdigest()
+
+
+def send_email(to_email, subject, html_content):
+    """
+    Queue an email in the outbox. Delivery happens in a Celery worker after the transaction commits.
+    Returns None without queueing anything when there is no address.
+    """
+    emails = send_emails([(to_email, subject, html_content)])
+    return emails[0] if emails else None
+
+
+def send_emails(messages):
+    """Queue several (to_email, subject, html_content) emails with one insert and one worker wake-up."""
+    emails = models.OutboundEmail.objects.bulk_create([
+        models.OutboundEmail(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            content_hash=content_hash(subject, html_content),
+        )
+        for to_email, subject, html_content in messages if to_email
+    ])
+    if emails:
+        from core.tasks import drain_email_outbox
+        transaction.on_commit(lambda: drain_email_outbox.delay())
+    return emails
+
+
+class SendGridBackend:
+    """Posts to the SendGrid v3 API over one keep-alive HTTP session per worker process."""
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f"Bearer {settings.EMAIL_HOST_USER}",
+            'Content-Type': 'application/json',
+        })
+        self.timeout = getattr(settings, 'EMAIL_OUTBOX_TIMEOUT', 10)
+
+    def send(self, subject, html_content, recipients):
+        # One personalization per recipient, so recipients don't see each other
+        message = Mail(from_email=settings.DEFAULT_FROM_EMAIL, subject=subject, html_content=html_content)
+        for recipient in recipients:
+            personalization = Personalization()
+            personalization.add_to(To(recipient))
+            message.add_personalization(personalization)
+        response = self.session.post(SENDGRID_API_URL, json=message.get(), timeout=self.timeout)
+        response.raise_for_status()
+
+
+class LocMemBackend:
+    """Keeps sent batches in memory, for tests."""
+    outbox = []
+
+    def send(self, subject, html_content, recipients):
+        self.outbox.append({'subject': subject, 'html_content': html_content, 'recipients': list(recipients)})
+
+
+class FileBackend:
+    """Appends each batch as a JSON line to EMAIL_OUTBOX_FILE_PATH, for local development."""
+
+    def send(self, subject, html_content, recipients):
+        with open(settings.EMAIL_OUTBOX_FILE_PATH, 'a') as outbox_file:
+            outbox_file.write(json.dumps({
+                'subject': subject,
+                'html_content': html_content,
+                'recipients': list(recipients),
+                'sent_at': timezone.now().isoformat(),
+            }) + "\n")
+
+
+_backend = None
+
+
+def get_backend():
+    """Backend configured by EMAIL_OUTBOX_BACKEND, created once per process so its HTTP session is reused."""
+    global _backend
+    backend_path = getattr(settings, 'EMAIL_OUTBOX_BACKEND', 'core.emails.SendGridBackend')
+    if _backend is None or _backend[0] != backend_path:
+        _backend = (backend_path, import_string(backend_path)())
+    return _backend[1]
+
+
+def claim_due_emails(limit):
+    """
+    Mark up to `limit` due emails as sending and return them. Locked rows are skipped so concurrent drains
+    don't send the same email; a claim left by a crashed worker expires after EMAIL_OUTBOX_LEASE seconds.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_LEASE', 600))
+    with transaction.atomic():
+        ids = list(
+            models.OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='sending'), send_after__lte=now)
+            .order_by('send_after')
+            .values_list('id', flat=True)[:limit]
+        )
+        models.OutboundEmail.objects.filter(id__in=ids).update(status='sending', send_after=now + lease)
+    return list(models.OutboundEmail.objects.filter(id__in=ids))
+
+
+def retry_delay(attempts):
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_BACKOFF', 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 6 * 60 * 60))
+
+
+def deliver(emails, backend=None):
+    """Send claimed emails, one request per subject/body, and record the outcome of each. Returns the sent count."""
+    backend = backend or get_backend()
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    groups = {}
+    for email in emails:
+        groups.setdefault(email.content_hash, []).append(email)
+
+    sent = 0
+    for group in groups.values():
+        for start in range(0, len(group), MAX_PERSONALIZATIONS):
+            batch = group[start:start + MAX_PERSONALIZATIONS]
+            now = timezone.now()
+            try:
+                backend.send(batch[0].subject, batch[0].html_content, [email.to_email for email in batch])
+            except Exception as e:
+                print(f"error sending email batch of {len(batch)}: {e}")
+                for email in batch:
+                    email.attempts += 1
+                    email.last_error = str(e)
+                    if email.attempts >= max_attempts:
+                        email.status = 'failed'
+                    else:
+                        email.status = 'pending'
+                        email.send_after = now + retry_delay(email.attempts)
+            else:
+                sent += len(batch)
+                for email in batch:
+                    email.attempts += 1
+                    email.status = 'sent'
+                    email.sent_at = now
+                    email.last_error = ''
+            models.OutboundEmail.objects.bulk_update(
+                batch, ['attempts', 'status', 'send_after', 'sent_at', 'last_error']
+            )
+    return sent
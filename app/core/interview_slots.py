@@ -0,0 +1,284 @@
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import Case, Count, Q, Subquery, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from core import models
+from core.interviewer_capacity import get_available_interviewers, pending_interviews, week_bounds
+
+OPTION_DATE_FORMAT = '%Y-%m-%d %H:%M'
+OPTION_COUNT = 5
+
+
+class SlotUnavailable(Exception):
+    """The requested slot does not exist, is booked, or its day or week is already full."""
+
+
+class SlotBusy(SlotUnavailable):
+    """Concurrent bookings held the locks a booking needs; retrying shortly may succeed."""
+
+
+def slot_length():
+    return timedelta(minutes=getattr(settings, 'INTERVIEW_SLOT_MINUTES', 60))
+
+
+def horizon_days():
+    return getattr(settings, 'INTERVIEW_SLOT_HORIZON_DAYS', 14)
+
+
+def working_slot_starts(interviewer, day):
+    """Start times of the slots that fit in the interviewer's working hours on a day."""
+    length = slot_length()
+    start = timezone.make_aware(datetime.combine(day, interviewer.working_hours_start))
+    end = timezone.make_aware(datetime.combine(day, interviewer.working_hours_end))
+    while start + length <= end:
+        yield start
+        start += length
+
+
+def sync_interview_slots(interviewer, now=None):
+    """
+    Materialize the interviewer's slots for the next INTERVIEW_SLOT_HORIZON_DAYS days and drop free
+    slots that no longer fall in the working hours. Booked slots are kept, and upcoming interviews without
+    a slot are attached to theirs. Returns the number of upcoming slots.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    days = [today + timedelta(days=offset) for offset in range(horizon_days())]
+    starts = [start for day in days for start in working_slot_starts(interviewer, day) if start > now]
+
+    with transaction.atomic():
+        models.InterviewSlot.objects.filter(
+            interviewer=interviewer, appointment__isnull=True, start__gt=now,
+        ).exclude(start__in=starts).delete()
+        models.InterviewSlot.objects.bulk_create(
+            [models.InterviewSlot(interviewer=interviewer, start=start) for start in starts],
+            ignore_conflicts=True,
+        )
+        link_booked_slots(interviewer, now)
+        refresh_availability(interviewer, days)
+    return len(starts)
+
+
+def link_booked_slots(interviewer, now):
+    """
+    Attach upcoming interviews that hold no slot (booked before the calendar existed) to the free slot
+    their appointment date falls in, so that time is not offered again. Returns the number linked.
+    """
+    length = slot_length()
+    unlinked = models.FreelancerInterview.objects.filter(
+        interviewer=interviewer, done=False, appointment__appointment_date__gt=now - length, appointment__slots__isnull=True,
+    ).order_by().values_list('appointment_id', 'appointment__appointment_date').distinct()
+    linked = 0
+    for appointment_id, appointment_date in unlinked:
+        slot = models.InterviewSlot.objects.filter(
+            interviewer=interviewer, appointment__isnull=True, start__lte=appointment_date, start__gt=appointment_date - length,
+        ).values('pk')[:1]
+        try:
+            with transaction.atomic():
+                linked += models.InterviewSlot.objects.filter(pk__in=Subquery(slot)).update(appointment_id=appointment_id)
+        except IntegrityError:
+            pass  # booked into a slot meanwhile
+    return linked
+
+
+def refresh_availability(interviewer, days):
+    """
+    Mark the free slots of the weeks around `days` unavailable on full days and in full weeks, counting
+    pending interviews the way interviewer_capacity does. Two queries.
+    """
+    weeks = sorted({week_bounds(timezone.make_aware(datetime.combine(day, datetime.min.time())))[0] for day in days})
+    start, end = weeks[0], weeks[-1] + timedelta(days=7)
+    slots = models.InterviewSlot.objects.filter(interviewer=interviewer, start__gte=start, start__lt=end)
+
+    booked_per_day = dict(
+        models.FreelancerInterview.objects.filter(pending_interviews(start, end), interviewer=interviewer)
+        .annotate(day=TruncDate('appointment__appointment_date'))
+        .values('day').annotate(count=Count('id')).values_list('day', 'count')
+    )
+    booked_per_week = {}
+    for day, count in booked_per_day.items():
+        week = day - timedelta(days=day.weekday())
+        booked_per_week[week] = booked_per_week.get(week, 0) + count
+    full_days = [day for day, count in booked_per_day.items() if count >= interviewer.max_interviews_per_day]
+    full = Q(start__date__in=full_days)
+    for week, count in booked_per_week.items():
+        if count >= interviewer.interviews_per_week:
+            full |= Q(start__date__gte=week, start__date__lt=week + timedelta(days=7))
+
+    slots.filter(appointment__isnull=True).update(available=Case(When(full, then=Value(False)), default=Value(True)))
+
+
+def next_free_slots(interviewers, count=5, now=None):
+    """The earliest `count` free slots of a pool of interviewers, from one range scan of the free-slot index."""
+    now = now or timezone.now()
+    return list(
+        models.InterviewSlot.objects.filter(
+            interviewer__in=interviewers, appointment__isnull=True, available=True, start__gt=now,
+        ).order_by('start', 'interviewer_id')[:count]
+    )
+
+
+def appointment_date_options(interviewers, count=OPTION_COUNT):
+    """Appointment date options for a pool, as stored in Appointment.appointment_date_options."""
+    interviewers = list(interviewers)
+    slots = next_free_slots(interviewers, count)
+    if len(slots) < count and interviewers:
+        # Interviewers created since the nightly sync have no calendar yet
+        with_slots = set(models.InterviewSlot.objects.filter(
+            interviewer__in=interviewers, start__gt=timezone.now(),
+        ).values_list('interviewer_id', flat=True).distinct())
+        missing = [interviewer for interviewer in interviewers if interviewer.pk not in with_slots]
+        for interviewer in missing:
+            sync_interview_slots(interviewer)
+        if missing:
+            slots = next_free_slots(interviewers, count)
+    return [
+        {'interviewer_id': str(slot.interviewer_id), 'date': timezone.localtime(slot.start).strftime(OPTION_DATE_FORMAT)}
+        for slot in slots
+    ]
+
+
+def parse_slot_start(value):
+    """A booked date as sent by the client: an ISO datetime or an option date, in the current timezone if naive."""
+    start = value if isinstance(value, datetime) else parse_datetime(str(value))
+    if start is None:
+        raise SlotUnavailable(f"Invalid appointment date {value}.")
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    return start
+
+
+def lock_for_booking(appointment, interviewer_ids):
+    """
+    Lock the appointment, then the interviewers in primary key order. Concurrent bookings queue on these
+    locks for up to INTERVIEW_BOOKING_LOCK_TIMEOUT milliseconds before SlotBusy is raised.
+    Returns the locked interviewers by primary key.
+    """
+    timeout = getattr(settings, 'INTERVIEW_BOOKING_LOCK_TIMEOUT', 2000)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT current_setting('lock_timeout')")
+        previous = cursor.fetchone()[0]
+        cursor.execute("SELECT set_config('lock_timeout', %s, true)", [f'{timeout}ms'])
+    try:
+        # A savepoint, so a lock that timed out leaves the transaction usable for restoring the timeout
+        with transaction.atomic():
+            list(models.Appointment.objects.select_for_update().filter(pk=appointment.pk).values_list('pk', flat=True))
+            interviewers = {
+                interviewer.pk: interviewer
+                for interviewer in models.Interviewer.objects.select_for_update(of=('self',))
+                .filter(pk__in=interviewer_ids).order_by('pk')
+            }
+    except OperationalError:
+        raise SlotBusy("Another booking for this interviewer is in progress, please try again.")
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('lock_timeout', %s, true)", [previous])
+    return interviewers
+
+
+@transaction.atomic
+def book_interview(appointment, interviewer, start):
+    """
+    Book the interviewer's slot at `start` for the appointment, set the appointment's date and record its
+    interview, in one transaction. Booking an appointment again (a double submit or a reschedule) releases
+    the slot it held and moves its pending interview rather than adding another one.
+    Returns the slot's start and the interview; raises SlotUnavailable when the slot cannot be taken.
+    Bookings of an interviewer are serialized on its row, so the availability flags checked here are current.
+    """
+    start = parse_slot_start(start)
+    previous = list(models.InterviewSlot.objects.filter(appointment=appointment).exclude(interviewer=interviewer, start=start))
+    interviewers = lock_for_booking(appointment, {interviewer.pk, *(slot.interviewer_id for slot in previous)})
+    if interviewer.pk not in interviewers:
+        raise SlotUnavailable("This interviewer no longer exists.")
+    # The slots may have moved while the locks were awaited
+    previous = list(models.InterviewSlot.objects.filter(appointment=appointment).exclude(interviewer=interviewer, start=start))
+    if any(slot.interviewer_id not in interviewers for slot in previous):
+        raise SlotBusy("Another booking for this appointment is in progress, please try again.")
+    models.InterviewSlot.objects.filter(pk__in=[slot.pk for slot in previous]).update(appointment=None)
+
+    try:
+        claimed = models.InterviewSlot.objects.filter(
+            Q(appointment__isnull=True, available=True) | Q(appointment=appointment),
+            interviewer=interviewer, start=start,
+        ).update(appointment=appointment)
+    except IntegrityError:
+        claimed = 0  # the appointment holds another slot
+    if not claimed:
+        raise SlotUnavailable("This appointment date is no longer available, please choose another one.")
+
+    # The appointment's lock is held, so no other booking can add an interview in between
+    interview = models.FreelancerInterview.objects.filter(appointment=appointment).order_by('pk').first()
+    if interview is None:
+        interview = models.FreelancerInterview.objects.create(
+            interviewer=interviewer, freelancer=appointment.freelancer, appointment=appointment, passed=False, done=False,
+        )
+    elif interview.done:
+        raise SlotUnavailable("This appointment's interview has already taken place.")
+    elif interview.interviewer_id != interviewer.pk:
+        interview.interviewer = interviewer
+        interview.save(update_fields=['interviewer'])
+    appointment.appointment_date = start
+    appointment.save(update_fields=['appointment_date'])
+
+    # Capacity is counted from the interviews, so availability is refreshed once they are written
+    refresh_availability(interviewers[interviewer.pk], [timezone.localdate(start)])
+    for slot in previous:
+        refresh_availability(interviewers[slot.interviewer_id], [timezone.localdate(slot.start)])
+    return start, interview
+
+def appointment_pool(appointment):
+    """The interviewers an appointment's date options are offered from, as picked when it was created."""
+    if appointment.interview_type == 'live_assessment':
+        return get_available_interviewers(type='live_interview')
+    if appointment.category:
+        # Skill interviews are held by interviewers with the category's expertise
+        return get_available_interviewers(expertise=appointment.category, with_free_slots=True)
+    return get_available_interviewers(type='soft_skills')
+
+
+def withdraw_unavailable_options(interviewer, start):
+    """
+    Remove the interviewer's options that stopped being bookable in the week of `start` (the booked slot,
+    and the rest of a day or week that became full) from pending appointments, in one bulk update.
+    Returns the ids of the appointments left with fewer than OPTION_COUNT options.
+    """
+    week_start, week_end = week_bounds(start)
+    taken = {
+        timezone.localtime(slot_start).strftime(OPTION_DATE_FORMAT)
+        for slot_start in models.InterviewSlot.objects.filter(
+            interviewer=interviewer, start__gte=week_start, start__lt=week_end,
+        ).exclude(appointment__isnull=True, available=True).values_list('start', flat=True)
+    }
+    interviewer_id = str(interviewer.pk)
+    appointments = models.Appointment.objects.filter(
+        appointment_date__isnull=True,
+        appointment_date_options__contains=[{'interviewer_id': interviewer_id}],
+    ).only('id', 'appointment_date_options')
+
+    changed = []
+    for appointment in appointments:
+        options = [
+            option for option in appointment.appointment_date_options
+            if option.get('interviewer_id') != interviewer_id or option.get('date') not in taken
+        ]
+        if len(options) != len(appointment.appointment_date_options):
+            appointment.appointment_date_options = options
+            changed.append(appointment)
+    models.Appointment.objects.bulk_update(changed, ['appointment_date_options'])
+    return [appointment.id for appointment in changed if len(appointment.appointment_date_options) < OPTION_COUNT]
+
+
+def refresh_appointment_date_options(appointment_ids):
+    """Offer pending appointments a fresh set of options from their pool. Returns the number refreshed."""
+    appointments = list(models.Appointment.objects.filter(id__in=appointment_ids, appointment_date__isnull=True))
+    options_by_pool = {}
+    for appointment in appointments:
+        pool = (appointment.interview_type, appointment.category)
+        if pool not in options_by_pool:
+            options_by_pool[pool] = appointment_date_options(appointment_pool(appointment))
+        appointment.appointment_date_options = options_by_pool[pool]
+    models.Appointment.objects.bulk_update(appointments, ['appointment_date_options'])
+    return len(appointments)
@@ -0,0 +1,120 @@
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Subquery
+from django.utils import timezone
+from redis.exceptions import RedisError
+from core import models
+from core.redis_client import get_redis
+
+CACHE_KEY = 'interviewer-capacity'
+
+
+def cache_ttl():
+    return getattr(settings, 'INTERVIEWER_CAPACITY_CACHE_TTL', 60)
+
+
+def week_bounds(now):
+    """Start of the current week (Monday 00:00) and of the next one, in the current timezone."""
+    today = timezone.localdate(now)
+    start = timezone.make_aware(datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time()))
+    return start, start + timedelta(days=7)
+
+
+def pending_interviews(start, end, prefix=''):
+    """
+    Pending interviews with an appointment in [start, end), as a filter on FreelancerInterview or, through
+    `prefix`, on a relation to it. What an interviewer has booked is counted from this one definition.
+    """
+    return Q(**{
+        f'{prefix}done': False,
+        f'{prefix}appointment__appointment_date__gte': start,
+        f'{prefix}appointment__appointment_date__lt': end,
+    })
+
+
+def interviewer_capacity(type=None, expertise=None, now=None):
+    """
+    Active interviewers of a type, or with the expertise whose name contains `expertise`, annotated with
+    interviews_this_week, interviews_today, remaining_weekly_slots and remaining_daily_slots. One query.
+    """
+    now = now or timezone.now()
+    start_of_week, end_of_week = week_bounds(now)
+    start_of_day = timezone.make_aware(datetime.combine(timezone.localdate(now), datetime.min.time()))
+    interviewers = models.Interviewer.objects.filter(is_active=True, interviews_per_week__gt=0)
+    if type is not None:
+        interviewers = interviewers.filter(type=type)
+    if expertise is not None:
+        service = models.Services.objects.filter(name__icontains=expertise).values('pk')[:1]
+        interviewers = interviewers.filter(expertise=Subquery(service))
+    return interviewers.annotate(
+        interviews_this_week=Count('interviewer_interviews', filter=pending_interviews(
+            start_of_week, end_of_week, prefix='interviewer_interviews__',
+        )),
+        interviews_today=Count('interviewer_interviews', filter=pending_interviews(
+            start_of_day, start_of_day + timedelta(days=1), prefix='interviewer_interviews__',
+        )),
+    ).annotate(
+        remaining_weekly_slots=F('interviews_per_week') - F('interviews_this_week'),
+        remaining_daily_slots=F('max_interviews_per_day') - F('interviews_today'),
+    ).order_by('-remaining_weekly_slots', '-remaining_daily_slots')
+
+
+def get_available_interviewers(type=None, expertise=None, with_free_slots=False):
+    """
+    Interviewers of a pool ordered by remaining weekly then daily slots. with_free_slots keeps only
+    interviewers still within working hours and with slots left today and this week.
+    The ordering is cached in Redis for INTERVIEWER_CAPACITY_CACHE_TTL seconds, until the next booking.
+    """
+    pool = json.dumps([type, expertise, with_free_slots])
+    try:
+        cached = get_redis().hget(CACHE_KEY, pool)
+    except RedisError as e:
+        print(f"Error reading interviewer capacity: {e}")
+        cached = None
+    if cached is not None:
+        cached = json.loads(cached)
+        if time.time() - cached['at'] < cache_ttl():
+            interviewers = models.Interviewer.objects.in_bulk([entry[0] for entry in cached['interviewers']])
+            ordered = []
+            for interviewer_id, remaining_weekly_slots, remaining_daily_slots in cached['interviewers']:
+                interviewer = interviewers.get(uuid.UUID(interviewer_id))
+                if interviewer is not None:
+                    interviewer.remaining_weekly_slots = remaining_weekly_slots
+                    interviewer.remaining_daily_slots = remaining_daily_slots
+                    ordered.append(interviewer)
+            return ordered
+
+    interviewers = interviewer_capacity(type=type, expertise=expertise)
+    if with_free_slots:
+        interviewers = interviewers.filter(
+            working_hours_end__gte=timezone.now().time(),
+            remaining_weekly_slots__gt=0,
+            remaining_daily_slots__gt=0,
+        )
+    interviewers = list(interviewers)
+    entry = {
+        'at': time.time(),
+        'interviewers': [[str(i.id), i.remaining_weekly_slots, i.remaining_daily_slots] for i in interviewers],
+    }
+    try:
+        redis_client = get_redis()
+        redis_client.hset(CACHE_KEY, pool, json.dumps(entry))
+        redis_client.expire(CACHE_KEY, cache_ttl())
+    except RedisError as e:
+        print(f"Error storing interviewer capacity: {e}")
+    return interviewers
+
+
+def invalidate_interviewer_capacity():
+    """Drop the cached capacities once the current transaction commits, e.g. after an interview is booked."""
+    def invalidate():
+        try:
+            get_redis().delete(CACHE_KEY)
+        except RedisError as e:
+            # Entries expire after INTERVIEWER_CAPACITY_CACHE_TTL anyway
+            print(f"Error invalidating interviewer capacity: {e}")
+    transaction.on_commit(invalidate)
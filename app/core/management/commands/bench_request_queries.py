@@ -0,0 +1,67 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client as HttpClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from core.authentication import stateless_max_lifetime
+from core.models import Chat, Client, Freelancer, Notification
+from core.redis_client import get_redis
+from core.roles import add_role_claim
+from core.unread_counters import MESSAGES, NOTIFICATIONS, counter_key
+
+ENDPOINTS = [
+    ('unread notifications', 'user:unread_notification_count'),
+    ('unread messages', 'user:unread_message_count'),
+    ('chat inbox', 'user:chat-inbox'),
+    ('chats', 'user:chat-list'),
+    ('notifications', 'user:notification-list'),
+    ('freelancer profile', 'user:manage-freelancer'),
+    ('appointments', 'appointment-list'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare SQL queries and latency per authenticated request with and without JWT_STATELESS_USER'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        rows = []
+        # Everything is created in a transaction that is rolled back at the end
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+            suffix = uuid.uuid4().hex[:8]
+            freelancer = Freelancer.objects.create_user(email=f"bench-freelancer-{suffix}@example.com", password='bench', full_name='Bench')
+            client = Client.objects.create(email=f"bench-client-{suffix}@example.com", password='bench', company_name='Bench')
+            Chat.objects.create(client=client, freelancer=freelancer)
+            Notification.objects.create(user=freelancer, type='alert', title="Bench", description="Bench")
+            token = AccessToken.for_user(freelancer)
+            # Stateless authentication only applies to short-lived tokens
+            token.set_exp(lifetime=stateless_max_lifetime())
+            token = add_role_claim(token, freelancer)
+            http = HttpClient(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+            for label, url_name in ENDPOINTS:
+                url = reverse(url_name)
+                row = [label]
+                for stateless in (False, True):
+                    with override_settings(JWT_STATELESS_USER=stateless):
+                        http.get(url)  # warm caches
+                        with CaptureQueriesContext(connection) as queries:
+                            started = time.perf_counter()
+                            for _ in range(iterations):
+                                http.get(url)
+                            elapsed = time.perf_counter() - started
+                    row += [len(queries) / iterations, elapsed / iterations * 1000]
+                rows.append(row)
+
+            get_redis().delete(counter_key(MESSAGES, freelancer.id), counter_key(NOTIFICATIONS, freelancer.id))
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'endpoint':<22}{'queries (db user)':>19}{'queries (token)':>17}{'ms (db user)':>14}{'ms (token)':>12}")
+        for label, db_queries, db_ms, token_queries, token_ms in rows:
+            self.stdout.write(f"{label:<22}{db_queries:>19.1f}{token_queries:>17.1f}{db_ms:>14.2f}{token_ms:>12.2f}")
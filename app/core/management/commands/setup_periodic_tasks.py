@@ -28,4 +28,100 @@ class Command(BaseCommand):
         )
         
         logger.info("Periodic task 'update_expired_holds' has been set up")
+
+        PeriodicTask.objects.update_or_create(
+            name='prune_score_cache',
+            defaults={
+                'task': 'services.tasks.prune_score_cache',
+                'crontab': schedule,
+                'enabled': True
+            }
+        )
+
+        logger.info("Periodic task 'prune_score_cache' has been set up")
+
+        # Nightly rebuild compacts the embedding index and picks up profiles changed outside the API
+        PeriodicTask.objects.update_or_create(
+            name='rebuild_freelancer_embeddings',
+            defaults={
+                'task': 'services.tasks.rebuild_freelancer_embeddings',
+                'crontab': schedule,
+                'enabled': True
+            }
+        )
+
+        logger.info("Periodic task 'rebuild_freelancer_embeddings' has been set up")
+
+        # Emails are drained right after they are queued; this picks up retries and missed wake-ups
+        every_minute, created = CrontabSchedule.objects.get_or_create(
+            minute="*",
+            hour="*",
+            day_of_week="*",
+            day_of_month="*",
+            month_of_year="*",
+        )
+        PeriodicTask.objects.update_or_create(
+            name='drain_email_outbox',
+            defaults={
+                'task': 'core.tasks.drain_email_outbox',
+                'crontab': every_minute,
+                'enabled': True
+            }
+        )
+
+        logger.info("Periodic task 'drain_email_outbox' has been set up")
+
+        every_quarter_hour, created = CrontabSchedule.objects.get_or_create(
+            minute="*/15",
+            hour="*",
+            day_of_week="*",
+            day_of_month="*",
+            month_of_year="*",
+        )
+        PeriodicTask.objects.update_or_create(
+            name='reconcile_unread_counters',
+            defaults={
+                'task': 'core.tasks.reconcile_unread_counters',
+                'crontab': every_quarter_hour,
+                'enabled': True
+            }
+        )
+
+        logger.info("Periodic task 'reconcile_unread_counters' has been set up")
+
+        # Abandoned chunked uploads leave part files behind
+        PeriodicTask.objects.update_or_create(
+            name='purge_stale_uploads',
+            defaults={
+                'task': 'core.tasks.purge_stale_uploads',
+                'crontab': schedule,
+                'enabled': True
+            }
+        )
+
+        logger.info("Periodic task 'purge_stale_uploads' has been set up")
+
+        # Keep the interview slot calendar INTERVIEW_SLOT_HORIZON_DAYS ahead
+        PeriodicTask.objects.update_or_create(
+            name='extend_interview_slots',
+            defaults={
+                'task': 'core.tasks.extend_interview_slots',
+                'crontab': schedule,
+                'enabled': True
+            }
+        )
+
+        logger.info("Periodic task 'extend_interview_slots' has been set up")
+
+        # Resume checks queued while every checker was at its daily limit
+        PeriodicTask.objects.update_or_create(
+            name='assign_pending_resume_checks',
+            defaults={
+                'task': 'resume.tasks.assign_pending_resume_checks',
+                'crontab': every_quarter_hour,
+                'enabled': True
+            }
+        )
+
+        logger.info("Periodic task 'assign_pending_resume_checks' has been set up")
         self.stdout.write(self.style.SUCCESS('Periodic tasks setup successfully!'))
@@ -0,0 +1,128 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+STREAM_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Types safe to render in the browser; anything else (html, svg, ...) is downloaded
+INLINE_CONTENT_TYPES = {'application/pdf', 'image/png', 'image/jpeg', 'image/gif', 'image/webp'}
+
+
+def file_etag(field_file):
+    """Strong ETag for blobs (the content hash), weak size/mtime ETag for legacy files."""
+    blob = getattr(field_file.instance, 'blob', None)
+    if blob is not None and field_file.name == blob.file.name:
+        return quote_etag(blob.sha256)
+    stat = os.stat(field_file.path)
+    return f'W/"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison, as If-None-Match requires
+    strip_weak = lambda tag: tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()
+    return strip_weak(etag) in {strip_weak(tag) for tag in header.split(',')}
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single `bytes=` range, inclusive; None to serve the whole file.
+    Multi-range requests are answered with the whole file, which RFC 9110 allows.
+    Raises ValueError for an unsatisfiable range.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or (last and int(last) < start):
+            raise ValueError(header)
+    else:
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError(header)
+        start, end = max(size - suffix, 0), size - 1
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            data = source.read(min(STREAM_CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def serve_file(request, field_file, filename=None, as_attachment=False):
+    """
+    Respond with a stored file after the caller checked permissions.
+    Supports If-None-Match and single byte ranges, and streams from disk in small chunks. With
+    MEDIA_ACCEL_MODE the web server sends the bytes instead: 'x-accel-redirect' (nginx, internal
+    location MEDIA_ACCEL_PREFIX) or 'x-sendfile' (Apache mod_xsendfile, lighttpd).
+    Only INLINE_CONTENT_TYPES are shown inline, and every response is sandboxed and unsniffable, so an
+    uploaded html or svg file can't run script on this origin.
+    """
+    if not field_file:
+        raise Http404("No file.")
+    path = field_file.path
+    if not os.path.exists(path):
+        raise Http404("File not found.")
+    filename = filename or os.path.basename(field_file.name)
+    etag = file_etag(field_file)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    as_attachment = as_attachment or content_type not in INLINE_CONTENT_TYPES
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, no-cache',
+        'Content-Disposition': content_disposition_header(as_attachment, filename),
+        'X-Content-Type-Options': 'nosniff',
+        'Content-Security-Policy': 'sandbox',
+    }
+
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return HttpResponse(status=304, headers={'ETag': etag, 'Cache-Control': headers['Cache-Control']})
+
+    accel_mode = getattr(settings, 'MEDIA_ACCEL_MODE', None)
+    if accel_mode == 'x-accel-redirect':
+        # nginx handles ranges and conditional requests for the internal location
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(field_file.name)
+        return response
+    if accel_mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Sendfile'] = path
+        return response
+
+    size = os.path.getsize(path)
+    byte_range = None
+    # A range on a stale copy would splice two versions, so If-Range must still match
+    if_range = request.headers.get('If-Range')
+    if not if_range or if_range.strip() == etag:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            return HttpResponse(status=416, headers={'Content-Range': f"bytes */{size}"})
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), as_attachment=as_attachment, filename=filename, content_type=content_type, headers=headers)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(path, start, end - start + 1), status=206, content_type=content_type, headers=headers)
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = str(end - start + 1)
+    response['Last-Modified'] = http_date(os.path.getmtime(path))
+    return response
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:23
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0100_applicationonhold_reason'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreelancerScoreCache',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('profile_hash', models.CharField(max_length=64)),
+                ('project_hash', models.CharField(max_length=64)),
+                ('score', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now=True)),
+                ('freelancer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_cache', to='core.freelancer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project_hash', 'profile_hash'], name='core_freela_project_9277c8_idx'), models.Index(fields=['last_used_at'], name='core_freela_last_us_137ca8_idx')],
+                'unique_together': {('freelancer', 'profile_hash', 'project_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:27
+
+import django.db.models.deletion
+import django.db.models.functions.text
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0101_freelancerscorecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FreelancerSkill',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('category', models.CharField(blank=True, max_length=255)),
+                ('type', models.CharField(blank=True, choices=[('practical', 'Practical'), ('theoretical', 'Theoretical')], max_length=20)),
+                ('both_practical_theoretical', models.BooleanField(default=False)),
+                ('verified', models.BooleanField(default=False)),
+                ('freelancer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_entries', to='core.freelancer')),
+                ('technology', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='freelancer_skills', to='core.technology')),
+            ],
+            options={
+                'indexes': [models.Index(django.db.models.functions.text.Lower('name'), models.F('freelancer'), name='core_fskill_lower_name_idx'), models.Index(fields=['freelancer', 'category'], name='core_freela_freelan_0925a0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:27
+
+import json
+from django.db import migrations
+
+
+def populate_freelancer_skills(apps, schema_editor):
+    """Copy the skills JSON of every freelancer into FreelancerSkill rows."""
+    Freelancer = apps.get_model('core', 'Freelancer')
+    FreelancerSkill = apps.get_model('core', 'FreelancerSkill')
+    Technology = apps.get_model('core', 'Technology')
+
+    technologies = {}
+    for technology_id, name in Technology.objects.values_list('id', 'name'):
+        technologies.setdefault(name.strip().lower(), technology_id)
+
+    rows = []
+    for freelancer_id, skills in Freelancer.objects.exclude(skills=None).values_list('id', 'skills').iterator():
+        if isinstance(skills, str):
+            try:
+                skills = json.loads(skills)
+            except json.JSONDecodeError:
+                continue
+        if isinstance(skills, dict):
+            skills = [skills]
+        if not isinstance(skills, list):
+            continue
+        for skill in skills:
+            if not isinstance(skill, dict) or not skill.get('skill'):
+                continue
+            name = str(skill['skill']).strip()
+            rows.append(FreelancerSkill(
+                freelancer_id=freelancer_id,
+                technology_id=technologies.get(name.lower()),
+                name=name[:255],
+                category=str(skill.get('category') or '')[:255],
+                type=skill.get('type') if skill.get('type') in ('practical', 'theoretical') else '',
+                both_practical_theoretical=bool(skill.get('both_practical_theoretical')),
+                verified=bool(skill.get('verified')),
+            ))
+    FreelancerSkill.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0102_freelancerskill'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_freelancer_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:41
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0103_populate_freelancerskill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeScreeningJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('extracting', 'Extracting'), ('scoring', 'Scoring'), ('persisting', 'Persisting'), ('assigning', 'Assigning'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('resume_text', models.TextField(blank=True, null=True)),
+                ('scores', models.JSONField(blank=True, null=True)),
+                ('results_persisted', models.BooleanField(default=False)),
+                ('assignment_done', models.BooleanField(default=False)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='screening_jobs', to='core.resume')),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0106_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'timestamp'], name='core_notifi_user_id_080564_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0107_notification_user_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat', 'timestamp', 'id'], name='core_messag_chat_id_7e337c_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-17 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0108_message_chat_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='client_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='freelancer_unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='chat',
+            index=models.Index(fields=['client', '-last_message_at'], name='core_chat_client__bfc594_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chat',
+            index=models.Index(fields=['freelancer', '-last_message_at'], name='core_chat_freelan_cede5e_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-17 23:40
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_chat_inbox_summary(apps, schema_editor):
+    """Fill the last message and unread counters of existing chats from their messages."""
+    Chat = apps.get_model('core', 'Chat')
+    Message = apps.get_model('core', 'Message')
+
+    last_messages = Message.objects.filter(chat=OuterRef('pk')).order_by('-timestamp', '-id')
+    chats = Chat.objects.annotate(
+        last_at=Subquery(last_messages.values('timestamp')[:1]),
+        last_content=Subquery(last_messages.values('content')[:1]),
+        last_file=Subquery(last_messages.values('file')[:1]),
+    )
+    for chat in chats.iterator():
+        unread = Message.objects.filter(chat=chat, read=False)
+        chat.last_message_at = chat.last_at
+        chat.last_message_preview = (chat.last_content or ('Attachment' if chat.last_file else ''))[:255]
+        chat.client_unread_count = unread.exclude(sender_id=chat.client_id).count() if chat.client_id else 0
+        chat.freelancer_unread_count = unread.exclude(sender_id=chat.freelancer_id).count() if chat.freelancer_id else 0
+        chat.save(update_fields=['last_message_at', 'last_message_preview', 'client_unread_count', 'freelancer_unread_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0109_chat_inbox_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_chat_inbox_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-17 23:16
+
+from django.db import migrations, models
+
+
+def populate_user_roles(apps, schema_editor):
+    """Set the role of existing users from their subclass rows; earlier roles win, as the old lookups did."""
+    User = apps.get_model('core', 'User')
+    for model_name, role in reversed([
+        ('Freelancer', 'freelancer'),
+        ('Client', 'client'),
+        ('Interviewer', 'interviewer'),
+        ('DisputeManager', 'dispute-manager'),
+        ('ResumeChecker', 'resume-checker'),
+    ]):
+        subclass = apps.get_model('core', model_name)
+        User.objects.filter(id__in=subclass.objects.values('pk')).update(role=role)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0111_blob_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role',
+            field=models.CharField(blank=True, choices=[('freelancer', 'Freelancer'), ('client', 'Client'), ('interviewer', 'Interviewer'), ('dispute-manager', 'Dispute Manager'), ('resume-checker', 'Resume Checker')], default='', max_length=20),
+        ),
+        migrations.RunPython(populate_user_roles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-17 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0112_user_role'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date'], name='core_appoin_appoint_5d7cff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='freelancerinterview',
+            index=models.Index(fields=['interviewer', 'done'], name='core_freela_intervi_967c0e_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-17 23:28
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0113_interview_capacity_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewSlot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('start', models.DateTimeField()),
+                ('available', models.BooleanField(default=True)),
+                ('appointment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slots', to='core.appointment')),
+                ('interviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='core.interviewer')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('appointment__isnull', True), ('available', True)), fields=['start'], name='core_interviewslot_free_idx')],
+                'unique_together': {('interviewer', 'start')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 23:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0114_interviewslot'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='interviewslot',
+            constraint=models.UniqueConstraint(fields=('appointment',), name='core_interviewslot_one_per_appointment'),
+        ),
+    ]
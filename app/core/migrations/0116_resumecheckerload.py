@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-17 23:39
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0115_interviewslot_one_per_appointment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeCheckerLoad',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('assigned', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='resumecheck',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='resumecheck',
+            index=models.Index(condition=models.Q(('done', False), ('resumechecker__isnull', True)), fields=['created_at'], name='core_resumecheck_pending_idx'),
+        ),
+        migrations.AddField(
+            model_name='resumecheckerload',
+            name='resumechecker',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loads', to='core.resumechecker'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='resumecheckerload',
+            unique_together={('resumechecker', 'day')},
+        ),
+    ]
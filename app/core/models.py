@@ -6,6 +6,7 @@ from django.utils import timezone
 from datetime import timedelta
 import uuid
 from django.contrib.auth.hashers import make_password
+from django.db.models.functions import Lower
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -23,6 +24,15 @@ class UserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 class User(AbstractBaseUser , PermissionsMixin):
+    ROLE_CHOICES = [
+        ('freelancer', 'Freelancer'),
+        ('client', 'Client'),
+        ('interviewer', 'Interviewer'),
+        ('dispute-manager', 'Dispute Manager'),
+        ('resume-checker', 'Resume Checker'),
+    ]
+    ROLE = ''  # set by each role subclass
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField(unique=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True , null=True)
@@ -36,12 +46,22 @@ class User(AbstractBaseUser , PermissionsMixin):
     objects = UserManager()
     email_verified = models.BooleanField(default=False)
     verification_token = models.CharField(max_length=255, null=True, blank=True)  # Add this line to store the verification token
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES, blank=True, default='')  # denormalized from the subclass tables
     USERNAME_FIELD = 'email'
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        # Saving a subclass row records its role on the user row, so the role is known without probing each child table
+        if self.ROLE and not self.role:
+            self.role = self.ROLE
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'role'}
+        super().save(*args, **kwargs)
+
 
 class Freelancer(User):
+    ROLE = 'freelancer'
     WORKING_HOUR_CHOICES = [
         ('full_time', 'Full time (40 or more hrs/week)'),
         ('part_time', 'Part time (Less than 40 hrs/week)'),
@@ -110,6 +130,7 @@ class AssessmentTermination(models.Model):
     termination_count = models.PositiveIntegerField(default=0)
 
 class Client(User):
+    ROLE = 'client'
     company_name = models.CharField(max_length=255, blank=True )
     contact_person = models.CharField(max_length=255, blank=True )
     projects_posted = models.PositiveIntegerField(default=0 , blank=True , null=True)
@@ -128,6 +149,7 @@ class Client(User):
         super().delete(*args, **kwargs)
 
 class Interviewer(User):
+    ROLE = 'interviewer'
     TYPE = [
         ('technical', 'Technical'),
         ('soft_skills', 'Soft Skills'),
@@ -146,6 +168,7 @@ class Interviewer(User):
         return f"{self.full_name} - {self.expertise}"
 
 class ResumeChecker(User):
+    ROLE = 'resume-checker'
     full_name = models.CharField(max_length=100)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     resume_check_per_week = models.IntegerField(default=1)
@@ -159,6 +182,7 @@ class ResumeChecker(User):
 
 
 class DisputeManager(User):
+    ROLE = 'dispute-manager'
     full_name = models.CharField(max_length=100)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     dispute_per_week = models.IntegerField(default=1)
@@ -452,7 +476,18 @@ class Chat(models.Model):
     client = models.ForeignKey('Client',   on_delete=models.SET_NULL, null=True, related_name='chats')
     freelancer = models.ForeignKey('Freelancer',   on_delete=models.SET_NULL, null=True, related_name='chats')
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    # Inbox summary, kept up to date by MessageViewSet and MarkMessagesAsReadView
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=255, blank=True, default='')
+    client_unread_count = models.PositiveIntegerField(default=0)  # messages from the freelancer the client hasn't read
+    freelancer_unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['client', '-last_message_at']),
+            models.Index(fields=['freelancer', '-last_message_at']),
+        ]
+
     def __str__(self):
         return f"Chat between {self.client} and {self.freelancer}"
 
@@ -462,8 +497,16 @@ class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     content = models.TextField(blank=True, null=True)  # Text content of the message
     file = models.FileField(upload_to='message_files/', blank=True, null=True)  # File upload field
+    blob = models.ForeignKey('Blob', on_delete=models.PROTECT, null=True, blank=True, related_name='+')
     timestamp = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a chat's history on (timestamp, id)
+            models.Index(fields=['chat', 'timestamp', 'id']),
+        ]
+
     def __str__(self):
         return f"Message from {self.sender} at {self.timestamp}"
 
@@ -531,6 +574,7 @@ class DisputeResponse(models.Model):
 class SupportingDocument(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     file = models.FileField(upload_to='dispute_docs/')
+    blob = models.ForeignKey('Blob', on_delete=models.PROTECT, null=True, blank=True, related_name='+')
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     dispute = models.ForeignKey(Dispute, on_delete=models.SET_NULL, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -546,6 +590,8 @@ class Resume(models.Model):
     is_email_verified = models.BooleanField(default=False)
     applied_positions =  models.ManyToManyField("Services")
     resume_file = models.FileField(upload_to='resumes/')
+    blob = models.ForeignKey('Blob', on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # sha256 of the uploaded file
     uploaded_at = models.DateTimeField(auto_now_add=True)
     password = models.CharField(max_length=128 , null=False)  # Password field
     verification_token = models.CharField(max_length=255, null=True, blank=True)  # Add this line to store the verification token
@@ -569,8 +615,86 @@ class ResumeCheck(models.Model):
     passed = models.BooleanField(default=False)  # Whether the freelancer passed the interview
     feedback = models.TextField(blank=True, null=True)  # Interviewer's feedback on the interview
     done = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    def __str__(self):
+        return f"Resume Check for Freelancer {self.resume.full_name} with Resume Checker {self.resumechecker.full_name if self.resumechecker else 'pending'}"
+
+    class Meta:
+        indexes = [
+            # Checks waiting for a checker with capacity, oldest first
+            models.Index(fields=['created_at'], condition=models.Q(resumechecker__isnull=True, done=False), name='core_resumecheck_pending_idx'),
+        ]
+
+
+class ResumeCheckerLoad(models.Model):
+    """Resume checks assigned to a checker on a day, claimed atomically against max_resume_check_per_day."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    resumechecker = models.ForeignKey(ResumeChecker, on_delete=models.CASCADE, related_name='loads')
+    day = models.DateField()
+    assigned = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.assigned} resume checks for {self.resumechecker_id} on {self.day}"
+
+    class Meta:
+        unique_together = ('resumechecker', 'day')
+
+
+class ResumeText(models.Model):
+    """Text extracted from a resume file, shared by every upload with the same content hash."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    content_hash = models.CharField(max_length=64, unique=True)  # sha256 of the file
+    text = models.TextField(blank=True)
+    text_hash = models.CharField(max_length=64)  # sha256 of the extracted text
+    created_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f"Resume Check for Freelancer {self.resume.full_name} with Resume Checker {self.resumechecker.full_name}"
+        return f"Resume text {self.content_hash}"
+
+
+class ResumeScoreCache(models.Model):
+    """AI screening scores of a resume text for one set of applied positions."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    text_hash = models.CharField(max_length=64)
+    positions_hash = models.CharField(max_length=64)  # sha256 of the sorted, lowercased position names
+    scores = models.JSONField()  # {position: {score, comment}}
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('text_hash', 'positions_hash')
+
+    def __str__(self):
+        return f"Resume scores {self.text_hash}/{self.positions_hash}"
+
+
+class ResumeScreeningJob(models.Model):
+    """
+    Background screening of a verified resume: extract, score, persist, assign.
+    Each stage stores its output here so a retried or duplicated stage can skip finished work.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('extracting', 'Extracting'),
+        ('scoring', 'Scoring'),
+        ('persisting', 'Persisting'),
+        ('assigning', 'Assigning'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    resume = models.ForeignKey('Resume', on_delete=models.CASCADE, related_name='screening_jobs')
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    resume_text = models.TextField(null=True, blank=True)  # output of the extract stage
+    scores = models.JSONField(null=True, blank=True)  # output of the score stage, {position: {score, comment}}
+    results_persisted = models.BooleanField(default=False)
+    assignment_done = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Screening of {self.resume_id}: {self.status}"
 
 
 class ApplicationOnHold(models.Model):
@@ -611,6 +735,30 @@ class Technology(models.Model):
     def __str__(self):
         return self.name
 
+class FreelancerSkill(models.Model):
+    """One row per entry of Freelancer.skills so skill matching can run in SQL."""
+    SKILL_TYPE_CHOICES = [
+        ('practical', 'Practical'),
+        ('theoretical', 'Theoretical'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    freelancer = models.ForeignKey(Freelancer, on_delete=models.CASCADE, related_name='skill_entries')
+    technology = models.ForeignKey(Technology, on_delete=models.SET_NULL, null=True, blank=True, related_name='freelancer_skills')
+    name = models.CharField(max_length=255)
+    category = models.CharField(max_length=255, blank=True)
+    type = models.CharField(max_length=20, choices=SKILL_TYPE_CHOICES, blank=True)
+    both_practical_theoretical = models.BooleanField(default=False)
+    verified = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(Lower('name'), 'freelancer', name='core_fskill_lower_name_idx'),
+            models.Index(fields=['freelancer', 'category']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.type}) for Freelancer {self.freelancer_id}"
+
 class Services(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
@@ -634,6 +782,96 @@ class SkillSearch(models.Model):
         return self.skill_name
 
 
+class FreelancerScoreCache(models.Model):
+    """AI match score for a freelancer profile against a project, keyed by content hashes."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    freelancer = models.ForeignKey(Freelancer, on_delete=models.CASCADE, related_name='score_cache')
+    profile_hash = models.CharField(max_length=64)  # sha256 of the freelancer's scoring fields
+    project_hash = models.CharField(max_length=64)  # sha256 of the normalized project parameters
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('freelancer', 'profile_hash', 'project_hash')
+        indexes = [
+            models.Index(fields=['project_hash', 'profile_hash']),
+            models.Index(fields=['last_used_at']),
+        ]
+
+    def __str__(self):
+        return f"Score {self.score} for Freelancer {self.freelancer_id}"
+
+
+class OutboundEmail(models.Model):
+    """An email waiting in the outbox; core.tasks.drain_email_outbox delivers it."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField()
+    content_hash = models.CharField(max_length=64)  # sha256 of subject and body; equal hashes are sent in one request
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    send_after = models.DateTimeField(default=timezone.now)  # retry backoff, or the lease of a 'sending' claim
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'send_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} - {self.to_email} ({self.status})"
+
+
+class Blob(models.Model):
+    """A stored file addressed by the sha256 of its content, so identical uploads are stored once."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    file = models.FileField(upload_to='blobs/')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class Upload(models.Model):
+    """A chunked, resumable upload session; its bytes are appended to a part file until it becomes a Blob."""
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()  # declared total size
+    offset = models.BigIntegerField(default=0)  # bytes received so far
+    sha256 = models.CharField(max_length=64, blank=True)  # optional checksum declared by the client
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, blank=True, related_name='uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
 class Notification(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -644,6 +882,11 @@ class Notification(models.Model):
     read = models.BooleanField(default=False)
     data = models.JSONField(default=list)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'timestamp']),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.user.email}"
 
@@ -668,6 +911,9 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ['appointment_date']
+        indexes = [
+            models.Index(fields=['appointment_date']),
+        ]
 
 class FreelancerInterview(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -680,6 +926,36 @@ class FreelancerInterview(models.Model):
     def __str__(self):
         return f"Interview for Freelancer {self.freelancer_id} with Interviewer {self.interviewer_id}"
 
+    class Meta:
+        indexes = [
+            # Interviewer capacity counts pending interviews per interviewer
+            models.Index(fields=['interviewer', 'done']),
+        ]
+
+
+class InterviewSlot(models.Model):
+    """One bookable interval of an interviewer's working hours; free while appointment is empty."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    interviewer = models.ForeignKey(Interviewer, on_delete=models.CASCADE, related_name='slots')
+    start = models.DateTimeField()
+    appointment = models.ForeignKey(Appointment, on_delete=models.SET_NULL, null=True, blank=True, related_name='slots')
+    # False while the interviewer's daily or weekly interview limit is reached
+    available = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"Slot of Interviewer {self.interviewer_id} at {self.start}"
+
+    class Meta:
+        unique_together = ('interviewer', 'start')
+        indexes = [
+            # Next free slots of a pool, in start order
+            models.Index(fields=['start'], condition=models.Q(appointment__isnull=True, available=True), name='core_interviewslot_free_idx'),
+        ]
+        constraints = [
+            # An appointment holds at most one slot, even when two bookings race
+            models.UniqueConstraint(fields=['appointment'], name='core_interviewslot_one_per_appointment'),
+        ]
+
 
 
 
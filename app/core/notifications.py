@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from core import models
+from core.emails import send_emails
+from core.unread_counters import NOTIFICATIONS, adjust_unread_counts
+
+IN_APP = 'in_app'
+EMAIL = 'email'
+CHANNELS = (IN_APP, EMAIL)
+
+
+def notify(users, title, description, data=None, channels=(IN_APP,), type='alert', email_subject=None, email_html=None):
+    """
+    Notify one or more users of the same event. `channels` selects in-app rows and/or a queued email;
+    the email defaults to the title as subject and the description as body.
+    Returns the created Notification rows.
+    """
+    return notify_many([{
+        'users': users,
+        'title': title,
+        'description': description,
+        'data': data,
+        'channels': channels,
+        'type': type,
+        'email_subject': email_subject,
+        'email_html': email_html,
+    }])
+
+
+def notify_many(notices):
+    """
+    Deliver several notify() payloads (dicts of its keyword arguments) with one INSERT and one outbox write.
+    A user who already got the same notification within NOTIFICATION_DEDUPE_WINDOW seconds is skipped.
+    """
+    started = time.monotonic()
+    pending = []  # (user, notice)
+    for notice in notices:
+        unknown = set(notice.get('channels', (IN_APP,))) - set(CHANNELS)
+        if unknown:
+            raise ValueError(f"Unknown notification channels: {', '.join(sorted(unknown))}")
+        users = notice['users']
+        if isinstance(users, models.User):
+            users = [users]
+        seen = set()
+        for user in users:
+            if user is not None and user.pk not in seen:
+                seen.add(user.pk)
+                pending.append((user, notice))
+    if not pending:
+        return []
+
+    recent = recent_notifications(pending)
+    notifications, emails, skipped = [], [], 0
+    for user, notice in pending:
+        data = notice.get('data')
+        data = [] if data is None else data
+        key = (user.pk, notice.get('type', 'alert'), notice['title'], notice['description'])
+        if recent.get(key, object()) == data:
+            skipped += 1
+            continue
+        channels = notice.get('channels', (IN_APP,))
+        if IN_APP in channels:
+            notifications.append(models.Notification(
+                user=user,
+                type=key[1],
+                title=notice['title'],
+                description=notice['description'],
+                data=data,
+            ))
+        if EMAIL in channels:
+            emails.append((
+                user.email,
+                notice.get('email_subject') or notice['title'],
+                notice.get('email_html') or f"<html><body><p>{notice['description']}</p></body></html>",
+            ))
+
+    created = models.Notification.objects.bulk_create(notifications)
+    new_unread = {}
+    for notification in created:
+        new_unread[notification.user_id] = new_unread.get(notification.user_id, 0) + 1
+    adjust_unread_counts(NOTIFICATIONS, new_unread)
+    if emails:
+        send_emails(emails)
+    print(
+        f"notify: {len(created)} notifications, {len(emails)} emails, {skipped} duplicates skipped "
+        f"in {(time.monotonic() - started) * 1000:.1f}ms"
+    )
+    return created
+
+
+def recent_notifications(pending):
+    """{(user id, type, title, description): data} of the recipients' notifications inside the dedupe window."""
+    window = getattr(settings, 'NOTIFICATION_DEDUPE_WINDOW', 60)
+    if not window:
+        return {}
+    rows = models.Notification.objects.filter(
+        user_id__in={user.pk for user, _ in pending},
+        title__in={notice['title'] for _, notice in pending},
+        timestamp__gte=timezone.now() - timedelta(seconds=window),
+    ).values_list('user_id', 'type', 'title', 'description', 'data')
+    return {(user_id, type, title, description): data for user_id, type, title, description, data in rows}
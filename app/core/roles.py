@@ -0,0 +1,45 @@
+from core import models
+
+FREELANCER = models.Freelancer.ROLE
+CLIENT = models.Client.ROLE
+INTERVIEWER = models.Interviewer.ROLE
+DISPUTE_MANAGER = models.DisputeManager.ROLE
+RESUME_CHECKER = models.ResumeChecker.ROLE
+
+ROLE_MODELS = {
+    model.ROLE: model
+    for model in (models.Freelancer, models.Client, models.Interviewer, models.DisputeManager, models.ResumeChecker)
+}
+ROLE_CLAIM = 'role'
+
+
+def add_role_claim(token, user):
+    """Embed the user's role in a JWT so later requests can branch on it without a lookup."""
+    token[ROLE_CLAIM] = user.role
+    return token
+
+
+def get_role(request_or_user):
+    """
+    The role of a request's user or of a user: 'freelancer', 'client', 'interviewer', 'dispute-manager',
+    'resume-checker', or '' for admins and anonymous users. The JWT role claim is only trusted through the
+    TokenUser of a short-lived stateless token; otherwise the user row's current role is used, so a revoked
+    role takes effect right away.
+    """
+    user = getattr(request_or_user, 'user', request_or_user)
+    if not user or not user.is_authenticated:
+        return ''
+    return user.role
+
+
+def get_role_by_id(user_id):
+    """Role of any user, with one primary key lookup; None for unknown users."""
+    return models.User.objects.filter(pk=user_id).values_list('role', flat=True).first()
+
+
+def get_role_instance(request):
+    """The request user's subclass row (Freelancer, Client, ...), fetched once per request; None for admins."""
+    if not hasattr(request, '_role_instance'):
+        model = ROLE_MODELS.get(get_role(request))
+        request._role_instance = model.objects.filter(pk=request.user.pk).first() if model else None
+    return request._role_instance
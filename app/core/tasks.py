@@ -1,35 +1,60 @@
 from celery import shared_task
 from django.utils import timezone
 from .models import FullAssessment
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
 from django.conf import settings
+from .emails import claim_due_emails, deliver, send_email
+from .interview_slots import refresh_appointment_date_options as refresh_date_options, sync_interview_slots
+from .models import Interviewer
+from .unread_counters import reconcile_unread_counts
+from .uploads import purge_stale_uploads as purge_uploads, purge_unreferenced_blobs
 
 
+@shared_task
+def drain_email_outbox():
+    """Send every due email in the outbox; runs after each queued email and every minute for retries."""
+    batch_size = getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 500)
+    sent = 0
+    while True:
+        emails = claim_due_emails(batch_size)
+        if emails:
+            sent += deliver(emails)
+        if len(emails) < batch_size:
+            return sent
+
+
+@shared_task
+def reconcile_unread_counters():
+    """Correct the Redis unread counters that drifted from the database."""
+    corrected = reconcile_unread_counts()
+    print(f"Reconciled unread counters, {corrected} corrected")
+    return corrected
+
 
-def send_email(to_email, subject, html_content):
-    print("to email is ",to_email)
-    print("subject is ",subject)
-    print("html_content is ",html_content)
-    message = Mail(
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
-    )
-    print("from email is",settings.DEFAULT_FROM_EMAIL)
-    print("api key is ",settings.EMAIL_HOST_USER)
-    print("message is ",message)
-    try:
-        sg = SendGridAPIClient(settings.EMAIL_HOST_USER)
-        response = sg.send(message)
-        print("email sent")
-        return response.status_code
-    except Exception as e:
-        print("error sending email ",str(e))
-        return str(e)
+@shared_task
+def purge_stale_uploads():
+    """Delete abandoned upload sessions and their part files, then the blobs nothing references."""
+    purged = purge_uploads()
+    blobs = purge_unreferenced_blobs()
+    print(f"Purged {purged} stale uploads and {blobs} unreferenced blobs")
+    return purged
 
 
+@shared_task
+def extend_interview_slots():
+    """Roll every active interviewer's slot calendar forward to the booking horizon."""
+    synced = 0
+    for interviewer in Interviewer.objects.filter(is_active=True, interviews_per_week__gt=0).iterator():
+        sync_interview_slots(interviewer)
+        synced += 1
+    print(f"Extended the slot calendars of {synced} interviewers")
+    return synced
+
+
+@shared_task
+def refresh_appointment_date_options(appointment_ids):
+    """Replace the date options of pending appointments that ran low after bookings."""
+    return refresh_date_options(appointment_ids)
+
 
 @shared_task
 def update_expired_holds():
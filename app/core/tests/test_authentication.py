@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from core import roles
+from core.authentication import JWTAuthentication, TokenUser
+from core.models import Freelancer, User
+from core.redis_client import get_redis
+from core.unread_counters import MESSAGES, NOTIFICATIONS, counter_key
+
+
+@override_settings(JWT_STATELESS_USER=True)
+class StatelessTokenUserTests(TestCase):
+
+    def setUp(self):
+        self.freelancer = Freelancer.objects.create_user(email='freelancer@example.com', password='testpass', full_name='Freelancer')
+        token = AccessToken.for_user(self.freelancer)
+        token.set_exp(lifetime=timedelta(minutes=5))
+        self.token = roles.add_role_claim(token, self.freelancer)
+        self.addCleanup(get_redis().delete, counter_key(MESSAGES, self.freelancer.id), counter_key(NOTIFICATIONS, self.freelancer.id))
+
+    def api(self, token):
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return api
+
+    def test_claims_are_read_without_queries(self):
+        with self.assertNumQueries(0):
+            user = JWTAuthentication().get_user(self.token)
+            self.assertIsInstance(user, TokenUser)
+            self.assertTrue(user and user.is_authenticated)
+            self.assertEqual(user.id, self.freelancer.id)
+            self.assertEqual(user.pk, self.freelancer.pk)
+            self.assertEqual(user.role, roles.FREELANCER)
+        self.assertFalse(user.is_loaded)
+
+    def test_other_fields_load_the_user_once(self):
+        user = JWTAuthentication().get_user(self.token)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'freelancer@example.com')
+            self.assertTrue(user.check_password('testpass'))
+        self.assertTrue(user.is_loaded)
+
+    def test_deactivated_user_is_rejected_when_loaded(self):
+        user = JWTAuthentication().get_user(self.token)
+        User.objects.filter(pk=self.freelancer.pk).update(is_active=False)
+
+        with self.assertRaises(AuthenticationFailed):
+            user.email
+
+    def test_token_without_role_claim_loads_the_user(self):
+        user = JWTAuthentication().get_user(AccessToken.for_user(self.freelancer))
+
+        self.assertNotIsInstance(user, TokenUser)
+        self.assertEqual(user.pk, self.freelancer.pk)
+
+    @override_settings(JWT_STATELESS_USER=False)
+    def test_disabled_loads_the_user(self):
+        self.assertNotIsInstance(JWTAuthentication().get_user(self.token), TokenUser)
+
+    def test_unread_count_without_user_query(self):
+        api = self.api(self.token)
+        api.get(reverse('user:unread_notification_count'))  # seeds the counter
+
+        with self.assertNumQueries(0):
+            response = api.get(reverse('user:unread_notification_count'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_profile_is_fetched_by_token_id(self):
+        with self.assertNumQueries(1):
+            response = self.api(self.token).get(reverse('user:manage-freelancer'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'freelancer@example.com')
+
+    def test_long_lived_tokens_load_the_user(self):
+        token = roles.add_role_claim(AccessToken.for_user(self.freelancer), self.freelancer)
+        self.assertNotIsInstance(JWTAuthentication().get_user(token), TokenUser)
+
+        self.freelancer.delete()
+        response = self.api(token).get(reverse('user:notification-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected_when_the_row_is_read(self):
+        self.freelancer.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            JWTAuthentication().get_user(self.token).email
+
+    def refresh(self, refresh_token):
+        return APIClient().post(reverse('user:token_refresh'), {'refresh': str(refresh_token)}, format='json')
+
+    def test_refreshed_tokens_are_stateless_and_carry_the_current_role(self):
+        refresh = roles.add_role_claim(RefreshToken.for_user(self.freelancer), self.freelancer)
+        User.objects.filter(pk=self.freelancer.pk).update(role=roles.CLIENT)
+
+        # The lifetime JWT_STATELESS_USER gives access tokens in settings
+        with mock.patch.object(AccessToken, 'lifetime', timedelta(minutes=15)):
+            response = self.refresh(refresh)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        token = AccessToken(response.data['access'])
+        self.assertEqual(token[roles.ROLE_CLAIM], roles.CLIENT)
+        self.assertIsInstance(JWTAuthentication().get_user(token), TokenUser)
+
+    def test_refresh_rejects_a_deleted_user(self):
+        refresh = RefreshToken.for_user(self.freelancer)
+        self.freelancer.delete()
+
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BenchRequestQueriesCommandTests(TestCase):
+
+    def test_prints_a_row_per_endpoint(self):
+        out = StringIO()
+        call_command('bench_request_queries', iterations=1, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertIn('queries (token)', lines[0])
+        self.assertEqual(len(lines), 8)
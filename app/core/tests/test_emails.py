@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import Mock, patch
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core import emails
+from core.models import OutboundEmail
+from core.tasks import drain_email_outbox
+
+
+class FailingBackend:
+
+    def send(self, subject, html_content, recipients):
+        raise ConnectionError("SendGrid unavailable")
+
+
+@override_settings(EMAIL_OUTBOX_BACKEND='core.emails.LocMemBackend')
+class EmailOutboxTests(TestCase):
+
+    def setUp(self):
+        emails.LocMemBackend.outbox.clear()
+
+    def test_send_email_only_queues(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            email = emails.send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(emails.LocMemBackend.outbox, [])
+
+    def test_blank_address_queues_nothing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertIsNone(emails.send_email("", "Hello", "<p>Hi</p>"))
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_send_emails_wakes_worker_once(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            emails.send_emails([
+                ("a@example.com", "Hello", "<p>Hi</p>"),
+                ("b@example.com", "Hello", "<p>Hi</p>"),
+            ])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_drain_batches_emails_sharing_content(self):
+        emails.send_emails([
+            ("a@example.com", "Dispute Resolved", "<p>Resolved</p>"),
+            ("b@example.com", "Dispute Resolved", "<p>Resolved</p>"),
+            ("c@example.com", "Welcome", "<p>Welcome</p>"),
+        ])
+
+        self.assertEqual(drain_email_outbox(), 3)
+
+        batches = sorted(emails.LocMemBackend.outbox, key=lambda batch: batch['subject'])
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(sorted(batches[0]['recipients']), ["a@example.com", "b@example.com"])
+        self.assertEqual(batches[1]['recipients'], ["c@example.com"])
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+        self.assertEqual(drain_email_outbox(), 0)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        email = emails.send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+        with override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_BACKOFF=60):
+            self.assertEqual(emails.deliver(emails.claim_due_emails(10), FailingBackend()), 0)
+            email.refresh_from_db()
+            self.assertEqual(email.status, 'pending')
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.send_after, timezone.now() + timedelta(seconds=50))
+            # Not due yet
+            self.assertEqual(emails.claim_due_emails(10), [])
+
+            OutboundEmail.objects.filter(id=email.id).update(send_after=timezone.now())
+            emails.deliver(emails.claim_due_emails(10), FailingBackend())
+            email.refresh_from_db()
+            self.assertEqual(email.status, 'failed')
+            self.assertEqual(email.last_error, "SendGrid unavailable")
+
+    def test_expired_claim_is_retried(self):
+        email = emails.send_email("jane@example.com", "Hello", "<p>Hi</p>")
+        self.assertEqual(len(emails.claim_due_emails(10)), 1)
+        self.assertEqual(emails.claim_due_emails(10), [])
+
+        OutboundEmail.objects.filter(id=email.id).update(send_after=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(drain_email_outbox(), 1)
+
+    def test_file_backend(self):
+        handle, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        emails.send_email("jane@example.com", "Hello", "<p>Hi</p>")
+
+        with override_settings(EMAIL_OUTBOX_BACKEND='core.emails.FileBackend', EMAIL_OUTBOX_FILE_PATH=path):
+            drain_email_outbox()
+
+        with open(path) as outbox_file:
+            batch = json.loads(outbox_file.readline())
+        self.assertEqual(batch['recipients'], ["jane@example.com"])
+
+
+class SendGridBackendTests(TestCase):
+
+    def test_one_request_with_a_personalization_per_recipient(self):
+        backend = emails.SendGridBackend()
+        backend.session = Mock()
+
+        backend.send("Hello", "<p>Hi</p>", ["a@example.com", "b@example.com"])
+
+        backend.session.post.assert_called_once()
+        payload = backend.session.post.call_args.kwargs['json']
+        self.assertCountEqual(
+            [personalization['to'] for personalization in payload['personalizations']],
+            [[{'email': "a@example.com"}], [{'email': "b@example.com"}]],
+        )
+        self.assertEqual(payload['subject'], "Hello")
+
+    def test_backend_and_session_are_reused(self):
+        with override_settings(EMAIL_OUTBOX_BACKEND='core.emails.SendGridBackend'):
+            self.assertIs(emails.get_backend(), emails.get_backend())
@@ -0,0 +1,276 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+import threading
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import interview_slots, interviewer_capacity
+from core.models import Appointment, Freelancer, FreelancerInterview, Interviewer, InterviewSlot
+from core.redis_client import get_redis
+
+
+class InterviewSlotTests(TestCase):
+
+    def setUp(self):
+        get_redis().delete(interviewer_capacity.CACHE_KEY)
+        self.addCleanup(get_redis().delete, interviewer_capacity.CACHE_KEY)
+        # Midnight, a month ahead: every slot of the horizon is in the future
+        self.now = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=30), time(0, 0)))
+        self.first_day = timezone.localdate(self.now)
+        self.interviewer = self.create_interviewer('interviewer@example.com')
+        self.other = self.create_interviewer('other@example.com', working_hours_start=time(8, 30), working_hours_end=time(10, 0))
+        self.freelancer = Freelancer.objects.create(email='freelancer@example.com', password='x', full_name='Freelancer')
+        self.appointment = Appointment.objects.create(freelancer=self.freelancer, category='Backend')
+
+    def create_interviewer(self, email, **fields):
+        fields = {'type': 'soft_skills', 'interviews_per_week': 3, 'max_interviews_per_day': 1,
+                  'working_hours_start': time(9, 0), 'working_hours_end': time(12, 0), **fields}
+        interviewer = Interviewer.objects.create(email=email, password='x', full_name=email, **fields)
+        interview_slots.sync_interview_slots(interviewer, now=self.now)
+        return interviewer
+
+    def at(self, day, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.first_day + timedelta(days=day), time(hour, minute)))
+
+    def free_starts(self, interviewer, day):
+        return list(InterviewSlot.objects.filter(
+            interviewer=interviewer, start__date=self.first_day + timedelta(days=day), appointment__isnull=True, available=True,
+        ).order_by('start').values_list('start', flat=True))
+
+    def test_working_hours_are_expanded_into_slots(self):
+        self.assertEqual(InterviewSlot.objects.filter(interviewer=self.interviewer).count(), 14 * 3)
+        self.assertEqual(self.free_starts(self.other, 0), [self.at(0, 8, 30)])
+
+        self.interviewer.working_hours_end = time(10, 0)
+        self.interviewer.save()
+        interview_slots.sync_interview_slots(self.interviewer, now=self.now)
+        self.assertEqual(InterviewSlot.objects.filter(interviewer=self.interviewer).count(), 14)
+
+    def test_next_free_slots_in_one_query(self):
+        with self.assertNumQueries(1):
+            slots = interview_slots.next_free_slots([self.interviewer, self.other], 3, now=self.now)
+
+        self.assertEqual([(slot.interviewer_id, slot.start) for slot in slots], [
+            (self.other.pk, self.at(0, 8, 30)),
+            (self.interviewer.pk, self.at(0, 9)),
+            (self.interviewer.pk, self.at(0, 10)),
+        ])
+
+    def test_booking_fills_the_day_and_rescheduling_frees_it(self):
+        interview_slots.book_interview(self.appointment, self.interviewer, self.at(0, 10))
+
+        self.assertEqual(InterviewSlot.objects.get(appointment=self.appointment).start, self.at(0, 10))
+        self.assertEqual(self.free_starts(self.interviewer, 0), [])  # one interview per day
+        self.assertEqual(self.free_starts(self.interviewer, 1), [self.at(1, 9), self.at(1, 10), self.at(1, 11)])
+
+        interview_slots.book_interview(self.appointment, self.interviewer, self.at(1, 9).isoformat())
+
+        self.assertEqual(InterviewSlot.objects.get(appointment=self.appointment).start, self.at(1, 9))
+        self.assertEqual(self.free_starts(self.interviewer, 0), [self.at(0, 9), self.at(0, 10), self.at(0, 11)])
+        self.assertEqual(self.free_starts(self.interviewer, 1), [])
+
+    def test_unavailable_slots_are_refused(self):
+        interview_slots.book_interview(self.appointment, self.interviewer, self.at(0, 9))
+        other_appointment = Appointment.objects.create(freelancer=self.freelancer)
+
+        for start in (self.at(0, 9), self.at(0, 11), self.at(0, 9, 30)):
+            with self.assertRaises(interview_slots.SlotUnavailable):
+                interview_slots.book_interview(other_appointment, self.interviewer, start)
+        self.assertFalse(InterviewSlot.objects.filter(appointment=other_appointment).exists())
+
+    def test_full_week_closes_the_remaining_days(self):
+        monday = 7 - self.first_day.weekday()  # the next full week, inside the horizon
+        for day in range(monday, monday + 3):
+            interview_slots.book_interview(Appointment.objects.create(freelancer=self.freelancer), self.interviewer, self.at(day, 9))
+
+        self.assertEqual(self.free_starts(self.interviewer, monday + 3), [])
+        self.assertEqual(len(self.free_starts(self.interviewer, monday - 1)), 3)
+
+    def test_interviews_booked_before_the_calendar_take_their_slots(self):
+        InterviewSlot.objects.filter(interviewer=self.interviewer).delete()
+        self.appointment.appointment_date = self.at(0, 10, 15)
+        self.appointment.save()
+        FreelancerInterview.objects.create(interviewer=self.interviewer, freelancer=self.freelancer, appointment=self.appointment)
+
+        interview_slots.sync_interview_slots(self.interviewer, now=self.now)
+
+        self.assertEqual(InterviewSlot.objects.get(appointment=self.appointment).start, self.at(0, 10))
+        self.assertEqual(self.free_starts(self.interviewer, 0), [])  # one interview per day
+        with self.assertRaises(interview_slots.SlotUnavailable):
+            interview_slots.book_interview(Appointment.objects.create(freelancer=self.freelancer), self.interviewer, self.at(0, 9))
+
+    def test_appointment_options_for_a_new_interviewer(self):
+        InterviewSlot.objects.filter(interviewer=self.other).delete()
+
+        options = interview_slots.appointment_date_options([self.other], 2)
+
+        self.assertEqual([option['interviewer_id'] for option in options], [str(self.other.pk)] * 2)
+        self.assertTrue(InterviewSlot.objects.filter(interviewer=self.other).exists())
+
+    def pending_appointment(self, *starts):
+        options = [{'interviewer_id': str(interviewer.pk), 'date': timezone.localtime(start).strftime(interview_slots.OPTION_DATE_FORMAT)}
+                   for interviewer, start in starts]
+        return Appointment.objects.create(freelancer=self.freelancer, appointment_date_options=options)
+
+    def test_booking_withdraws_unbookable_options_in_one_update(self):
+        interviewer, other = self.interviewer, self.other
+        crowded = [self.pending_appointment((interviewer, self.at(0, 9)), (interviewer, self.at(0, 11)), (other, self.at(0, 8, 30)),
+                                            (interviewer, self.at(1, 9)), (other, self.at(1, 8, 30)))
+                   for _ in range(10)]
+        untouched = self.pending_appointment((other, self.at(0, 8, 30)))
+        start, _ = interview_slots.book_interview(self.appointment, interviewer, self.at(0, 9))
+
+        with self.assertNumQueries(3):  # the taken slots, the appointments offering them, the update
+            short = interview_slots.withdraw_unavailable_options(interviewer, start)
+
+        self.assertEqual(set(short), {appointment.id for appointment in crowded})
+        crowded[0].refresh_from_db()
+        self.assertEqual(crowded[0].appointment_date_options, [
+            {'interviewer_id': str(other.pk), 'date': timezone.localtime(self.at(0, 8, 30)).strftime(interview_slots.OPTION_DATE_FORMAT)},
+            {'interviewer_id': str(interviewer.pk), 'date': timezone.localtime(self.at(1, 9)).strftime(interview_slots.OPTION_DATE_FORMAT)},
+            {'interviewer_id': str(other.pk), 'date': timezone.localtime(self.at(1, 8, 30)).strftime(interview_slots.OPTION_DATE_FORMAT)},
+        ])
+        untouched.refresh_from_db()
+        self.assertEqual(len(untouched.appointment_date_options), 1)
+
+    def test_refresh_offers_a_fresh_set(self):
+        appointment = self.pending_appointment((self.interviewer, self.at(0, 9)))
+
+        self.assertEqual(interview_slots.refresh_appointment_date_options([appointment.id, self.appointment.id]), 2)
+
+        appointment.refresh_from_db()
+        self.assertEqual(len(appointment.appointment_date_options), interview_slots.OPTION_COUNT)
+        self.assertEqual(appointment.appointment_date_options[0]['interviewer_id'], str(self.other.pk))  # 8:30 comes first
+
+
+class SelectAppointmentDateViewTests(TestCase):
+
+    def setUp(self):
+        self.interviewer = Interviewer.objects.create(
+            email='interviewer@example.com', password='x', full_name='Interviewer', interviews_per_week=5,
+            max_interviews_per_day=5, working_hours_start=time(9, 0), working_hours_end=time(12, 0),
+        )
+        now = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), time(0, 0)))
+        interview_slots.sync_interview_slots(self.interviewer, now=now)
+        self.start = timezone.make_aware(datetime.combine(timezone.localdate(now), time(9, 0)))
+        self.freelancers = [
+            Freelancer.objects.create(email=f'freelancer{i}@example.com', password='x', full_name=f'Freelancer {i}')
+            for i in range(2)
+        ]
+
+    def book(self, freelancer):
+        appointment = Appointment.objects.create(freelancer=freelancer, category='Backend')
+        api = APIClient()
+        api.force_authenticate(user=freelancer)
+        # Notifications and cache invalidation are left in the captured on_commit callbacks
+        with self.captureOnCommitCallbacks():
+            return api.post(reverse('user:select-appointment'), {
+                'appointment_id': str(appointment.id),
+                'interviewer_id': str(self.interviewer.id),
+                'date': self.start.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            }, format='json')
+
+    def test_a_slot_is_booked_once(self):
+        response = self.book(self.freelancers[0])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.book(self.freelancers[1])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(FreelancerInterview.objects.count(), 1)
+        self.assertEqual(InterviewSlot.objects.get(start=self.start).appointment.freelancer, self.freelancers[0])
+
+    def test_booking_again_moves_the_interview(self):
+        other = Interviewer.objects.create(
+            email='other@example.com', password='x', full_name='Other', interviews_per_week=5,
+            max_interviews_per_day=5, working_hours_start=time(9, 0), working_hours_end=time(12, 0),
+        )
+        interview_slots.sync_interview_slots(other, now=self.start - timedelta(hours=9))
+        appointment = Appointment.objects.create(freelancer=self.freelancers[0], category='Backend')
+        api = APIClient()
+        api.force_authenticate(user=self.freelancers[0])
+
+        for interviewer in (self.interviewer, self.interviewer, other):  # a double submit, then a reschedule
+            with self.captureOnCommitCallbacks():
+                response = api.post(reverse('user:select-appointment'), {
+                    'appointment_id': str(appointment.id),
+                    'interviewer_id': str(interviewer.id),
+                    'date': self.start.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        interview = FreelancerInterview.objects.get(appointment=appointment)
+        self.assertEqual(interview.interviewer, other)
+        self.assertEqual(InterviewSlot.objects.get(appointment=appointment).interviewer, other)
+        capacity = {interviewer.pk: interviewer.interviews_today for interviewer in interviewer_capacity.interviewer_capacity(now=self.start)}
+        self.assertEqual(capacity, {self.interviewer.pk: 0, other.pk: 1})
+
+    def test_booking_updates_other_freelancers_options(self):
+        option = {'interviewer_id': str(self.interviewer.id), 'date': timezone.localtime(self.start).strftime(interview_slots.OPTION_DATE_FORMAT)}
+        later = {'interviewer_id': str(self.interviewer.id), 'date': timezone.localtime(self.start + timedelta(hours=1)).strftime(interview_slots.OPTION_DATE_FORMAT)}
+        waiting = Appointment.objects.create(freelancer=self.freelancers[1], appointment_date_options=[option, later])
+
+        self.assertEqual(self.book(self.freelancers[0]).status_code, status.HTTP_201_CREATED)
+
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.appointment_date_options, [later])
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Many freelancers booking one interviewer at once, each from its own thread and connection."""
+    threads = 12
+
+    def setUp(self):
+        self.interviewer = Interviewer.objects.create(
+            email='interviewer@example.com', password='x', full_name='Interviewer', interviews_per_week=10,
+            max_interviews_per_day=2, working_hours_start=time(8, 0), working_hours_end=time(20, 0),
+        )
+        now = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), time(0, 0)))
+        interview_slots.sync_interview_slots(self.interviewer, now=now)
+        self.day = timezone.localdate(now)
+        freelancer = Freelancer.objects.create(email='freelancer@example.com', password='x', full_name='Freelancer')
+        self.appointments = [Appointment.objects.create(freelancer=freelancer) for _ in range(self.threads)]
+
+    def hammer(self, start_for):
+        """Book every appointment at once; returns the number of bookings that went through."""
+        barrier = threading.Barrier(self.threads)
+        results = []
+
+        def book(index):
+            try:
+                barrier.wait()
+                while True:
+                    try:
+                        interview_slots.book_interview(self.appointments[index], self.interviewer, start_for(index))
+                        results.append('booked')
+                        break
+                    except interview_slots.SlotBusy:
+                        continue  # what a client does on 503
+                    except interview_slots.SlotUnavailable as e:
+                        results.append(type(e).__name__)
+                        break
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=book, args=(index,)) for index in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(results), self.threads)
+        return results.count('booked')
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, 0)))
+
+    def test_one_slot_is_booked_once(self):
+        self.assertEqual(self.hammer(lambda index: self.at(9)), 1)
+        self.assertEqual(InterviewSlot.objects.filter(appointment__isnull=False).count(), 1)
+
+    def test_daily_limit_holds_under_contention(self):
+        booked = self.hammer(lambda index: self.at(8 + index))
+
+        self.assertEqual(booked, self.interviewer.max_interviews_per_day)
+        self.assertEqual(InterviewSlot.objects.filter(appointment__isnull=False).count(), booked)
+        self.assertEqual(InterviewSlot.objects.filter(start__date=self.day, appointment__isnull=True, available=True).count(), 0)
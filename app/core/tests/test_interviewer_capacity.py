@@ -0,0 +1,67 @@
+from datetime import time, timedelta
+from django.test import TestCase
+from django.utils import timezone
+from core import interviewer_capacity
+from core.models import Appointment, Freelancer, FreelancerInterview, Interviewer, Services
+from core.redis_client import get_redis
+
+
+class InterviewerCapacityTests(TestCase):
+
+    def setUp(self):
+        get_redis().delete(interviewer_capacity.CACHE_KEY)
+        self.addCleanup(get_redis().delete, interviewer_capacity.CACHE_KEY)
+        self.freelancer = Freelancer.objects.create(email='freelancer@example.com', password='x', full_name='Freelancer')
+        self.busy = self.interviewer('busy@example.com')
+        self.free = self.interviewer('free@example.com')
+        self.full = self.interviewer('full@example.com', max_interviews_per_day=1)
+        self.interviewer('technical@example.com', type='technical')
+
+        now = timezone.now()
+        self.book(self.busy, now)
+        self.book(self.busy, now + timedelta(days=8))  # next week
+        self.book(self.busy, now, done=True)
+        self.book(self.full, now)
+
+    def interviewer(self, email, **fields):
+        fields = {'type': 'soft_skills', 'interviews_per_week': 5, 'max_interviews_per_day': 3,
+                  'working_hours_start': time(0, 0), 'working_hours_end': time(23, 59, 59), **fields}
+        return Interviewer.objects.create(email=email, password='x', full_name=email, **fields)
+
+    def book(self, interviewer, date, done=False):
+        appointment = Appointment.objects.create(freelancer=self.freelancer, appointment_date=date)
+        FreelancerInterview.objects.create(interviewer=interviewer, freelancer=self.freelancer, appointment=appointment, done=done)
+
+    def test_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            interviewers = {i.email: i for i in interviewer_capacity.interviewer_capacity(type='soft_skills')}
+
+        self.assertEqual(set(interviewers), {'busy@example.com', 'free@example.com', 'full@example.com'})
+        busy = interviewers['busy@example.com']
+        self.assertEqual((busy.interviews_this_week, busy.interviews_today), (1, 1))
+        self.assertEqual((busy.remaining_weekly_slots, busy.remaining_daily_slots), (4, 2))
+        self.assertEqual(interviewers['full@example.com'].remaining_daily_slots, 0)
+
+    def test_available_interviewers_order_and_free_slots(self):
+        self.assertEqual(interviewer_capacity.get_available_interviewers(type='soft_skills'), [self.free, self.busy, self.full])
+        self.assertEqual(interviewer_capacity.get_available_interviewers(type='soft_skills', with_free_slots=True), [self.free, self.busy])
+
+    def test_expertise_pool(self):
+        backend = Services.objects.create(name='Backend Development')
+        Interviewer.objects.filter(pk=self.busy.pk).update(expertise=backend)
+
+        self.assertEqual(interviewer_capacity.get_available_interviewers(expertise='backend'), [self.busy])
+
+    def test_cached_until_a_booking(self):
+        interviewer_capacity.get_available_interviewers(type='soft_skills')
+        self.book(self.free, timezone.now())
+        self.book(self.free, timezone.now())
+
+        with self.assertNumQueries(1):  # the interviewers themselves, no counts
+            cached = interviewer_capacity.get_available_interviewers(type='soft_skills')
+        self.assertEqual(cached, [self.free, self.busy, self.full])
+        self.assertEqual(cached[0].remaining_daily_slots, 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            interviewer_capacity.invalidate_interviewer_capacity()
+        self.assertEqual(interviewer_capacity.get_available_interviewers(type='soft_skills'), [self.busy, self.full, self.free])
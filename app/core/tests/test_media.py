@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import uploads
+from core.models import Chat, Client, Dispute, Freelancer, Message, Resume, ResumeCheck, ResumeChecker, SupportingDocument
+
+CONTENT = bytes(range(256)) * 40
+
+
+class MediaServingTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, UPLOAD_TEMP_DIR=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client_user = Client.objects.create(email='client@gmail.com', password='test123', company_name='Client Company')
+        self.freelancer_user = Freelancer.objects.create(email='freelancer@gmail.com', password='test123', full_name='Freelancer')
+        self.outsider = Freelancer.objects.create(email='outsider@gmail.com', password='test123', full_name='Outsider')
+        self.blob = uploads.store_uploaded_file(SimpleUploadedFile('evidence.pdf', CONTENT))
+        chat = Chat.objects.create(client=self.client_user, freelancer=self.freelancer_user)
+        self.message = Message.objects.create(chat=chat, sender=self.client_user, file=self.blob.file.name, blob=self.blob)
+        self.url = reverse('user:message-file', args=[self.message.id])
+
+    def api_for(self, user):
+        api = APIClient()
+        api.force_authenticate(user=user)
+        return api
+
+    def test_full_download_is_streamed(self):
+        response = self.api_for(self.freelancer_user).get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['ETag'], f'"{self.blob.sha256}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_pdf_is_inline_and_sandboxed(self):
+        response = self.api_for(self.freelancer_user).get(self.url)
+
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertEqual(response['Content-Security-Policy'], 'sandbox')
+
+    def test_active_content_is_downloaded(self):
+        for name in ('page.html', 'drawing.svg'):
+            blob = uploads.store_uploaded_file(SimpleUploadedFile(name, b"<script>alert(1)</script>" + name.encode()))
+            message = Message.objects.create(chat=self.message.chat, sender=self.client_user, file=blob.file.name, blob=blob)
+
+            response = self.api_for(self.freelancer_user).get(reverse('user:message-file', args=[message.id]))
+
+            self.assertTrue(response['Content-Disposition'].startswith('attachment'), name)
+            self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+            self.assertEqual(response['Content-Security-Policy'], 'sandbox')
+
+    def test_range_requests(self):
+        api = self.api_for(self.freelancer_user)
+
+        response = api.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[100:200])
+        self.assertEqual(response['Content-Range'], f"bytes 100-199/{len(CONTENT)}")
+        self.assertEqual(response['Content-Length'], '100')
+
+        response = api.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[-10:])
+
+        response = api.get(self.url, HTTP_RANGE='bytes=10000-')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[10000:])
+
+        response = api.get(self.url, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f"bytes */{len(CONTENT)}")
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.api_for(self.freelancer_user).get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    def test_if_none_match(self):
+        response = self.api_for(self.freelancer_user).get(self.url, HTTP_IF_NONE_MATCH=f'"{self.blob.sha256}"')
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_only_participants_can_download(self):
+        self.assertEqual(self.api_for(self.outsider).get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(APIClient().get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(MEDIA_ACCEL_MODE='x-accel-redirect', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_x_accel_redirect(self):
+        response = self.api_for(self.client_user).get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], f"/protected-media/{self.blob.file.name}")
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_ACCEL_MODE='x-sendfile')
+    def test_x_sendfile(self):
+        response = self.api_for(self.client_user).get(self.url)
+
+        self.assertEqual(response['X-Sendfile'], self.blob.file.path)
+        self.assertEqual(response.content, b'')
+
+    def test_supporting_document_permissions(self):
+        dispute = Dispute.objects.create(title="Late", description="Late", return_type='full', client=self.client_user, freelancer=self.freelancer_user)
+        document = SupportingDocument.objects.create(file=self.blob.file.name, blob=self.blob, dispute=dispute, uploaded_by=self.client_user)
+        url = reverse('project:supporting-document-file', args=[document.id])
+
+        self.assertEqual(self.api_for(self.freelancer_user).get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.api_for(self.outsider).get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_resume_permissions(self):
+        resume = Resume.objects.create(full_name="Jane", email='Freelancer@gmail.com', password='x', resume_file=self.blob.file.name, blob=self.blob)
+        checker = ResumeChecker.objects.create(email='checker@gmail.com', password='test123', full_name='Checker')
+        url = reverse('resume-file', args=[resume.id])
+
+        self.assertEqual(self.api_for(self.freelancer_user).get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.api_for(checker).get(url).status_code, status.HTTP_403_FORBIDDEN)
+        ResumeCheck.objects.create(resume=resume, resumechecker=checker)
+        self.assertEqual(self.api_for(checker).get(url).status_code, status.HTTP_200_OK)
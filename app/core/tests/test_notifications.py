@@ -0,0 +1,74 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core.models import Notification, OutboundEmail
+from core.notifications import EMAIL, IN_APP, notify, notify_many
+
+
+class NotifyTests(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.client_user = User.objects.create_user(email="client@example.com", password="testpass")
+        self.freelancer = User.objects.create_user(email="freelancer@example.com", password="testpass")
+
+    def test_notify_writes_rows_in_one_insert(self):
+        with self.assertNumQueries(2):  # dedupe lookup + bulk insert
+            created = notify([self.client_user, self.freelancer], "Dispute Resolved", "Client won")
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(
+            set(Notification.objects.values_list('user__email', 'type', 'title')),
+            {("client@example.com", 'alert', "Dispute Resolved"), ("freelancer@example.com", 'alert', "Dispute Resolved")},
+        )
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_email_channel_queues_outbox(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            notify(self.freelancer, "Contract Offer", "You have received a contract offer.", channels=(IN_APP, EMAIL))
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to_email, "freelancer@example.com")
+        self.assertEqual(email.subject, "Contract Offer")
+        self.assertIn("You have received a contract offer.", email.html_content)
+        # Unread counter adjustment and one outbox drain
+        self.assertEqual(len(callbacks), 2)
+
+    def test_email_only(self):
+        notify(self.freelancer, "Contract Offer", "Offer", channels=(EMAIL,), email_subject="Offer!", email_html="<p>Offer</p>")
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(OutboundEmail.objects.get().subject, "Offer!")
+
+    def test_duplicates_within_window_are_skipped(self):
+        notify(self.client_user, "Contract status updated", "Accepted", channels=(IN_APP, EMAIL))
+        created = notify([self.client_user, self.freelancer], "Contract status updated", "Accepted", channels=(IN_APP, EMAIL))
+
+        self.assertEqual([notification.user_id for notification in created], [self.freelancer.id])
+        self.assertEqual(Notification.objects.filter(user=self.client_user).count(), 1)
+        self.assertEqual(OutboundEmail.objects.filter(to_email="client@example.com").count(), 1)
+
+        # Different data or an expired window is a new notification
+        self.assertEqual(len(notify(self.client_user, "Contract status updated", "Accepted", data={'id': 1})), 1)
+        Notification.objects.update(timestamp=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(len(notify(self.client_user, "Contract status updated", "Accepted")), 1)
+
+    @override_settings(NOTIFICATION_DEDUPE_WINDOW=0)
+    def test_dedupe_can_be_disabled(self):
+        notify(self.client_user, "Ping", "Ping")
+        notify(self.client_user, "Ping", "Ping")
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_notify_many_mixes_payloads(self):
+        created = notify_many([
+            {'users': self.client_user, 'title': "Dispute Created", 'description': "For you"},
+            {'users': [self.freelancer, None], 'title': "Dispute Created", 'description': "By you"},
+        ])
+        self.assertEqual(
+            sorted(notification.description for notification in created), ["By you", "For you"],
+        )
+
+    def test_unknown_channel(self):
+        with self.assertRaises(ValueError):
+            notify(self.client_user, "Ping", "Ping", channels=('sms',))
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core import roles
+from core.models import Appointment, Client, DisputeManager, Freelancer, Interviewer, ResumeChecker
+
+
+class RoleResolutionTests(TestCase):
+
+    def setUp(self):
+        self.freelancer = Freelancer.objects.create_user(email='freelancer@example.com', password='testpass', full_name='Freelancer')
+
+    def test_subclass_creation_records_role(self):
+        users = [
+            self.freelancer,
+            Client.objects.create(email='client@example.com', password='x', company_name='Client Company'),
+            Interviewer.objects.create(email='interviewer@example.com', password='x', full_name='Interviewer'),
+            DisputeManager.objects.create(email='manager@example.com', password='x', full_name='Manager'),
+            ResumeChecker.objects.create(email='checker@example.com', password='x', full_name='Checker'),
+        ]
+        expected = [roles.FREELANCER, roles.CLIENT, roles.INTERVIEWER, roles.DISPUTE_MANAGER, roles.RESUME_CHECKER]
+
+        self.assertEqual([get_user_model().objects.get(pk=user.pk).role for user in users], expected)
+        self.assertEqual(get_user_model().objects.create_user(email='admin@example.com', password='x').role, '')
+
+    def test_login_returns_role_and_token_claim(self):
+        with self.assertNumQueries(2):  # the user, the assessment probe
+            response = APIClient().post(reverse('user:login'), {'email': 'freelancer@example.com', 'password': 'testpass'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['role'], roles.FREELANCER)
+        self.assertEqual(AccessToken(response.data['token']['access'])[roles.ROLE_CLAIM], roles.FREELANCER)
+
+    def test_token_obtain_carries_role_claim(self):
+        response = APIClient().post(reverse('user:token_obtain_pair'), {'email': 'freelancer@example.com', 'password': 'testpass'})
+
+        self.assertEqual(AccessToken(response.data['access'])[roles.ROLE_CLAIM], roles.FREELANCER)
+
+    def test_role_view_without_probe_queries(self):
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.freelancer)}")
+
+        with self.assertNumQueries(2):  # the token's user, the assessment probe
+            response = api.get(reverse('user:user-role'))
+        self.assertEqual(response.data['role'], roles.FREELANCER)
+
+    def test_role_claim_of_a_long_lived_token_is_not_trusted(self):
+        token = roles.add_role_claim(AccessToken.for_user(self.freelancer), self.freelancer)
+        token[roles.ROLE_CLAIM] = roles.DISPUTE_MANAGER  # a role revoked since the token was issued
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        response = api.get(reverse('user:user-role'))
+        self.assertEqual(response.data['role'], roles.FREELANCER)
+
+    def test_user_type(self):
+        response = APIClient().post(reverse('user:user-type'), {'user_id': str(self.freelancer.id)})
+
+        self.assertEqual(response.data['user_type'], roles.FREELANCER)
+
+    def test_appointments_branch_on_role(self):
+        Appointment.objects.create(freelancer=self.freelancer)
+        api = APIClient()
+        api.force_authenticate(user=self.freelancer)
+
+        with self.assertNumQueries(1):
+            response = api.get(reverse('appointment-list'))
+        self.assertEqual(len(response.data), 1)
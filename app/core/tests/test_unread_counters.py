@@ -0,0 +1,82 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.test import APIClient
+from core import unread_counters
+from core.models import Chat, Client, Freelancer, Notification
+from core.notifications import notify
+from core.redis_client import get_redis
+from core.tasks import reconcile_unread_counters
+from core.unread_counters import MESSAGES, NOTIFICATIONS, counter_key, get_unread_count
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="testpass")
+        self.clear_counters(self.user.id)
+
+    def clear_counters(self, user_id):
+        keys = [counter_key(MESSAGES, user_id), counter_key(NOTIFICATIONS, user_id)]
+        get_redis().delete(*keys)
+        self.addCleanup(get_redis().delete, *keys)
+
+    def test_missing_counter_is_rebuilt_from_sql(self):
+        Notification.objects.create(user=self.user, type='alert', title="A", description="A")
+        Notification.objects.create(user=self.user, type='alert', title="B", description="B", read=True)
+
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
+        self.assertEqual(get_redis().get(counter_key(NOTIFICATIONS, self.user.id)), '1')
+
+        # Served from Redis without touching the database
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
+
+    def test_notify_and_mark_read_adjust_counter(self):
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = notify(self.user, "Contract Offer", "Offer")[0]
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
+
+        api = APIClient()
+        api.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            api.patch(reverse('user:notification-detail', args=[notification.id]), {'read': True}, format='json')
+        response = api.get(reverse('user:unread_notification_count'))
+        self.assertEqual(response.data['count'], 0)
+
+    def test_adjustment_without_counter_is_ignored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            unread_counters.adjust_unread_counts(NOTIFICATIONS, {self.user.id: 5})
+        self.assertIsNone(get_redis().get(counter_key(NOTIFICATIONS, self.user.id)))
+
+    def test_message_counter(self):
+        client = Client.objects.create(email='client@gmail.com', password='test123', company_name='Client Company')
+        freelancer = Freelancer.objects.create(email='freelancer@gmail.com', password='test123', full_name='Freelancer')
+        self.clear_counters(freelancer.id)
+        chat = Chat.objects.create(client=client, freelancer=freelancer)
+        self.assertEqual(get_unread_count(MESSAGES, freelancer.id), 0)
+
+        api = APIClient()
+        api.force_authenticate(user=client)
+        with self.captureOnCommitCallbacks(execute=True):
+            api.post(reverse('user:chat-messages-list', kwargs={'chat_pk': chat.id}), {'content': "Hi"})
+        self.assertEqual(get_redis().get(counter_key(MESSAGES, freelancer.id)), '1')
+
+        api.force_authenticate(user=freelancer)
+        self.assertEqual(api.get(reverse('user:unread_message_count')).data['count'], 1)
+
+    def test_reconcile_fixes_drift(self):
+        Notification.objects.create(user=self.user, type='alert', title="A", description="A")
+        get_redis().set(counter_key(NOTIFICATIONS, self.user.id), 7)
+
+        self.assertGreaterEqual(reconcile_unread_counters(), 1)
+        self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
+
+    def test_falls_back_to_sql_when_redis_is_down(self):
+        Notification.objects.create(user=self.user, type='alert', title="A", description="A")
+        with patch('core.unread_counters.get_redis') as redis_client:
+            redis_client.return_value.get.side_effect = RedisConnectionError("down")
+            self.assertEqual(get_unread_count(NOTIFICATIONS, self.user.id), 1)
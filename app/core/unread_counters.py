@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from redis.exceptions import RedisError
+from core import models
+from core.redis_client import get_redis
+
+MESSAGES = 'messages'
+NOTIFICATIONS = 'notifications'
+KEY_PREFIX = 'unread'
+
+# Adjust a counter only if it exists: a missing counter is rebuilt from SQL, which already includes the change
+ADJUST_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return nil
+end
+local value = redis.call('incrby', KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call('set', KEYS[1], 0)
+    value = 0
+end
+redis.call('expire', KEYS[1], ARGV[2])
+return value
+"""
+
+
+def counter_key(kind, user_id):
+    return f"{KEY_PREFIX}:{kind}:{user_id}"
+
+
+def counter_ttl():
+    return getattr(settings, 'UNREAD_COUNTER_TTL', 7 * 24 * 60 * 60)
+
+
+def count_from_db(kind, user_ids):
+    """{user id string: unread count} from SQL, for users without a counter and for reconciliation."""
+    counts = {str(user_id): 0 for user_id in user_ids}
+    if kind == NOTIFICATIONS:
+        rows = models.Notification.objects.filter(user_id__in=user_ids, read=False).values('user_id').annotate(count=Count('id'))
+        for row in rows:
+            counts[str(row['user_id'])] = row['count']
+    elif kind == MESSAGES:
+        # The chats' denormalized counters, one side per participant
+        for user_field, count_field in (('client_id', 'client_unread_count'), ('freelancer_id', 'freelancer_unread_count')):
+            rows = models.Chat.objects.filter(**{f"{user_field}__in": user_ids}).values(user_field).annotate(count=Sum(count_field))
+            for row in rows:
+                counts[str(row[user_field])] += row['count'] or 0
+    else:
+        raise ValueError(f"Unknown unread counter {kind}")
+    return counts
+
+
+def get_unread_count(kind, user_id):
+    """Read a user's unread counter from Redis, rebuilding it from SQL when it is missing or Redis is down."""
+    key = counter_key(kind, user_id)
+    try:
+        value = get_redis().get(key)
+        if value is not None:
+            return int(value)
+    except RedisError as e:
+        print(f"Error reading unread counter {key}: {e}")
+        return count_from_db(kind, [user_id])[str(user_id)]
+
+    count = count_from_db(kind, [user_id])[str(user_id)]
+    try:
+        # NX: keep a counter another request rebuilt in the meantime
+        get_redis().set(key, count, ex=counter_ttl(), nx=True)
+    except RedisError as e:
+        print(f"Error storing unread counter {key}: {e}")
+    return count
+
+
+def adjust_unread_counts(kind, deltas):
+    """Apply {user id: delta} to the users' counters once the current transaction commits."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if user_id and delta}
+    if not deltas:
+        return
+
+    def apply():
+        try:
+            redis_client = get_redis()
+            adjust = redis_client.register_script(ADJUST_SCRIPT)
+            pipeline = redis_client.pipeline(transaction=False)
+            for user_id, delta in deltas.items():
+                adjust(keys=[counter_key(kind, user_id)], args=[delta, counter_ttl()], client=pipeline)
+            pipeline.execute()
+        except RedisError as e:
+            # The counters are corrected by the reconcile task
+            print(f"Error adjusting unread {kind} counters: {e}")
+    transaction.on_commit(apply)
+
+
+def reconcile_unread_counts(batch_size=500):
+    """Overwrite every existing counter with its SQL value. Returns the number of counters corrected."""
+    redis_client = get_redis()
+    corrected = 0
+    for kind in (MESSAGES, NOTIFICATIONS):
+        keys = redis_client.scan_iter(match=counter_key(kind, '*'), count=batch_size)
+        batch = []
+        for key in keys:
+            batch.append(key)
+            if len(batch) >= batch_size:
+                corrected += reconcile_batch(redis_client, kind, batch)
+                batch = []
+        if batch:
+            corrected += reconcile_batch(redis_client, kind, batch)
+    return corrected
+
+
+def reconcile_batch(redis_client, kind, keys):
+    user_ids = [key.rsplit(':', 1)[1] for key in keys]
+    cached = redis_client.mget(keys)
+    counts = count_from_db(kind, user_ids)
+    pipeline = redis_client.pipeline(transaction=False)
+    corrected = 0
+    for key, user_id, value in zip(keys, user_ids, cached):
+        if value is not None and int(value) != counts[user_id]:
+            pipeline.set(key, counts[user_id], ex=counter_ttl())
+            corrected += 1
+    pipeline.execute()
+    return corrected
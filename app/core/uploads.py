@@ -0,0 +1,280 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.db.models.deletion import ProtectedError
+from django.utils import timezone
+from core import models
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class UploadError(ValueError):
+    """An upload request that can't be applied; the message is safe to return to the client."""
+    status_code = 400
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+class UploadRateLimited(UploadError):
+    """The user opened too many sessions or declared too many bytes recently."""
+    status_code = 429
+
+
+class UploadConflict(UploadError):
+    """The chunk doesn't start at the session's offset, or another chunk is being written."""
+    status_code = 409
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+def max_upload_size():
+    return getattr(settings, 'UPLOAD_MAX_SIZE', 100 * 1024 * 1024)
+
+
+def max_chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 8 * 1024 * 1024)
+
+
+def upload_rate_limits():
+    """(sessions per hour, declared bytes per day) a user may open."""
+    return (
+        getattr(settings, 'UPLOAD_SESSIONS_PER_HOUR', 30),
+        getattr(settings, 'UPLOAD_BYTES_PER_DAY', 1024 * 1024 * 1024),
+    )
+
+
+def temp_dir():
+    path = getattr(settings, 'UPLOAD_TEMP_DIR', os.path.join(settings.BASE_DIR, 'upload_parts'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def part_path(upload):
+    return os.path.join(temp_dir(), f"{upload.id}.part")
+
+
+def blob_name(sha256, filename=''):
+    # Two directory levels keep any one directory small; the extension lets media serving pick a content type
+    extension = os.path.splitext(filename)[1].lower()
+    if not extension[1:].isalnum() or len(extension) > 10:
+        extension = ''
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(COPY_BUFFER_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_blob(path, sha256, size, filename=''):
+    """Move a fully written local file into blob storage, or drop it when the same content is already stored."""
+    blob = models.Blob.objects.filter(sha256=sha256).first()
+    if blob:
+        os.remove(path)
+        return blob
+
+    name = blob_name(sha256, filename)
+    try:
+        target = default_storage.path(name)
+    except NotImplementedError:
+        # Remote storages: upload a copy under the content address
+        if not default_storage.exists(name):
+            with open(path, 'rb') as source:
+                default_storage.save(name, File(source))
+        os.remove(path)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Concurrent uploads of the same content write identical bytes, so overwriting is safe
+        file_move_safe(path, target, allow_overwrite=True)
+
+    try:
+        with transaction.atomic():
+            return models.Blob.objects.create(sha256=sha256, size=size, file=name)
+    except IntegrityError:
+        return models.Blob.objects.get(sha256=sha256)
+
+
+def store_uploaded_file(uploaded_file):
+    """Store a file from a multipart request as a blob, hashing it while it is copied."""
+    digest = hashlib.sha256()
+    size = 0
+    handle, path = tempfile.mkstemp(dir=temp_dir(), suffix='.part')
+    try:
+        with os.fdopen(handle, 'wb') as target:
+            for chunk in uploaded_file.chunks(COPY_BUFFER_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                target.write(chunk)
+        return store_blob(path, digest.hexdigest(), size, uploaded_file.name or '')
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def start_upload(user, filename, size, sha256=''):
+    """Open an upload session of an authenticated user for a file of `size` bytes."""
+    if size <= 0:
+        raise UploadError("size must be a positive number of bytes.")
+    if size > max_upload_size():
+        raise UploadTooLarge(f"Files are limited to {max_upload_size()} bytes.")
+    sessions_per_hour, bytes_per_day = upload_rate_limits()
+    now = timezone.now()
+    recent = models.Upload.objects.filter(user_id=user.id, created_at__gte=now - timedelta(days=1)).aggregate(
+        sessions=Count('id', filter=Q(created_at__gte=now - timedelta(hours=1))),
+        declared=Sum('size'),
+    )
+    if recent['sessions'] >= sessions_per_hour:
+        raise UploadRateLimited(f"At most {sessions_per_hour} uploads can be started per hour.")
+    if (recent['declared'] or 0) + size > bytes_per_day:
+        raise UploadRateLimited(f"At most {bytes_per_day} bytes can be uploaded per day.")
+    upload = models.Upload.objects.create(
+        user_id=user.id,
+        filename=os.path.basename(filename)[:255],
+        size=size,
+        sha256=sha256.lower(),
+    )
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def write_chunk(upload_id, offset, stream):
+    """
+    Append the bytes read from `stream` at `offset` and return the session.
+    The body is copied to disk in small buffers, so a chunk is never held in memory.
+    """
+    with transaction.atomic():
+        try:
+            upload = models.Upload.objects.select_for_update(nowait=True).get(pk=upload_id)
+        except DatabaseError:
+            offset_now = models.Upload.objects.filter(pk=upload_id).values_list('offset', flat=True).first()
+            raise UploadConflict("Another chunk of this upload is being written.", offset_now)
+        if upload.status != 'uploading':
+            raise UploadError("This upload is already complete.")
+        if offset != upload.offset:
+            raise UploadConflict("Upload-Offset does not match the bytes received.", upload.offset)
+
+        limit = min(max_chunk_size(), upload.size - upload.offset)
+        written = 0
+        with open(part_path(upload), 'r+b') as part:
+            # Drop the bytes of an interrupted chunk that were never acknowledged
+            part.seek(offset)
+            part.truncate()
+            while True:
+                data = stream.read(COPY_BUFFER_SIZE) if stream else b''
+                if not data:
+                    break
+                written += len(data)
+                if written > limit:
+                    raise UploadTooLarge(f"A chunk may hold at most {limit} more bytes.")
+                part.write(data)
+
+        upload.offset += written
+        upload.save(update_fields=['offset', 'updated_at'])
+    return upload
+
+
+def complete_upload(upload_id):
+    """Verify a fully received upload and turn it into a blob. Completing twice returns the same blob."""
+    with transaction.atomic():
+        upload = models.Upload.objects.select_for_update().get(pk=upload_id)
+        if upload.status == 'complete':
+            return upload
+        if upload.offset != upload.size:
+            raise UploadConflict("The upload is incomplete.", upload.offset)
+
+        path = part_path(upload)
+        sha256 = file_digest(path)
+        if upload.sha256 and upload.sha256 != sha256:
+            checksum_mismatch = True
+            upload.offset = 0
+            open(path, 'wb').close()
+        else:
+            checksum_mismatch = False
+            upload.blob = store_blob(path, sha256, upload.size, upload.filename)
+            upload.status = 'complete'
+        upload.save(update_fields=['offset', 'blob', 'status', 'updated_at'])
+    if checksum_mismatch:
+        raise UploadError("The file does not match its sha256 checksum; upload it again.")
+    return upload
+
+
+def completed_blobs(upload_ids, user):
+    """Blobs of the user's completed uploads, in the order of `upload_ids`."""
+    try:
+        upload_ids = [uuid.UUID(str(upload_id)) for upload_id in upload_ids]
+    except ValueError:
+        raise UploadError("Upload ids must be UUIDs.")
+    user_id = user.id if user and user.is_authenticated else None
+    uploads = {
+        upload.id: upload
+        for upload in models.Upload.objects.filter(id__in=upload_ids, status='complete').select_related('blob')
+        if user_id is not None and upload.user_id == user_id
+    }
+    missing = [str(upload_id) for upload_id in upload_ids if upload_id not in uploads]
+    if missing:
+        raise UploadError(f"Unknown or incomplete uploads: {', '.join(missing)}")
+    return [uploads[upload_id].blob for upload_id in upload_ids]
+
+
+def attachment_blob(upload_id, uploaded_file, user):
+    """The blob for a file given either as a completed upload id or as a multipart file, or None for neither."""
+    if upload_id:
+        return completed_blobs([upload_id], user)[0]
+    if uploaded_file:
+        return store_uploaded_file(uploaded_file)
+    return None
+
+
+def purge_stale_uploads():
+    """Delete upload sessions untouched for UPLOAD_SESSION_TTL seconds, with their part files. Returns the count."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'UPLOAD_SESSION_TTL', 24 * 60 * 60))
+    stale = list(models.Upload.objects.filter(updated_at__lt=cutoff))
+    for upload in stale:
+        path = part_path(upload)
+        if os.path.exists(path):
+            os.remove(path)
+    models.Upload.objects.filter(id__in=[upload.id for upload in stale]).delete()
+    return len(stale)
+
+
+def purge_unreferenced_blobs():
+    """
+    Delete blobs older than UPLOAD_SESSION_TTL seconds that no message, supporting document, resume or
+    upload session references, with their files. Returns the count.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'UPLOAD_SESSION_TTL', 24 * 60 * 60))
+    referencing = (models.Message, models.SupportingDocument, models.Resume, models.Upload)
+    candidates = models.Blob.objects.filter(created_at__lt=cutoff)
+    for model in referencing:
+        candidates = candidates.exclude(Exists(model.objects.filter(blob=OuterRef('pk'))))
+
+    purged = 0
+    for blob_id in candidates.values_list('id', flat=True).iterator():
+        try:
+            with transaction.atomic():
+                blob = models.Blob.objects.select_for_update(skip_locked=True).filter(pk=blob_id).first()
+                if blob is None:
+                    continue
+                name = blob.file.name
+                # PROTECT refuses the delete if the blob was attached since the candidates were listed
+                blob.delete()
+                transaction.on_commit(lambda name=name: default_storage.delete(name))
+            purged += 1
+        except ProtectedError:
+            continue
+    return purged
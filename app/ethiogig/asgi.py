@@ -2,6 +2,9 @@
 ASGI config for ethiogig project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+It only serves the WebSocket connections of the Channels consumers in user.routing (run with daphne).
+HTTP is served over WSGI: Django's ASGI handler reads synchronous streaming responses into memory
+before sending them, which would buffer the search stream and file downloads.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -9,8 +12,20 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ethiogig.settings')
 
-application = get_asgi_application()
+# Initialize Django before importing code that uses the ORM
+django.setup()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
+from user.middleware import JWTAuthMiddleware
+from user.routing import websocket_urlpatterns
+
+application = ProtocolTypeRouter({
+    'websocket': AllowedHostsOriginValidator(
+        JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+    ),
+})
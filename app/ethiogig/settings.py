@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'interview',
     'assessment',
+    'channels',
 ]
 
 
@@ -59,6 +60,43 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+# Redis for application data such as search job results (separate db from the Celery broker)
+REDIS_URL = 'redis://redis:6379/1'
+# WebSocket fan-out between ASGI workers (chat messages, read receipts, unread counters)
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': ['redis://redis:6379/2'],
+        },
+    },
+}
+
+
+# AI freelancer scoring: candidates per prompt, concurrent prompts and per-call timeout (seconds)
+AI_SCORING_BATCH_SIZE = 20
+AI_SCORING_MAX_WORKERS = 4
+AI_SCORING_TIMEOUT = 30
+# Freelancer search: candidates passed from the SQL ranking stage to the AI reranker
+AI_RERANK_TOP_K = 50
+FREELANCER_SEARCH_PAGE_SIZE = 10
+# Seconds that asynchronous search job results are kept in Redis
+FREELANCER_SEARCH_JOB_TTL = 60 * 60
+# Persistent AI score cache: entry lifetime (seconds) and maximum rows kept by the prune task
+AI_SCORE_CACHE_TTL = 7 * 24 * 60 * 60
+AI_SCORE_CACHE_MAX_ENTRIES = 50000
+# Semantic freelancer matching: embedder class and on-disk vector index location
+FREELANCER_EMBEDDER = 'services.embeddings.HashingEmbedder'
+FREELANCER_EMBEDDING_DIM = 256
+FREELANCER_EMBEDDING_INDEX_DIR = os.path.join(BASE_DIR, 'embeddings')
+# Resume PDF extraction budget; documents with many pages are split across a process pool
+RESUME_EXTRACTION_MAX_PAGES = 20
+RESUME_EXTRACTION_MAX_CHARS = 50000
+RESUME_EXTRACTION_PARALLEL_MIN_PAGES = 8
+RESUME_EXTRACTION_MAX_WORKERS = 4
+RESUME_EXTRACTION_TIMEOUT = 60
+# Hard limit of the screening extract stage (Celery soft_time_limit, seconds); the serial timeout is only checked between pages
+RESUME_EXTRACTION_TASK_TIME_LIMIT = 120
 
 
 MIDDLEWARE = [
@@ -101,6 +139,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'ethiogig.wsgi.application'
+# WebSockets only (ws/); HTTP stays on WSGI so streamed responses are not buffered by the ASGI handler
+ASGI_APPLICATION = 'ethiogig.asgi.application'
 
 
 # Database
@@ -161,6 +201,19 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Chunked uploads: part files live outside MEDIA_ROOT until they are complete
+UPLOAD_TEMP_DIR = os.path.join(BASE_DIR, 'upload_parts')
+UPLOAD_MAX_SIZE = 100 * 1024 * 1024
+UPLOAD_CHUNK_MAX_SIZE = 8 * 1024 * 1024
+UPLOAD_SESSION_TTL = 24 * 60 * 60
+# Per-user upload rate limits (core.uploads.start_upload)
+UPLOAD_SESSIONS_PER_HOUR = 30
+UPLOAD_BYTES_PER_DAY = 1024 * 1024 * 1024
+
+# Media downloads: None streams from Python, 'x-accel-redirect' (nginx) or 'x-sendfile' hands the transfer to the web server
+MEDIA_ACCEL_MODE = os.environ.get('MEDIA_ACCEL_MODE') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -174,7 +227,7 @@ SPECTACULAR_SETTINGS = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.JWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS':'drf_spectacular.openapi.AutoSchema',
     "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
@@ -184,8 +237,16 @@ REST_FRAMEWORK = {
 from datetime import timedelta
 
 
+# Access tokens carrying the role claim authenticate without loading the user; the row is read only when
+# a view touches user fields, which is also when deleted or deactivated accounts are rejected. Off by default;
+# set JWT_STATELESS_USER=1 in the environment to enable it. Access tokens then live JWT_STATELESS_MAX_TOKEN_LIFETIME
+# instead of 60 days, since until they expire a deleted or deactivated user stays authenticated, and clients renew
+# them at /api/user/token/refresh/, which reads the user and its current role again
+JWT_STATELESS_USER = os.environ.get('JWT_STATELESS_USER', '').lower() in ('1', 'true')
+JWT_STATELESS_MAX_TOKEN_LIFETIME = timedelta(minutes=15)
+
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=60),
+    'ACCESS_TOKEN_LIFETIME': JWT_STATELESS_MAX_TOKEN_LIFETIME if JWT_STATELESS_USER else timedelta(days=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=120),
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': True,
@@ -213,4 +274,27 @@ EMAIL_USE_SSL = False  # Set to `True` if using port 465
 EMAIL_HOST_USER =  os.getenv('SENDGRID_API_KEY')  # Required by SendGrid
 EMAIL_HOST_PASSWORD = os.getenv('SENDGRID_API_KEY')  # Securely fetch from .env
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'default@example.com')  # Fallback value
+
+# Email outbox (core.emails): queued rows are delivered by core.tasks.drain_email_outbox
+EMAIL_OUTBOX_BACKEND = os.getenv('EMAIL_OUTBOX_BACKEND', 'core.emails.SendGridBackend')
+EMAIL_OUTBOX_FILE_PATH = os.path.join(BASE_DIR, 'outbox.jsonl')  # used by core.emails.FileBackend
+EMAIL_OUTBOX_BATCH_SIZE = 500
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_BACKOFF = 60  # seconds, doubled on every failed attempt
+EMAIL_OUTBOX_LEASE = 600  # seconds before a claim left by a crashed worker is retried
+EMAIL_OUTBOX_TIMEOUT = 10
+# Identical notifications to the same user within this many seconds are dropped (core.notifications)
+NOTIFICATION_DEDUPE_WINDOW = 60
+# Per-user unread message/notification counters in Redis expire after this many idle seconds
+UNREAD_COUNTER_TTL = 7 * 24 * 60 * 60
+# Interviewer capacity (core.interviewer_capacity) is cached this many seconds, or until the next booking
+INTERVIEWER_CAPACITY_CACHE_TTL = 60
+# Interview calendar (core.interview_slots): slot length and how many days ahead slots are materialized
+INTERVIEW_SLOT_MINUTES = 60
+INTERVIEW_SLOT_HORIZON_DAYS = 14
+# Concurrent bookings of an interviewer wait this many milliseconds for each other before answering 503
+INTERVIEW_BOOKING_LOCK_TIMEOUT = 2000
+# Chat history pages (user.pagination)
+CHAT_MESSAGES_PAGE_SIZE = 50
+CHAT_MESSAGES_MAX_PAGE_SIZE = 200
 FRONTEND_URL = "http://localhost:3000/"
\ No newline at end of file
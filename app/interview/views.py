@@ -1,15 +1,16 @@
 from rest_framework.permissions import IsAuthenticated
 from core.models import Appointment, FreelancerInterview, Interviewer
 from .serializers import AppointmentSerializer, FreelancerInterviewSerializer, InterviewerSerializer , AppointmentDateSelectionSerializer
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import JWTAuthentication
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework import viewsets, generics, status 
 from core import models
 from core import models
 from django.conf import settings
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from core import roles
+from core.interviewer_capacity import invalidate_interviewer_capacity
+from core.notifications import EMAIL, IN_APP, notify_many
 
 
 
@@ -21,12 +22,13 @@ class AppointmentViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        role = roles.get_role(self.request)
         # Check if the user is a Freelancer
-        if models.Freelancer.objects.filter(id=user.id).exists():
+        if role == roles.FREELANCER:
             return Appointment.objects.filter(freelancer=user).order_by('-appointment_date')
 
         # Check if the user is an Interviewer
-        elif Interviewer.objects.filter(id=user.id).exists():
+        elif role == roles.INTERVIEWER:
             # Get freelancers associated with the interviewer via FreelancerInterview
             freelancers = FreelancerInterview.objects.filter(interviewer=user).values_list('freelancer', flat=True)
             return Appointment.objects.filter(freelancer__in=freelancers).order_by('-appointment_date')
@@ -36,27 +38,6 @@ class AppointmentViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 
-def send_email(to_email, subject, html_content):
-    print("to email is ",to_email)
-    print("subject is ",subject)
-    print("html_content is ",html_content)
-    message = Mail(
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
-    )
-    print("from email is",settings.DEFAULT_FROM_EMAIL)
-    print("api key is ",settings.EMAIL_HOST_USER)
-    print("message is ",message)
-    try:
-        sg = SendGridAPIClient(settings.EMAIL_HOST_USER)
-        response = sg.send(message)
-        print("email sent")
-        return response.status_code
-    except Exception as e:
-        print("error sending email ",str(e))
-        return str(e)
 
 class FreelancerInterviewViewSet(viewsets.ModelViewSet):
     queryset = FreelancerInterview.objects.all()
@@ -68,7 +49,7 @@ class FreelancerInterviewViewSet(viewsets.ModelViewSet):
         # Retrieve the interview instance being updated
         instance = self.get_object()
         
-        if not models.Interviewer.objects.filter(id= request.user.id).exists():
+        if roles.get_role(request) != roles.INTERVIEWER:
             raise PermissionDenied("You do not have permission to update the interview.")
         # Only the interviewer can update the `passed` and `feedback` fields.
         partial = kwargs.pop('partial', False)
@@ -85,19 +66,6 @@ class FreelancerInterviewViewSet(viewsets.ModelViewSet):
         else:
             notification_description = f"Unforutnately you have not passed the interview round for {instance.appointment.category}!Keep working on your skills and try agian!"
             result = f"Result: Failed"
-        models.Notification.objects.create(
-                    user=instance.freelancer,
-                    type='alert',
-                    title=f"Interview for {instance.appointment.category} Finished ",
-                    description=notification_description
-            )
-
-        models.Notification.objects.create(
-                    user=instance.interviewer,
-                    type='alert',
-                    title=f"Interview for {instance.appointment.category} with {instance.freelancer.full_name} Finished ",
-                    description=result
-            )
         subject = "Interview result update!"
     
         # HTML content for the email
@@ -108,9 +76,21 @@ class FreelancerInterviewViewSet(viewsets.ModelViewSet):
             </body>
         </html>
         """
-        
-        # Call send_email function with the recipient email, subject, and HTML content
-        send_email(instance.freelancer.email, subject, html_content)
+        notify_many([
+            {
+                'users': instance.freelancer,
+                'title': f"Interview for {instance.appointment.category} Finished ",
+                'description': notification_description,
+                'channels': (IN_APP, EMAIL),
+                'email_subject': subject,
+                'email_html': html_content,
+            },
+            {
+                'users': instance.interviewer,
+                'title': f"Interview for {instance.appointment.category} with {instance.freelancer.full_name} Finished ",
+                'description': result,
+            },
+        ])
 
 
         return Response(serializer.data)
@@ -118,6 +98,7 @@ class FreelancerInterviewViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         # Save the update, only the interviewer can set `passed` and `feedback`
         serializer.save()
+        invalidate_interviewer_capacity()
 
 # ViewSet for Interviewer
 class InterviewerViewSet(viewsets.ModelViewSet):
@@ -128,12 +109,13 @@ class InterviewerViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        role = roles.get_role(self.request)
         # Check if the user is a Freelancer
-        if models.Freelancer.objects.filter(id=user.id).exists():
+        if role == roles.FREELANCER:
             return models.FreelancerInterview.objects.filter(freelancer=user)
 
         # Check if the user is an Interviewer
-        elif Interviewer.objects.filter(id=user.id).exists():
+        elif role == roles.INTERVIEWER:
             return models.FreelancerInterview.objects.filter(interviewer=user)
 
         # If user is neither Freelancer nor Interviewer, return empty queryset
@@ -177,7 +159,7 @@ class UpdateAppointmentStatusView(generics.UpdateAPIView):
 
     def update(self, request, *args, **kwargs):
         """Override the update method to set 'done' to True"""
-        if not models.Interviewer.objects.filter(id= request.user.id).exists():
+        if roles.get_role(request) != roles.INTERVIEWER:
             raise PermissionDenied("You do not have permission to update the appointment.")
         appointment = self.get_object()
       
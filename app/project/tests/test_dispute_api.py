@@ -2,10 +2,12 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from core.models import Dispute, Contract, Client, Freelancer, Project ,SupportingDocument
+from core.models import Blob, Dispute, Contract, Client, Freelancer, Project ,SupportingDocument
 from project.serializers import DisputeSerializer
 from django.core.files.uploadedfile import SimpleUploadedFile
+import io
 import os
+from core import uploads
 
 DISPUTE_URL = reverse('project:dispute-list')
 
@@ -125,6 +127,62 @@ class PrivateDisputeApiTests(TestCase):
         self.assertTrue(dispute.supporting_documents.exists())  # Ensure documents are attached
         self.assertEqual(dispute.supporting_documents.count(), 1)  # Check the number of documents attached
     
+    def test_create_dispute_with_chunked_uploads(self):
+        """Test attaching completed chunked uploads; identical files are stored once"""
+        with open('test_documents/document.pdf', 'rb') as doc:
+            content = doc.read()
+        upload_ids = []
+        for _ in range(2):
+            upload = uploads.start_upload(self.client_user, 'document.pdf', len(content))
+            uploads.write_chunk(upload.id, 0, io.BytesIO(content))
+            upload_ids.append(str(uploads.complete_upload(upload.id).id))
+
+        payload = {
+            'contract': self.contract.id,
+            'title': 'Payment issue',
+            'description': 'Freelancer did not receive payment',
+            'return_type': 'partial',
+            'return_amount': 50.00,
+            'supporting_uploads': upload_ids,
+        }
+        res = self.client.post(DISPUTE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        dispute = Dispute.objects.get(id=res.data['id'])
+        self.assertEqual(dispute.supporting_documents.count(), 2)
+        self.assertEqual(len({document.blob_id for document in dispute.supporting_documents.all()}), 1)
+
+    def test_create_dispute_with_unknown_upload(self):
+        """Test that an unknown upload id is rejected before the dispute is created"""
+        payload = {
+            'contract': self.contract.id,
+            'title': 'Payment issue',
+            'description': 'Freelancer did not receive payment',
+            'return_type': 'partial',
+            'supporting_uploads': ['4b7b3a52-0c56-4a56-9a5e-6f8d8b0d8f00'],
+        }
+        res = self.client.post(DISPUTE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Dispute.objects.exists())
+
+    def test_outsider_documents_are_not_stored(self):
+        """Test that a user outside the contract is refused before their documents are stored"""
+        outsider = Client.objects.create_user(email='outsider@example.com', password='testpass123', company_name='Outsider')
+        self.client.force_authenticate(user=outsider)
+        payload = {
+            'contract': self.contract.id,
+            'title': 'Payment issue',
+            'description': 'Freelancer did not receive payment',
+            'return_type': 'partial',
+            'supporting_documents': [SimpleUploadedFile("doc1.pdf", b"file_content", content_type="application/pdf")],
+        }
+        res = self.client.post(DISPUTE_URL, payload, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Dispute.objects.exists())
+        self.assertFalse(Blob.objects.exists())
+
     def test_add_documents_to_existing_dispute(self):
         """Test adding supporting documents to an existing dispute"""
         # Create a dispute with initial documents (if needed)
@@ -35,6 +35,7 @@ urlpatterns = [
     path('contracts/<uuid:contract_id>/dispute-responses/', views.DisputeResponseListView.as_view(), name='contract-dispute-responses'),
     path('milestone/<uuid:milestone_id>/disputes/', views.DisputeListView.as_view(), name='milestone-disputes'),
     path('contracts/<uuid:contract_id>/counter-offers/', views.CounterOfferViewSet.as_view({'get': 'list'})),
+    path('supporting-documents/<uuid:pk>/file/', views.SupportingDocumentFileView.as_view(), name='supporting-document-file'),
     path('disputes/<uuid:dispute_id>/cancel/', views.CancelDisputeView.as_view(), name='cancel_dispute'),
     path('freelancer-contracts-update/<uuid:pk>/', views.FreelancerContractViewSet.as_view(), name='freelancer-contract-update'),
     path('freelancer-milestones-update/<uuid:pk>/', views.FreelancerMilestoneViewSet.as_view(), name='freelancer-milestone-update'),
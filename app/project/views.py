@@ -1,7 +1,7 @@
 from rest_framework import viewsets, generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import JWTAuthentication
 from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
 from project import serializers
 from core import models
@@ -11,7 +11,41 @@ from django.db.models import Count, Q, F
 from datetime import timedelta
 from rest_framework import permissions
 from rest_framework.exceptions import ValidationError
-from .utils import send_email
+from core import uploads
+from core.media import serve_file
+from core.roles import DISPUTE_MANAGER, get_role
+from core.notifications import EMAIL, IN_APP, notify_many
+
+
+def supporting_document_blobs(request, files_field):
+    """
+    Blobs of a request's supporting documents: ids of completed chunked uploads in `supporting_uploads`,
+    and multipart files in `files_field`.
+    """
+    data = request.data
+    upload_ids = data.getlist('supporting_uploads') if hasattr(data, 'getlist') else data.get('supporting_uploads') or []
+    try:
+        blobs = uploads.completed_blobs(upload_ids, request.user)
+    except uploads.UploadError as e:
+        raise ValidationError({"supporting_uploads": str(e)})
+    return blobs + [uploads.store_uploaded_file(document) for document in request.FILES.getlist(files_field)]
+
+
+def is_contract_party(user, contract):
+    """Whether the user is the contract's client or freelancer."""
+    return user.id in (contract.client_id, contract.freelancer_id)
+
+
+def attach_supporting_documents(dispute, blobs, user):
+    """Create a SupportingDocument per blob with one insert and attach them to the dispute."""
+    if not blobs:
+        return []
+    documents = models.SupportingDocument.objects.bulk_create([
+        models.SupportingDocument(file=blob.file.name, blob=blob, uploaded_by=user, dispute=dispute)
+        for blob in blobs
+    ])
+    dispute.supporting_documents.add(*documents)
+    return documents
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -23,7 +57,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create a project for a client"""
-        client = models.Client.objects.get(email=self.request.user.email)
+        client = models.Client.objects.get(pk=self.request.user.id)
         
         # Check if a project with the same title already exists for the client
         if models.Project.objects.filter(client=client, title=serializer.validated_data['title']).exists():
@@ -47,7 +81,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """Update a project for a client"""
         # Get the current project instance
         instance = self.get_object()
-        client = models.Client.objects.get(email=self.request.user.email)
+        client = models.Client.objects.get(pk=self.request.user.id)
         
         # Check if another project with the same title exists for the client (excluding the current instance)
         if models.Project.objects.filter(client=client, title=serializer.validated_data['title']).exclude(id=instance.id).exists():
@@ -179,19 +213,20 @@ class ContractViewSet(viewsets.ModelViewSet):
         </body>
         </html>
         """
-        send_email(instance.freelancer.email, subject, html_content)
-        models.Notification.objects.create(
-                    user=instance.client,
-                    type='alert',
-                    title=f"Contract status updated",
-                    description=f"Contract {instance.title} status updated to {instance.status}"
-            )
-        models.Notification.objects.create(
-                    user=instance.freelancer,
-                    type='alert',
-                    title=subject,
-                    description=message
-            )
+        notify_many([
+            {
+                'users': instance.client,
+                'title': "Contract status updated",
+                'description': f"Contract {instance.title} status updated to {instance.status}",
+            },
+            {
+                'users': instance.freelancer,
+                'title': subject,
+                'description': message,
+                'channels': (IN_APP, EMAIL),
+                'email_html': html_content,
+            },
+        ])
         return Response(serializer.data)
 
 
@@ -265,19 +300,21 @@ class FreelancerContractViewSet(generics.RetrieveUpdateAPIView):
         </body>
         </html>
         """
-        send_email(contract.client.email, "Contract status updated.", html_content)
-        models.Notification.objects.create(
-                user=contract.client,
-                type='alert',
-                title=f"Contract status updated",
-                description=message
-        )
-        models.Notification.objects.create(
-                user=contract.freelancer,
-                type='alert',
-                title=f"Contract status updated",
-                description=message
-        )
+        notify_many([
+            {
+                'users': contract.client,
+                'title': "Contract status updated",
+                'description': message,
+                'channels': (IN_APP, EMAIL),
+                'email_subject': "Contract status updated.",
+                'email_html': html_content,
+            },
+            {
+                'users': contract.freelancer,
+                'title': "Contract status updated",
+                'description': message,
+            },
+        ])
         return Response(status=status.HTTP_200_OK)
 
 
@@ -486,6 +523,10 @@ class DisputeViewSet(viewsets.ModelViewSet):
         milestone = serializer.validated_data.get('milestone', None)
         return_type = serializer.validated_data.get('return_type')
         user = self.request.user
+        # Refuse before any supporting document is stored
+        if not is_contract_party(user, contract):
+            raise PermissionDenied("You are not authorized to initiate a dispute for this contract.")
+        blobs = supporting_document_blobs(self.request, 'supporting_documents')
         print("return type is ",return_type)
         # Determine if the user is a client or freelancer associated with the contract
         try:
@@ -513,18 +554,6 @@ class DisputeViewSet(viewsets.ModelViewSet):
                 dispute_reciever = contract.client
             notification_description = f"A dispute has been created for contract {contract.title}."
 
-            models.Notification.objects.create(
-                    user=dispute_reciever,
-                    type='alert',
-                    title=f"Dispute Created",
-                    description=notification_description
-            )
-            models.Notification.objects.create(
-                    user=dispute.created_by,
-                    type='alert',
-                    title=f"Dispute Created",
-                    description=f"You have created a dispute for contract {contract.title}"
-            )
             subject = "Dispute Created!"
     
             # HTML content for the email
@@ -535,9 +564,21 @@ class DisputeViewSet(viewsets.ModelViewSet):
                 </body>
             </html>
             """
-            
-            # Call send_email function with the recipient email, subject, and HTML content
-            send_email(dispute_reciever.email , subject, html_content)
+            notify_many([
+                {
+                    'users': dispute_reciever,
+                    'title': "Dispute Created",
+                    'description': notification_description,
+                    'channels': (IN_APP, EMAIL),
+                    'email_subject': subject,
+                    'email_html': html_content,
+                },
+                {
+                    'users': dispute.created_by,
+                    'title': "Dispute Created",
+                    'description': f"You have created a dispute for contract {contract.title}",
+                },
+            ])
         except PermissionError as e:
             # Handle the case where the user is neither a client nor a freelancer in this contract
             print(f"PermissionError: {e}")
@@ -561,15 +602,8 @@ class DisputeViewSet(viewsets.ModelViewSet):
                 print("in full contract",contract.amount_agreed)
                 dispute.return_amount= contract.amount_agreed
                 dispute.save()
-        # Handle supporting documents
-        supporting_documents_data = self.request.FILES.getlist('supporting_documents')
-        for doc in supporting_documents_data:
-            supporting_document = models.SupportingDocument.objects.create(
-                file=doc,
-                uploaded_by=user,
-                dispute=dispute
-            )
-            dispute.supporting_documents.add(supporting_document)
+        # Supporting documents are stored as blobs, identical files only once
+        attach_supporting_documents(dispute, blobs, user)
 
     def update(self, request, *args, **kwargs):
         """Prevent updates to certain fields"""
@@ -578,16 +612,11 @@ class DisputeViewSet(viewsets.ModelViewSet):
         if 'created_by' in request.data or 'client' in request.data or 'freelancer' in request.data:
             raise PermissionDenied("You do not have permission to update these fields.")
         
-        # Handle supporting documents update if needed
-        if 'supporting_documents' in request.FILES:
-            supporting_documents_data = request.FILES.getlist('supporting_documents')
-            for doc in supporting_documents_data:
-                supporting_document = models.SupportingDocument.objects.create(
-                    file=doc,
-                    uploaded_by=request.user,
-                    dispute=instance
-                )
-                instance.supporting_documents.add(supporting_document)
+        # Handle supporting documents update if needed; only the parties add documents
+        if request.FILES.getlist('supporting_documents') or request.data.get('supporting_uploads'):
+            if not is_contract_party(request.user, instance.contract):
+                raise PermissionDenied("You do not have permission to add documents to this dispute.")
+            attach_supporting_documents(instance, supporting_document_blobs(request, 'supporting_documents'), request.user)
         milestone = None
         if return_type and return_type=="full":
             contract = models.Contract.objects.get(pk = instance.contract.id)
@@ -613,6 +642,29 @@ class DisputeViewSet(viewsets.ModelViewSet):
                 contract.save()
         return super().update(request, *args, **kwargs)
 
+class SupportingDocumentFileView(APIView):
+    """Download a supporting document; open to the disputes' parties, the uploader and dispute managers."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        document = generics.get_object_or_404(models.SupportingDocument.objects.select_related('blob'), pk=pk)
+        user = request.user
+        allowed = (
+            user.is_staff
+            or document.uploaded_by_id == user.id
+            or get_role(request) == DISPUTE_MANAGER
+            or models.Dispute.objects.filter(
+                Q(pk=document.dispute_id) | Q(supporting_documents=document)
+            ).filter(
+                Q(client_id=user.id) | Q(freelancer_id=user.id) | Q(created_by_id=user.id)
+            ).exists()
+        )
+        if not allowed:
+            raise PermissionDenied("You do not have permission to access this file.")
+        return serve_file(request, document.file)
+
+
 class DisputeResponseViewSet(viewsets.ModelViewSet):
     """Viewset for managing dispute responses between client and freelancer"""
     queryset = models.DisputeResponse.objects.all()
@@ -627,6 +679,10 @@ class DisputeResponseViewSet(viewsets.ModelViewSet):
         return_type = serializer.validated_data.get('return_type')
 
         user = self.request.user
+        # Refuse before any supporting document is stored
+        if not is_contract_party(user, dispute.contract):
+            raise PermissionDenied("You do not have permission to create a dispute response for this contract.")
+        blobs = supporting_document_blobs(self.request, 'supporting-documents')
         try:
             user_client = getattr(user, 'client', None)
             user_freelancer = getattr(user, 'freelancer', None)
@@ -650,18 +706,6 @@ class DisputeResponseViewSet(viewsets.ModelViewSet):
             notification_description = f"A dispute response has been created for dispute {dispute.title}."
             email_message = f"You have a response for dispute {dispute.title}"
             
-            models.Notification.objects.create(
-                    user=dispute_response_sender,
-                    type='alert',
-                    title=f"Dispute Response Created",
-                    description=notification_description
-            )
-            models.Notification.objects.create(
-                    user=dispute.created_by,
-                    type='alert',
-                    title=f"Dispute got response",
-                    description=f"You have a response for dispute {dispute.title}"
-            )
             subject = "Dispute got Response!"
     
             # HTML content for the email
@@ -672,9 +716,21 @@ class DisputeResponseViewSet(viewsets.ModelViewSet):
                 </body>
             </html>
             """
-            
-            # Call send_email function with the recipient email, subject, and HTML content
-            send_email(dispute.created_by.email , subject, html_content)
+            notify_many([
+                {
+                    'users': dispute_response_sender,
+                    'title': "Dispute Response Created",
+                    'description': notification_description,
+                },
+                {
+                    'users': dispute.created_by,
+                    'title': "Dispute got response",
+                    'description': email_message,
+                    'channels': (IN_APP, EMAIL),
+                    'email_subject': subject,
+                    'email_html': html_content,
+                },
+            ])
         except PermissionError as e:
             # Handle the case where the user is neither a client nor a freelancer in this contract
             print(f"PermissionError: {e}")
@@ -706,20 +762,7 @@ class DisputeResponseViewSet(viewsets.ModelViewSet):
 
             
         # Handle supporting documents
-        supporting_documents_data = self.request.FILES.getlist('supporting-documents')
-        for doc in supporting_documents_data:
-            dispute = None
-            if dispute_to_respond:
-                dispute = models.DisputeResponse.objects.get(pk = dispute_to_respond)
-            else:
-                dispute = new_dispute_response.dispute
-
-            supporting_document = models.SupportingDocument.objects.create(
-                file=doc,
-                uploaded_by=user,
-                dispute=dispute
-                )
-            new_dispute_response.dispute.supporting_documents.add(supporting_document)
+        attach_supporting_documents(new_dispute_response.dispute, blobs, user)
 
     def update(self, request, *args, **kwargs):
         """Prevent updates to certain fields"""
@@ -824,7 +867,7 @@ class IsDisputeManager(permissions.BasePermission):
     
     def has_permission(self, request, view):
         # Check if the user is authenticated and is a dispute manager
-        return request.user.is_authenticated and models.DisputeManager.objects.filter(id=request.user.id).exists()
+        return request.user.is_authenticated and get_role(request) == DISPUTE_MANAGER
 
 class ResolvedDrcViewSet(viewsets.ModelViewSet):
     """Viewset for resolving disputes forwarded to DRC"""
@@ -863,24 +906,6 @@ class ResolvedDrcViewSet(viewsets.ModelViewSet):
             notification_description += f"- Return Amount: {drc_resolved_dispute.return_amount}\n"
         if drc_resolved_dispute.comment:
             notification_description += f"- Comment: {drc_resolved_dispute.comment}\n"
-        models.Notification.objects.create(
-                    user=client,
-                    type='alert',
-                    title=f"Your dispute has been resolved.",
-                    description=notification_description
-            )
-        models.Notification.objects.create(
-                    user=freelancer,
-                    type='alert',
-                    title=f"Your dispute has been resolved.",
-                    description=notification_description
-            )
-        models.Notification.objects.create(
-                    user=request.user,
-                    type='alert',
-                    title=f"Dispute Resolved",
-                    description=notification_description
-            )
         # HTML content for the email   
         html_content = f"""
         <html>
@@ -889,9 +914,21 @@ class ResolvedDrcViewSet(viewsets.ModelViewSet):
             </body>
         </html>
         """
-        # Call send_email function with the recipient email, subject, and HTML content
-        send_email(client.email , "Dispute Resolved", html_content)
-        send_email(freelancer.email , "Dispute Resolved", html_content)
+        notify_many([
+            {
+                'users': [client, freelancer],
+                'title': "Your dispute has been resolved.",
+                'description': notification_description,
+                'channels': (IN_APP, EMAIL),
+                'email_subject': "Dispute Resolved",
+                'email_html': html_content,
+            },
+            {
+                'users': request.user,
+                'title': "Dispute Resolved",
+                'description': notification_description,
+            },
+        ])
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
@@ -961,24 +998,6 @@ class DrcForwardedDisputesViewSet(viewsets.ModelViewSet):
             dispute_response_sender = dispute.client
         else:   
             dispute_response_sender = dispute.freelancer
-        models.Notification.objects.create(
-                user=dispute_response_sender,
-                type='alert',
-                title=f"Dispute Response Created",
-                description=email_message
-        )
-        models.Notification.objects.create(
-                user=dispute.created_by,
-                type='alert',
-                title=f"Dispute got response",
-                description=email_message
-        )
-        models.Notification.objects.create(
-                user=manager,
-                type='alert',
-                title=f"Dispute Forwarded to DRC.",
-                description=email_message
-        )
         subject = "Dispute got Response!"
 
         # HTML content for the email
@@ -989,10 +1008,29 @@ class DrcForwardedDisputesViewSet(viewsets.ModelViewSet):
             </body>
         </html>
         """
-        
-        # Call send_email function with the recipient email, subject, and HTML content
-        send_email(dispute.created_by.email , subject, html_content)
-        send_email(manager.email , "Dispute Frorwarded to DRC.", html_content)
+        notify_many([
+            {
+                'users': dispute_response_sender,
+                'title': "Dispute Response Created",
+                'description': email_message,
+            },
+            {
+                'users': dispute.created_by,
+                'title': "Dispute got response",
+                'description': email_message,
+                'channels': (IN_APP, EMAIL),
+                'email_subject': subject,
+                'email_html': html_content,
+            },
+            {
+                'users': manager,
+                'title': "Dispute Forwarded to DRC.",
+                'description': email_message,
+                'channels': (IN_APP, EMAIL),
+                'email_subject': "Dispute Frorwarded to DRC.",
+                'email_html': html_content,
+            },
+        ])
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from core import models
+
+
+def claim_checker_capacity(day=None):
+    """
+    Take one unit of a resume checker's capacity for the day and return the checker's id, or None when every
+    checker is full. The least loaded counter row is locked with SKIP LOCKED and incremented with F(), so
+    concurrent claims spread over the checkers instead of waiting or piling onto the same one. When every row
+    with room is locked by other claims, the claim waits for one instead of reporting the checkers full.
+    """
+    day = day or timezone.localdate()
+    while True:
+        with_room = models.ResumeCheckerLoad.objects.filter(
+            day=day,
+            resumechecker__is_active=True,
+            assigned__lt=F('resumechecker__max_resume_check_per_day'),
+        ).order_by('assigned', 'id')
+        with transaction.atomic():
+            load = with_room.select_for_update(skip_locked=True, of=('self',)).first()
+            if load is None:
+                # Every row with room is locked: wait for the least loaded one. A single-row lock, since a
+                # scan would keep rows that filled up while it waited locked and could deadlock
+                candidate = with_room.first()
+                if candidate is not None:
+                    load = with_room.select_for_update(of=('self',)).filter(pk=candidate.pk).first()
+            if load is not None:
+                models.ResumeCheckerLoad.objects.filter(pk=load.pk).update(assigned=F('assigned') + 1)
+                return load.resumechecker_id
+        # The awaited row may have filled up meanwhile; only report full once no row has room
+        if not with_room.exists() and not create_day_loads(day):
+            return None
+
+
+def create_day_loads(day):
+    """Create the missing counter rows of the day's active checkers. Returns the number created."""
+    existing = models.ResumeCheckerLoad.objects.filter(day=day).values_list('resumechecker_id', flat=True)
+    missing = models.ResumeChecker.objects.filter(is_active=True).exclude(pk__in=existing).values_list('pk', flat=True)
+    loads = [models.ResumeCheckerLoad(resumechecker_id=checker_id, day=day) for checker_id in missing]
+    models.ResumeCheckerLoad.objects.bulk_create(loads, ignore_conflicts=True)
+    return len(loads)
+
+
+def assign_resume(resume):
+    """
+    Open the resume's check, assigned to a checker with capacity left today or queued as pending
+    (no checker) until assign_pending_checks finds one. Returns the check, or None if the resume already has one.
+    """
+    if models.ResumeCheck.objects.filter(resume=resume).exists():
+        return None
+    return models.ResumeCheck.objects.create(resume=resume, resumechecker_id=claim_checker_capacity(), passed=False)
+
+
+def assign_pending_checks(batch_size=100):
+    """Hand queued checks, oldest first, to checkers with capacity. Returns the number assigned."""
+    assigned = 0
+    while True:
+        with transaction.atomic():
+            pending = list(
+                models.ResumeCheck.objects.select_for_update(skip_locked=True)
+                .filter(resumechecker__isnull=True, done=False).order_by('created_at')[:batch_size]
+            )
+            for check in pending:
+                checker_id = claim_checker_capacity()
+                if checker_id is None:
+                    return assigned
+                models.ResumeCheck.objects.filter(pk=check.pk).update(resumechecker_id=checker_id)
+                assigned += 1
+        if len(pending) < batch_size:
+            return assigned
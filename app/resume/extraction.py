@@ -0,0 +1,140 @@
+import queue
+import time
+import billiard
+from django.conf import settings
+from pypdf import PdfReader
+
+
+def extract_page(reader, page_num):
+    """Return (text, seconds) for one page; a broken page yields no text instead of failing the document."""
+    started = time.perf_counter()
+    try:
+        page_text = reader.pages[page_num].extract_text() or ''
+    except Exception as e:
+        print(f"Error extracting page {page_num + 1}: {e}")
+        page_text = ''
+    return page_text, time.perf_counter() - started
+
+
+def extract_page_range(pdf_path, start, stop):
+    """
+    Extract pages [start, stop) of a PDF. Runs in pool processes, so it opens its own reader
+    and returns plain (page number, text, seconds) tuples.
+    """
+    reader = PdfReader(pdf_path)
+    return [(page_num, *extract_page(reader, page_num)) for page_num in range(start, stop)]
+
+
+def extract_assigned_ranges(pdf_path, ranges, results):
+    """Worker process: extract each (index, start, stop) range in turn and put (index, pages or error) on `results`."""
+    for index, start, stop in ranges:
+        try:
+            results.put((index, extract_page_range(pdf_path, start, stop)))
+        except Exception as e:
+            results.put((index, str(e)))
+
+
+class PdfExtractionResult:
+    def __init__(self, text, page_count, pages, truncated):
+        self.text = text
+        self.page_count = page_count  # pages in the document
+        self.pages = pages  # [{'page': 1, 'chars': 812, 'seconds': 0.03}, ...] for the pages extracted
+        self.truncated = truncated  # a page, character or time budget stopped the extraction early
+
+    @property
+    def seconds(self):
+        return sum(page['seconds'] for page in self.pages)
+
+
+class PdfTextExtractor:
+    """
+    Extract text from a PDF within a page, character and time budget.
+    Documents with at least `parallel_min_pages` pages are split into page ranges that are
+    extracted by worker processes; chunks are collected in page order and joined once.
+    The workers are billiard processes (Celery's multiprocessing fork), which unlike multiprocessing ones
+    may be started from the daemonic processes of a prefork worker, where screening runs.
+    """
+
+    def __init__(self, max_pages=None, max_chars=None, parallel_min_pages=None, max_workers=None, timeout=None):
+        self.max_pages = max_pages or getattr(settings, 'RESUME_EXTRACTION_MAX_PAGES', 20)
+        self.max_chars = max_chars or getattr(settings, 'RESUME_EXTRACTION_MAX_CHARS', 50000)
+        self.parallel_min_pages = parallel_min_pages or getattr(settings, 'RESUME_EXTRACTION_PARALLEL_MIN_PAGES', 8)
+        self.max_workers = max_workers or getattr(settings, 'RESUME_EXTRACTION_MAX_WORKERS', 4)
+        self.timeout = timeout or getattr(settings, 'RESUME_EXTRACTION_TIMEOUT', 60)
+
+    def extract(self, pdf_path):
+        reader = PdfReader(pdf_path)
+        page_count = len(reader.pages)
+        pages_to_read = min(page_count, self.max_pages)
+
+        if pages_to_read >= self.parallel_min_pages:
+            chunks, pages, stopped = self.extract_parallel(pdf_path, pages_to_read)
+        else:
+            chunks, pages, stopped = self.extract_serial(reader, pages_to_read)
+
+        text = "\n".join(chunks)
+        truncated = stopped or pages_to_read < page_count or len(text) > self.max_chars
+        return PdfExtractionResult(text[:self.max_chars], page_count, pages, truncated)
+
+    def extract_serial(self, reader, pages_to_read):
+        """
+        Extract the pages in this process. The timeout is best effort: it is checked between pages, so one
+        slow page can overrun it. The screening task's soft time limit bounds the extraction as a whole.
+        """
+        chunks, pages, chars = [], [], 0
+        deadline = time.monotonic() + self.timeout
+        for page_num in range(pages_to_read):
+            page_text, seconds = extract_page(reader, page_num)
+            chunks.append(page_text)
+            pages.append({'page': page_num + 1, 'chars': len(page_text), 'seconds': seconds})
+            chars += len(page_text)
+            if chars >= self.max_chars or time.monotonic() > deadline:
+                return chunks, pages, page_num + 1 < pages_to_read
+        return chunks, pages, False
+
+    def extract_parallel(self, pdf_path, pages_to_read):
+        workers = min(self.max_workers, pages_to_read)
+        # Several small ranges per worker so the character budget can stop the remaining ones early
+        range_size = max(1, pages_to_read // (workers * 2))
+        ranges = [(start, min(start + range_size, pages_to_read)) for start in range(0, pages_to_read, range_size)]
+
+        chunks, pages, chars = [], [], 0
+        deadline = time.monotonic() + self.timeout
+        results = billiard.Queue()
+        # Ranges are dealt round-robin, so the first pages come back first
+        assigned = [[(index, *ranges[index]) for index in range(worker, len(ranges), workers)] for worker in range(workers)]
+        processes = [
+            billiard.Process(target=extract_assigned_ranges, args=(pdf_path, worker_ranges, results), daemon=True)
+            for worker_ranges in assigned
+        ]
+        try:
+            for process in processes:
+                process.start()
+            received = {}
+            for index in range(len(ranges)):
+                while index not in received:
+                    try:
+                        range_index, page_results = results.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        print(f"PDF extraction of {pdf_path} timed out after {self.timeout}s")
+                        return chunks, pages, True
+                    received[range_index] = page_results
+                page_results = received.pop(index)
+                if isinstance(page_results, str):
+                    print(f"Error extracting pages {ranges[index]} of {pdf_path}: {page_results}")
+                    continue
+                for page_num, page_text, seconds in page_results:
+                    chunks.append(page_text)
+                    pages.append({'page': page_num + 1, 'chars': len(page_text), 'seconds': seconds})
+                    chars += len(page_text)
+                if chars >= self.max_chars:
+                    return chunks, pages, index + 1 < len(ranges)
+            return chunks, pages, False
+        finally:
+            # Workers still extracting after a timeout or the character budget are killed, not left running
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                if process.pid is not None:
+                    process.join(timeout=1)
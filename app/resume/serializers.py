@@ -1,11 +1,26 @@
 from rest_framework import serializers
-from core import models
+from core import models, uploads
 class ResumeSerializer(serializers.ModelSerializer):
+    upload = serializers.UUIDField(write_only=True, required=False, help_text="Completed upload to use instead of a multipart resume_file.")
+
     class Meta:
         model = models.Resume
-        fields = ['id', 'full_name','password','email','is_email_verified','applied_positions', 'resume_file', 'uploaded_at']
+        fields = ['id', 'full_name','password','email','is_email_verified','applied_positions', 'resume_file', 'upload', 'uploaded_at']
         read_only_fields = ['id','uploaded_at']
-        extra_kwargs = {'password': {'write_only': True, 'min_length': 5}}
+        extra_kwargs = {'password': {'write_only': True, 'min_length': 5}, 'resume_file': {'required': False}}
+
+    def validate(self, attrs):
+        request = self.context.get('request')
+        try:
+            blob = uploads.attachment_blob(attrs.pop('upload', None), attrs.get('resume_file'), request and request.user)
+        except uploads.UploadError as e:
+            raise serializers.ValidationError({'upload': str(e)})
+        if blob:
+            attrs['resume_file'] = blob.file.name
+            attrs['blob'] = blob
+        elif self.instance is None:
+            raise serializers.ValidationError({'resume_file': "Upload a resume file."})
+        return attrs
 
 
 class ScreeningResultSerializer(serializers.ModelSerializer):
@@ -51,3 +66,18 @@ class ApplicationOnHoldSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+
+
+class ResumeScreeningJobSerializer(serializers.ModelSerializer):
+    screening_results = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.ResumeScreeningJob
+        fields = ['id', 'status', 'error', 'created_at', 'updated_at', 'screening_results']
+        read_only_fields = fields
+
+    def get_screening_results(self, obj):
+        if not obj.results_persisted:
+            return []
+        results = models.ScreeningResult.objects.filter(resume=obj.resume)
+        return ScreeningResultSerializer(results, many=True).data
@@ -0,0 +1,142 @@
+from celery import Task, chain, shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.db import transaction
+from core import models
+from .assignment import assign_pending_checks, assign_resume
+from .utils import get_resume_text, score_resume_cached
+
+PASSING_SCORE = 50
+
+
+class ScreeningError(Exception):
+    """A screening stage produced no usable output."""
+
+
+class ScreeningTask(Task):
+    """
+    Base class of the screening stages: retried with backoff, job marked failed once retries run out.
+    A stage that hit its time limit fails at once, since running it again would take as long.
+    """
+    autoretry_for = (Exception,)
+    dont_autoretry_for = (SoftTimeLimitExceeded,)
+    max_retries = 3
+    retry_backoff = True
+    retry_backoff_max = 300
+    retry_jitter = True
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        models.ResumeScreeningJob.objects.filter(id=args[0]).update(status='failed', error=str(exc))
+
+
+def set_status(job_id, status):
+    models.ResumeScreeningJob.objects.filter(id=job_id).update(status=status)
+
+
+@shared_task(base=ScreeningTask, soft_time_limit=getattr(settings, 'RESUME_EXTRACTION_TASK_TIME_LIMIT', 120))
+def extract_resume_text(job_id):
+    job = models.ResumeScreeningJob.objects.select_related('resume').get(id=job_id)
+    if not job.resume_text:
+        set_status(job_id, 'extracting')
+        resume_text = get_resume_text(job.resume)
+        if not resume_text.strip():
+            # Unreadable or image-only PDFs extract to nothing; retried, then the job fails
+            raise ScreeningError("Resume text extraction returned no text")
+        job.resume_text = resume_text
+        job.save(update_fields=['resume_text', 'updated_at'])
+    return job_id
+
+
+@shared_task(base=ScreeningTask)
+def score_resume(job_id):
+    job = models.ResumeScreeningJob.objects.select_related('resume').get(id=job_id)
+    if job.scores is None:
+        set_status(job_id, 'scoring')
+        positions_applied_for = [position.name for position in job.resume.applied_positions.all()]
+        score_result = score_resume_cached(job.resume_text, positions_applied_for)
+        if not score_result or 'error' in score_result:
+            raise ScreeningError("AI scoring returned no result")
+        job.scores = score_result
+        job.save(update_fields=['scores', 'updated_at'])
+    return job_id
+
+
+@shared_task(base=ScreeningTask)
+def persist_screening_results(job_id):
+    with transaction.atomic():
+        # The row lock keeps a duplicated delivery of this stage from writing the results twice
+        job = models.ResumeScreeningJob.objects.select_for_update().select_related('resume').get(id=job_id)
+        if not job.results_persisted:
+            job.status = 'persisting'
+            for position, result in job.scores.items():
+                if not isinstance(result, dict):
+                    continue
+                service = models.Services.objects.filter(name__iexact=position).first()
+                if service is None:
+                    print(f"Skipping screening result for unknown position {position}")
+                    continue
+                try:
+                    score = float(result.get('score', 0))
+                except (TypeError, ValueError):
+                    score = 0
+                models.ScreeningResult.objects.create(
+                    resume=job.resume,
+                    score=score,
+                    passed=score >= PASSING_SCORE,
+                    comments=result.get('comment', ''),
+                    position=service
+                )
+            job.results_persisted = True
+            job.save(update_fields=['status', 'results_persisted', 'updated_at'])
+    return job_id
+
+
+@shared_task(base=ScreeningTask)
+def assign_resume_checker(job_id):
+    with transaction.atomic():
+        job = models.ResumeScreeningJob.objects.select_for_update().select_related('resume').get(id=job_id)
+        if not job.assignment_done:
+            passed = models.ScreeningResult.objects.filter(resume=job.resume, passed=True).exists()
+            if passed:
+                # A checker with capacity left today, or the pending queue
+                assign_resume(job.resume)
+            job.assignment_done = True
+        job.status = 'completed'
+        job.save(update_fields=['status', 'assignment_done', 'updated_at'])
+    return job_id
+
+
+@shared_task
+def assign_pending_resume_checks():
+    """Give queued resume checks to checkers whose daily capacity allows it."""
+    assigned = assign_pending_checks()
+    print(f"Assigned {assigned} pending resume checks")
+    return assigned
+
+
+def screening_pipeline(job_id):
+    return chain(
+        extract_resume_text.s(job_id),
+        score_resume.s(),
+        persist_screening_results.s(),
+        assign_resume_checker.s(),
+    )
+
+
+def start_resume_screening(resume):
+    """
+    Create the screening job of a resume once and enqueue its pipeline after the transaction commits.
+    Repeated calls return the existing job; a failed job is restarted and resumes at its failed stage.
+    """
+    job, created = models.ResumeScreeningJob.objects.get_or_create(
+        idempotency_key=f"resume-screening:{resume.id}",
+        defaults={'resume': resume},
+    )
+    if created or job.status == 'failed':
+        if not created:
+            job.status = 'pending'
+            job.error = ''
+            job.save(update_fields=['status', 'error', 'updated_at'])
+        job_id = str(job.id)
+        transaction.on_commit(lambda: screening_pipeline(job_id).apply_async())
+    return job
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import time
+from unittest.mock import patch
+import billiard
+from django.test import TestCase
+from pypdf import PdfReader, PdfWriter
+from resume.extraction import PdfTextExtractor
+from resume.utils import extract_text_from_pdf
+
+PDF_PATH = 'test_documents/document.pdf'
+
+
+def build_pdf(copies):
+    """Write a PDF made of `copies` repetitions of the test document and return its path."""
+    writer = PdfWriter()
+    for _ in range(copies):
+        writer.append(PDF_PATH)
+    handle, path = tempfile.mkstemp(suffix='.pdf')
+    with os.fdopen(handle, 'wb') as output:
+        writer.write(output)
+    return path
+
+
+def slow_page_range(pdf_path, start, stop):
+    time.sleep(30)
+    return []
+
+
+def extract_in_daemon(pdf_path, queue):
+    """Run a parallel extraction in a daemonic process, as a Celery prefork worker child is."""
+    try:
+        with patch.object(PdfTextExtractor, 'extract_serial', side_effect=AssertionError("fell back to serial")):
+            queue.put(PdfTextExtractor(parallel_min_pages=2, max_workers=2).extract(pdf_path).text)
+    except Exception as e:
+        queue.put(repr(e))
+
+
+class PdfTextExtractorTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.page_texts = [page.extract_text() or '' for page in PdfReader(PDF_PATH).pages]
+        cls.copies = max(1, 10 // len(cls.page_texts))
+        cls.path = build_pdf(cls.copies)
+        cls.page_count = len(cls.page_texts) * cls.copies
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+        super().tearDownClass()
+
+    def test_parallel_matches_serial_in_page_order(self):
+        serial = PdfTextExtractor(parallel_min_pages=1000).extract(self.path)
+        parallel = PdfTextExtractor(parallel_min_pages=2, max_workers=2).extract(self.path)
+
+        self.assertEqual(serial.text, "\n".join(self.page_texts * self.copies))
+        self.assertEqual(parallel.text, serial.text)
+        self.assertEqual([page['page'] for page in parallel.pages], list(range(1, self.page_count + 1)))
+        self.assertFalse(parallel.truncated)
+
+    def test_parallel_extraction_runs_in_daemonic_workers(self):
+        queue = billiard.Queue()
+        worker = billiard.Process(target=extract_in_daemon, args=(self.path, queue), daemon=True)
+        worker.start()
+        text = queue.get(timeout=30)
+        worker.join(timeout=5)
+
+        self.assertEqual(text, "\n".join(self.page_texts * self.copies))
+
+    def test_page_timings_are_recorded(self):
+        result = PdfTextExtractor().extract(self.path)
+
+        self.assertEqual(result.page_count, self.page_count)
+        self.assertEqual(len(result.pages), self.page_count)
+        self.assertTrue(all(page['seconds'] >= 0 for page in result.pages))
+        self.assertEqual([page['chars'] for page in result.pages], [len(text) for text in self.page_texts * self.copies])
+
+    def test_page_budget(self):
+        result = PdfTextExtractor(max_pages=1).extract(self.path)
+
+        self.assertEqual(result.text, self.page_texts[0])
+        self.assertEqual(len(result.pages), 1)
+        self.assertTrue(result.truncated)
+
+    def test_character_budget_stops_early(self):
+        max_chars = len(self.page_texts[0]) + 1
+        for parallel_min_pages in (1000, 2):
+            result = PdfTextExtractor(max_chars=max_chars, parallel_min_pages=parallel_min_pages).extract(self.path)
+
+            self.assertEqual(len(result.text), min(max_chars, len("\n".join(self.page_texts * self.copies))))
+            self.assertLess(len(result.pages), self.page_count)
+            self.assertTrue(result.truncated)
+
+    def test_parallel_timeout_terminates_the_workers(self):
+        started = time.monotonic()
+        with patch('resume.extraction.extract_page_range', slow_page_range):
+            result = PdfTextExtractor(parallel_min_pages=2, max_workers=2, timeout=1).extract(self.path)
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertTrue(result.truncated)
+        self.assertEqual(result.text, '')
+        self.assertEqual(billiard.active_children(), [])
+
+    def test_extract_text_from_pdf_returns_empty_on_error(self):
+        self.assertEqual(extract_text_from_pdf('test_documents/missing.pdf'), '')
@@ -0,0 +1,92 @@
+import threading
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from core.models import Resume, ResumeCheck, ResumeChecker, ResumeCheckerLoad
+from resume.assignment import assign_pending_checks, assign_resume, claim_checker_capacity
+
+
+def create_resume(index):
+    return Resume.objects.create(
+        full_name=f"Applicant {index}", email=f"applicant{index}@example.com", password="testpass",
+        resume_file='resumes/resume.pdf', content_hash=f"{index:064d}",
+    )
+
+
+class ResumeAssignmentTests(TestCase):
+
+    def setUp(self):
+        self.busy = ResumeChecker.objects.create(email="busy@example.com", full_name="Busy", max_resume_check_per_day=3)
+        self.idle = ResumeChecker.objects.create(email="idle@example.com", full_name="Idle", max_resume_check_per_day=1)
+        ResumeChecker.objects.create(email="inactive@example.com", full_name="Inactive", max_resume_check_per_day=5, is_active=False)
+
+    def test_claims_go_to_the_least_loaded_checker_until_all_are_full(self):
+        claims = [claim_checker_capacity() for _ in range(5)]
+
+        self.assertEqual(sorted(claims, key=str), sorted([self.busy.pk] * 3 + [self.idle.pk] + [None], key=str))
+        self.assertEqual(claims[-1], None)
+        loads = dict(ResumeCheckerLoad.objects.filter(day=timezone.localdate()).values_list('resumechecker_id', 'assigned'))
+        self.assertEqual(loads, {self.busy.pk: 3, self.idle.pk: 1})
+
+    def test_claim_is_constant_work_once_the_day_exists(self):
+        claim_checker_capacity()
+
+        with self.assertNumQueries(4):  # savepoint, locked pick, increment, release
+            self.assertIsNotNone(claim_checker_capacity())
+
+    def test_full_checkers_queue_the_resume(self):
+        ResumeChecker.objects.update(max_resume_check_per_day=0)
+
+        check = assign_resume(create_resume(1))
+
+        self.assertIsNone(check.resumechecker)
+        self.assertIsNone(assign_resume(check.resume))  # one check per resume
+
+        ResumeChecker.objects.filter(pk=self.idle.pk).update(max_resume_check_per_day=1)
+        queued = assign_resume(create_resume(2))
+        self.assertEqual(queued.resumechecker, self.idle)
+
+    def test_pending_checks_drain_oldest_first(self):
+        ResumeChecker.objects.update(max_resume_check_per_day=0)
+        checks = [assign_resume(create_resume(index)) for index in range(3)]
+        ResumeChecker.objects.filter(pk=self.busy.pk).update(max_resume_check_per_day=2)
+
+        self.assertEqual(assign_pending_checks(), 2)
+
+        assigned = [ResumeCheck.objects.get(pk=check.pk).resumechecker_id for check in checks]
+        self.assertEqual(assigned, [self.busy.pk, self.busy.pk, None])
+
+
+class ConcurrentAssignmentTests(TransactionTestCase):
+    """A burst of verifications, each claiming from its own thread and connection."""
+    threads = 12
+
+    def test_daily_limits_hold_under_a_burst(self):
+        limits = {
+            ResumeChecker.objects.create(email=f"checker{index}@example.com", full_name=f"Checker {index}", max_resume_check_per_day=limit).pk: limit
+            for index, limit in enumerate((1, 2, 3))
+        }
+        resumes = [create_resume(index) for index in range(self.threads)]
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def verify(resume):
+            try:
+                barrier.wait()
+                assign_resume(resume)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=verify, args=(resume,)) for resume in resumes]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(ResumeCheck.objects.count(), self.threads)
+        for checker_id, limit in limits.items():
+            self.assertEqual(ResumeCheck.objects.filter(resumechecker_id=checker_id).count(), limit)
+        self.assertEqual(ResumeCheck.objects.filter(resumechecker__isnull=True).count(), self.threads - sum(limits.values()))
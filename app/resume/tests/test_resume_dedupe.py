@@ -0,0 +1,124 @@
+import hashlib
+import shutil
+import tempfile
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Freelancer, Resume, ResumeScoreCache, ResumeText, Services
+from resume.utils import get_resume_text, score_resume_cached
+
+PDF_PATH = 'test_documents/document.pdf'
+
+
+class ResumeDedupeTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, UPLOAD_TEMP_DIR=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.position = Services.objects.create(name="Backend Developer")
+
+    def upload(self, email):
+        with open(PDF_PATH, 'rb') as resume_file, patch('resume.views.send_verification_email'):
+            response = self.client.post(reverse('resume-list'), {
+                'full_name': 'Jane Doe',
+                'email': email,
+                'password': 'testpass',
+                'applied_positions': [str(self.position.id)],
+                'resume_file': resume_file,
+                'is_email_verified': True,
+            }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Resume.objects.get(email=email)
+
+    def test_upload_stores_content_hash(self):
+        with open(PDF_PATH, 'rb') as resume_file:
+            expected = hashlib.sha256(resume_file.read()).hexdigest()
+
+        first = self.upload('first@example.com')
+        second = self.upload('second@example.com')
+
+        self.assertEqual(first.content_hash, expected)
+        self.assertEqual(second.content_hash, expected)
+        self.assertEqual(first.blob_id, second.blob_id)
+
+    def test_create_from_chunked_upload(self):
+        with open(PDF_PATH, 'rb') as resume_file:
+            content = resume_file.read()
+        # Chunked upload sessions belong to a signed-in user
+        uploader = Freelancer.objects.create(email='uploader@example.com', password='testpass', full_name='Uploader')
+        self.client.force_authenticate(user=uploader)
+        response = self.client.post(reverse('user:upload-create'), {'filename': 'resume.pdf', 'size': len(content)}, format='json')
+        upload_id = response.data['id']
+        self.client.patch(
+            reverse('user:upload-detail', args=[upload_id]), content,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0',
+        )
+        self.client.post(reverse('user:upload-complete', args=[upload_id]))
+
+        with patch('resume.views.send_verification_email'):
+            response = self.client.post(reverse('resume-list'), {
+                'full_name': 'Jane Doe',
+                'email': 'chunked@example.com',
+                'password': 'testpass',
+                'applied_positions': [str(self.position.id)],
+                'upload': upload_id,
+                'is_email_verified': True,
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        resume = Resume.objects.get(email='chunked@example.com')
+        self.assertEqual(resume.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(resume.resume_file.name, resume.blob.file.name)
+
+    def test_identical_files_are_parsed_once(self):
+        first = self.upload('first@example.com')
+        second = self.upload('second@example.com')
+
+        with patch('resume.utils.extract_text_from_pdf', return_value="Python developer") as extract:
+            self.assertEqual(get_resume_text(first), "Python developer")
+            self.assertEqual(get_resume_text(second), "Python developer")
+
+        extract.assert_called_once()
+        self.assertEqual(ResumeText.objects.count(), 1)
+
+    def test_failed_extraction_is_not_cached(self):
+        resume = self.upload('first@example.com')
+        with patch('resume.utils.extract_text_from_pdf', return_value="") as extract:
+            get_resume_text(resume)
+            get_resume_text(resume)
+
+        self.assertEqual(extract.call_count, 2)
+        self.assertFalse(ResumeText.objects.exists())
+
+
+class ResumeScoreCacheTests(TestCase):
+
+    def test_scores_are_reused_for_same_text_and_positions(self):
+        scores = {"Backend Developer": {"score": 80, "comment": "Good"}}
+        with patch('resume.utils.score_resume_with_chatgpt', return_value=scores) as score:
+            self.assertEqual(score_resume_cached("resume text", ["Backend Developer", "Designer"]), scores)
+            self.assertEqual(score_resume_cached("resume text", ["designer ", "backend developer"]), scores)
+            score_resume_cached("other text", ["Backend Developer", "Designer"])
+
+        self.assertEqual(score.call_count, 2)
+        self.assertEqual(ResumeScoreCache.objects.count(), 2)
+
+    def test_errors_are_not_cached(self):
+        with patch('resume.utils.score_resume_with_chatgpt', return_value={'error': 'Error occurred during scoring.'}):
+            score_resume_cached("resume text", ["Backend Developer"])
+
+        self.assertFalse(ResumeScoreCache.objects.exists())
+
+    def test_blank_text_is_never_scored_or_cached(self):
+        with patch('resume.utils.score_resume_with_chatgpt') as score:
+            self.assertIn('error', score_resume_cached("", ["Backend Developer"]))
+            self.assertIn('error', score_resume_cached("  \n", ["Backend Developer"]))
+
+        score.assert_not_called()
+        self.assertFalse(ResumeScoreCache.objects.exists())
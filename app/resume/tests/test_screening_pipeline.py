@@ -0,0 +1,180 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import urlsafe_base64_encode
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Resume, ResumeCheck, ResumeChecker, ResumeScoreCache, ResumeScreeningJob, ScreeningResult, Services
+from resume.extraction import PdfTextExtractor
+from resume.tasks import ScreeningError, extract_resume_text, screening_pipeline, start_resume_screening
+from .test_pdf_extraction import build_pdf
+
+
+SCORES = {
+    "Backend Developer": {"score": 80, "comment": "Strong backend experience"},
+    "Designer": {"score": 30, "comment": "No design portfolio"},
+}
+
+
+class ScreeningPipelineTests(TestCase):
+
+    def setUp(self):
+        self.backend = Services.objects.create(name="Backend Developer")
+        self.designer = Services.objects.create(name="Designer")
+        self.resume = Resume.objects.create(
+            full_name="Jane Doe", email="jane@example.com", password="testpass", resume_file='resumes/resume.pdf',
+            content_hash="a" * 64,
+        )
+        self.resume.applied_positions.set([self.backend, self.designer])
+        self.checker = ResumeChecker.objects.create(email="checker@example.com", full_name="Checker")
+
+    def run_pipeline(self, job, scores=SCORES, text="Python, Django, 5 years"):
+        with patch('resume.utils.extract_text_from_pdf', return_value=text) as extract, \
+                patch('resume.utils.score_resume_with_chatgpt', return_value=scores) as score:
+            screening_pipeline(str(job.id)).apply()
+        return extract, score
+
+    def test_pipeline_runs_every_stage(self):
+        job = start_resume_screening(self.resume)
+
+        self.run_pipeline(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.resume_text, "Python, Django, 5 years")
+        self.assertEqual(
+            set(ScreeningResult.objects.filter(resume=self.resume).values_list('position__name', 'passed')),
+            {("Backend Developer", True), ("Designer", False)},
+        )
+        self.assertEqual(ResumeCheck.objects.get(resume=self.resume).resumechecker, self.checker)
+
+    def test_rerunning_the_pipeline_is_idempotent(self):
+        job = start_resume_screening(self.resume)
+        self.run_pipeline(job)
+
+        extract, score = self.run_pipeline(job)
+
+        extract.assert_not_called()
+        score.assert_not_called()
+        self.assertEqual(ScreeningResult.objects.filter(resume=self.resume).count(), 2)
+        self.assertEqual(ResumeCheck.objects.filter(resume=self.resume).count(), 1)
+
+    def test_start_returns_existing_job(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            first = start_resume_screening(self.resume)
+            second = start_resume_screening(self.resume)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(ResumeScreeningJob.objects.count(), 1)
+
+    def test_failed_scoring_marks_job_failed_and_can_restart(self):
+        job = start_resume_screening(self.resume)
+
+        # Eagerly applied chains re-raise the last error once retries are exhausted
+        with patch('resume.tasks.score_resume.max_retries', 0), self.assertRaises(ScreeningError):
+            self.run_pipeline(job, scores={'error': 'Error occurred during scoring.'})
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error, "AI scoring returned no result")
+        self.assertFalse(ScreeningResult.objects.exists())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            restarted = start_resume_screening(self.resume)
+        self.assertEqual(restarted.id, job.id)
+        self.assertEqual(restarted.status, 'pending')
+        self.assertEqual(len(callbacks), 1)
+
+        # The extracted text is reused, only scoring runs again
+        extract, score = self.run_pipeline(restarted)
+        extract.assert_not_called()
+        score.assert_called_once()
+        restarted.refresh_from_db()
+        self.assertEqual(restarted.status, 'completed')
+
+    def test_empty_extraction_fails_the_job_before_scoring(self):
+        job = start_resume_screening(self.resume)
+
+        with patch('resume.tasks.extract_resume_text.max_retries', 0), self.assertRaises(ScreeningError):
+            self.run_pipeline(job, text='')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error, "Resume text extraction returned no text")
+        self.assertEqual(job.resume_text, None)
+        self.assertFalse(ResumeScoreCache.objects.exists())
+
+
+class ExtractStageTests(TestCase):
+    """The extract stage on a real PDF, as the Celery task runs it."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        path = build_pdf(4)
+        self.addCleanup(os.remove, path)
+        with open(path, 'rb') as pdf:
+            content = pdf.read()
+        self.resume = Resume.objects.create(
+            full_name="Jane Doe", email="jane@example.com", password="testpass",
+            resume_file=SimpleUploadedFile('resume.pdf', content), content_hash="b" * 64,
+        )
+        self.serial_text = PdfTextExtractor(parallel_min_pages=1000).extract(path).text
+
+    @override_settings(RESUME_EXTRACTION_PARALLEL_MIN_PAGES=2, RESUME_EXTRACTION_MAX_WORKERS=2)
+    def test_task_extracts_pages_in_parallel(self):
+        job = start_resume_screening(self.resume)
+
+        with patch.object(PdfTextExtractor, 'extract_serial', side_effect=AssertionError("fell back to serial")):
+            result = extract_resume_text.apply(args=[str(job.id)])
+
+        self.assertTrue(result.successful(), result.result)
+        job.refresh_from_db()
+        self.assertEqual(job.resume_text, self.serial_text)
+
+    def test_time_limit_fails_without_retrying(self):
+        job = start_resume_screening(self.resume)
+
+        with patch.object(PdfTextExtractor, 'extract', side_effect=SoftTimeLimitExceeded()) as extract:
+            result = extract_resume_text.apply(args=[str(job.id)])
+
+        self.assertIsInstance(result.result, SoftTimeLimitExceeded)
+        extract.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+
+class VerifyEmailScreeningTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.resume = Resume.objects.create(
+            full_name="Jane Doe", email="jane@example.com", password="testpass",
+            resume_file='resumes/resume.pdf', verification_token="token",
+        )
+
+    def test_verify_email_returns_job_immediately(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse('verify-email'), {
+                'token': 'token',
+                'pk': urlsafe_base64_encode(str(self.resume.id).encode()),
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(callbacks), 1)
+        job = ResumeScreeningJob.objects.get(resume=self.resume)
+        self.assertEqual(response.data['screening_job_id'], str(job.id))
+
+        response = self.client.get(response.data['status_url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(response.data['screening_results'], [])
@@ -20,5 +20,7 @@ urlpatterns = [
     path('activate-full-assessment/<uuid:resume_id>/', views.activate_full_assessment, name='activate_assessment'),
     path('approve_freelancer/<uuid:resume_id>/', views.approve_freelancer, name='approve_freelancer'),
     path('verify-email/', views.verify_email, name='verify-email'),
+    path('resumes/<uuid:pk>/file/', views.ResumeFileView.as_view(), name='resume-file'),
+    path('screening-jobs/<uuid:pk>/', views.ResumeScreeningJobView.as_view(), name='screening-job'),
     path("assessment-termination/", views.AssessmentTerminationView.as_view(), name="assessment-termination"),
 ]
@@ -1,7 +1,9 @@
+import hashlib
 import json
 import pypdf
 import os
 import google.generativeai as genai
+from celery.exceptions import SoftTimeLimitExceeded
 from django.core.mail import send_mail
 from django.conf import settings
 from core import models
@@ -13,23 +15,26 @@ from django.utils.encoding import force_bytes
 genai.configure(api_key=os.environ["GEMINI_API_KEY"])
 
 from pypdf import PdfReader
+from .extraction import PdfTextExtractor
 
 def extract_text_from_pdf(pdf_path):
-    """Extract text from a PDF file."""
-    text = ''
+    """Extract text from a PDF file, within the configured page and character budget."""
     print("Started extracting")
     try:
-        reader = PdfReader(pdf_path)
-        number_of_pages = len(reader.pages)
-        for page_num in range(number_of_pages):
-            page = reader.pages[page_num]
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
+        result = PdfTextExtractor().extract(pdf_path)
+    except SoftTimeLimitExceeded:
+        # The screening task ran out of time; it fails instead of being retried
+        raise
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
-    print("Finished extracting")
-    return text
+        return ''
+    slowest = max(result.pages, key=lambda page: page['seconds'], default=None)
+    print(
+        f"Finished extracting {len(result.pages)}/{result.page_count} pages, {len(result.text)} chars "
+        f"in {result.seconds:.2f}s" + (f", slowest page {slowest['page']} ({slowest['seconds']:.2f}s)" if slowest else "")
+        + (" (truncated)" if result.truncated else "")
+    )
+    return result.text
 
 def score_resume_with_chatgpt(resume_text, positions_applied_for):
     """Score a resume using the ChatGPT model."""
@@ -72,6 +77,66 @@ def score_resume_with_chatgpt(resume_text, positions_applied_for):
 
 
 
+def sha256_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_sha256(file_field):
+    """Return the sha256 hex digest of an uploaded or stored file, read in chunks."""
+    digest = hashlib.sha256()
+    file_field.open('rb')
+    try:
+        for chunk in file_field.chunks():
+            digest.update(chunk)
+    finally:
+        file_field.close()
+    return digest.hexdigest()
+
+
+def get_resume_text(resume):
+    """Return the text of a resume; every distinct file content is parsed only once."""
+    if not resume.content_hash:
+        # Resumes uploaded before content hashing
+        resume.content_hash = file_sha256(resume.resume_file)
+        resume.save(update_fields=['content_hash'])
+
+    cached = models.ResumeText.objects.filter(content_hash=resume.content_hash).first()
+    if cached:
+        return cached.text
+
+    text = extract_text_from_pdf(resume.resume_file.path)
+    if text:
+        # Failed extractions return no text and are not cached, so they are retried next time
+        models.ResumeText.objects.get_or_create(
+            content_hash=resume.content_hash,
+            defaults={'text': text, 'text_hash': sha256_text(text)},
+        )
+    return text
+
+
+def positions_hash(positions_applied_for):
+    positions = sorted({position.strip().lower() for position in positions_applied_for})
+    return sha256_text(json.dumps(positions))
+
+
+def score_resume_cached(resume_text, positions_applied_for):
+    """score_resume_with_chatgpt, reusing earlier scores for the same text and positions. Blank text is never scored or cached."""
+    if not (resume_text or '').strip():
+        return {'error': 'No resume text to score.'}
+    text_hash = sha256_text(resume_text)
+    key = positions_hash(positions_applied_for)
+    cached = models.ResumeScoreCache.objects.filter(text_hash=text_hash, positions_hash=key).first()
+    if cached:
+        return cached.scores
+
+    score_result = score_resume_with_chatgpt(resume_text, positions_applied_for)
+    if score_result and 'error' not in score_result:
+        models.ResumeScoreCache.objects.get_or_create(
+            text_hash=text_hash, positions_hash=key, defaults={'scores': score_result}
+        )
+    return score_result
+
+
 def parse_json_from_response(response_text):
     """Parse JSON from the AI response text."""
     # Clean up the response text and ensure it's valid JSON format
@@ -2,7 +2,7 @@ import uuid
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from .utils import extract_text_from_pdf, score_resume_with_chatgpt, send_resume_result_email, create_freelancer_from_resume
+from .utils import send_resume_result_email, create_freelancer_from_resume, file_sha256
 from core.models import Resume, ScreeningResult, ScreeningConfig , Field , Services , AssessmentTermination , FullAssessment
 from . import serializers
 from rest_framework.permissions import AllowAny
@@ -11,7 +11,7 @@ from django.utils import timezone
 from datetime import timedelta, datetime
 import json
 from django.core.serializers.json import DjangoJSONEncoder
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.permissions import BasePermission
@@ -26,14 +26,39 @@ from django.utils.crypto import get_random_string
 from rest_framework.decorators import action
 from core import models
 from django.conf import settings
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from rest_framework.generics import RetrieveUpdateAPIView
+from core.emails import send_email
+from core import interview_slots
+from core.interviewer_capacity import get_available_interviewers
+from core.media import serve_file
+from core.notifications import EMAIL, IN_APP, notify
+from rest_framework.generics import RetrieveUpdateAPIView, RetrieveAPIView
 from django.utils.timezone import now
 from rest_framework.exceptions import PermissionDenied
+from services.skills import sync_freelancer_skills
+from services.tasks import refresh_freelancer_embedding
+from .tasks import start_resume_screening
+from django.db import transaction
 
 
 
+class ResumeFileView(APIView):
+    """Download a resume file; open to the applicant, the resume checkers assigned to it and staff."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        resume = get_object_or_404(Resume.objects.select_related('blob'), pk=pk)
+        user = request.user
+        allowed = (
+            user.is_staff
+            or user.email.lower() == resume.email.lower()
+            or models.ResumeCheck.objects.filter(resume=resume, resumechecker_id=user.id).exists()
+        )
+        if not allowed:
+            raise PermissionDenied("You do not have permission to access this file.")
+        return serve_file(request, resume.resume_file)
+
+
 class ResumeViewSet(viewsets.ModelViewSet):
     queryset = Resume.objects.all()
     serializer_class = serializers.ResumeSerializer
@@ -52,6 +77,8 @@ class ResumeViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         resume = serializer.save()
         resume.verification_token = verification_token
+        # Identical files share their extracted text and screening scores
+        resume.content_hash = resume.blob.sha256 if resume.blob else file_sha256(resume.resume_file)
         resume.save()
         # Send the verification email
         if(not is_email_verified):
@@ -111,7 +138,7 @@ class ResumeViewSet(viewsets.ModelViewSet):
     #     if freelancer:
     #         response_data["freelancer_created"] = True
         # if (freelancer):
-        #         # available_interviewers = get_available_interviewers("soft_skills")
+        #         # available_interviewers = get_available_interviewers(type="soft_skills")
         #         # print("avaliable interviewers found",available_interviewers)
 
         #         # if available_interviewers:
@@ -199,53 +226,6 @@ class ResumeViewSet(viewsets.ModelViewSet):
 from django.utils import timezone
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Count, Q, F
-
-def send_resume_for_screening(resume):
-    resume_text = extract_text_from_pdf(resume.resume_file.path)
-    applied_positions = resume.applied_positions.all()
-    positions_applied_for = [position.name for position in applied_positions]
-
-    score_result = score_resume_with_chatgpt(resume_text, positions_applied_for)
-
-    screening_results = []
-    passed_any = False
-
-    for position, result in score_result.items():
-        score = result.get('score', 0)
-        comment = result.get('comment', '')
-        passed = score >= 50
-        if passed:
-            passed_any = True
-        service = Services.objects.get(name__iexact=position)
-        
-        screening_result = ScreeningResult.objects.create(
-            resume=resume,
-            score=score,
-            passed=passed,
-            comments=comment,
-            position=service
-        )
-        screening_results.append(screening_result)
-
-    if passed_any:
-        # Find an available ResumeChecker
-        today = timezone.now().date()
-        available_checker = models.ResumeChecker.objects.filter(
-            resume_checks__done=False
-        ).annotate(
-            checks_today=Count('resume_checks', filter=Q(resume_checks__created_at__date=today))
-        ).filter(checks_today__lt=F('max_resume_check_per_day')).first()
-
-        if available_checker:
-            # Assign the Resume to the ResumeChecker
-            models.ResumeCheck.objects.create(
-                resumechecker=available_checker,
-                resume=resume,
-                done=False  # Screening not completed yet
-            )
-
-
 
 from uuid import UUID
 
@@ -273,70 +253,24 @@ def verify_email(request):
     resume.verification_token = ""
     resume.save()
 
-    # Continue with the screening process (your existing logic here)
-    resume_text = extract_text_from_pdf(resume.resume_file.path)
-    applied_positions = resume.applied_positions.all()
-    positions_applied_for = [position.name for position in applied_positions]
-
-    score_result = score_resume_with_chatgpt(resume_text, positions_applied_for)
-
-    screening_results = []
-    resume_check_assigned = False  # Track if we assigned a ResumeChecker
-
-    for position, result in score_result.items():
-        score = result.get('score', 0)
-        comment = result.get('comment', '')
-        passed = score >= 50
-        service = Services.objects.get(name__iexact=position)
-        screening_result = ScreeningResult.objects.create(
-            resume=resume,
-            score=score,
-            passed=passed,
-            comments=comment,
-            position=service
-        )
-        screening_results.append(screening_result)
-
-        # Assign a ResumeCheck if passed (only once)
-        if passed and not resume_check_assigned:
-            resume_checker = models.ResumeChecker.objects.annotate(
-                check_count=Count('resume_checks', filter=Q(resume_checks__done=False))
-            ).order_by('check_count').first()
-
-            if resume_checker:
-                models.ResumeCheck.objects.create(resumechecker=resume_checker, resume=resume, passed=False)
-                resume_check_assigned = True
+    # Screening (extract, score, persist, assign) runs on the Celery workers
+    job = start_resume_screening(resume)
 
-    screening_result_serializer = serializers.ScreeningResultSerializer(screening_results, many=True)
-    
     response_data = {
         "message": "Email verified and watch out your email for your application result.",
-        "screening_results": screening_result_serializer.data,
+        "screening_job_id": str(job.id),
+        "status_url": request.build_absolute_uri(reverse('screening-job', args=[job.id])),
     }
 
-    return Response(response_data, status=status.HTTP_200_OK)
-
-def send_email(to_email, subject, html_content):
-    print("to email is ",to_email)
-    print("subject is ",subject)
-    print("html_content is ",html_content)
-    message = Mail(
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
-    )
-    print("from email is",settings.DEFAULT_FROM_EMAIL)
-    print("api key is ",settings.EMAIL_HOST_USER)
-    print("message is ",message)
-    try:
-        sg = SendGridAPIClient(settings.EMAIL_HOST_USER)
-        response = sg.send(message)
-        print("email sent")
-        return response.status_code
-    except Exception as e:
-        print("error sending email ",str(e))
-        return str(e)
+    return Response(response_data, status=status.HTTP_202_ACCEPTED)
+
+
+class ResumeScreeningJobView(RetrieveAPIView):
+    """Status of a resume screening job, with its results once they are persisted."""
+    queryset = models.ResumeScreeningJob.objects.all()
+    serializer_class = serializers.ResumeScreeningJobSerializer
+    permission_classes = [AllowAny]
+
 
 # def send_verification_email(resume):
 #     print("resume email is ",resume.email)
@@ -438,6 +372,8 @@ def addFreelancerSkills(freelancer_id , selected_technologies):
         # Save the updated skills to the freelancer object
         freelancer.skills = json.dumps(existing_skills)
         freelancer.save()
+        sync_freelancer_skills(freelancer)
+        transaction.on_commit(lambda: refresh_freelancer_embedding.delay(str(freelancer.id)))
 
 
 @api_view(['PATCH'])
@@ -468,23 +404,11 @@ def activate_full_assessment(request, resume_id):
                 user = models.Freelancer.objects.get(pk=freelancer.id)
                 # Save the updated FullAssessment object
                 full_assessment.save()
-                notification = models.Notification.objects.create(
-                user=user,
-                type='alert',
-                title="Full Assessment Activated",
-                description="Full Assessment is now activated you can start taking the assessemtns!",
+                notify(
+                    user,
+                    "Full Assessment Activated",
+                    "Full Assessment is now activated you can start taking the assessemtns!",
                 )
-                notification.save()
-                 # HTML content for the email
-                html_content = f"""
-                <html>
-                <body>
-                <p>Congratualations , you have passed to the first round which is full assessment.</p>
-                <p>You can start taking the assessments by login using account credentials used during applying.</p>
-                </body>
-                </html>
-                """
-                send_email(user.email,"Congratualtions you have passed to the first round!",html_content)
                 resume_check.done = True
                 resume_check.save()
             except models.FullAssessment.DoesNotExist:
@@ -492,6 +416,16 @@ def activate_full_assessment(request, resume_id):
                     {"detail": f"FullAssessment object not found for position ID {position_id}."},
                     status=status.HTTP_404_NOT_FOUND
                 )
+        # One email for all activated positions, queued instead of sent inside the loop
+        html_content = f"""
+        <html>
+        <body>
+        <p>Congratualations , you have passed to the first round which is full assessment.</p>
+        <p>You can start taking the assessments by login using account credentials used during applying.</p>
+        </body>
+        </html>
+        """
+        send_email(freelancer.email,"Congratualtions you have passed to the first round!",html_content)
         if (len(selected_technologies.items()) > 0):
                 addFreelancerSkills(freelancer.id , selected_technologies)
         
@@ -530,13 +464,6 @@ def approve_freelancer(request, resume_id):
                 full_assessment.finished = True
                 full_assessment.save()
                 user = models.Freelancer.objects.get(pk=freelancer.id)
-                notification = models.Notification.objects.create(
-                user=user,
-                type='alert',
-                title = "You're Approved!",
-                description = "Congratulations! You are now a valued member of this exceptional community of freelancers. Welcome aboard!"  
-                )
-                notification.save()
                 html_content = f"""
                 <html>
                 <body>
@@ -544,7 +471,14 @@ def approve_freelancer(request, resume_id):
                 </body>
                 </html>
                 """
-                send_email(user.email,"You're Approved to join EthioGurus!",html_content)
+                notify(
+                    user,
+                    "You're Approved!",
+                    "Congratulations! You are now a valued member of this exceptional community of freelancers. Welcome aboard!",
+                    channels=(IN_APP, EMAIL),
+                    email_subject="You're Approved to join EthioGurus!",
+                    email_html=html_content,
+                )
                 resume_check = models.ResumeCheck.objects.get(resume=resume)
                 resume_check.done = True
                 resume_check.save()
@@ -600,31 +534,29 @@ def assign_soft_skills_assessment_appointment(request, freelancer_id):
         full_assessment.save()
 
         # Find available interviewers for the soft skills assessment
-        available_interviewers = get_available_interviewers("soft_skills")
+        available_interviewers = get_available_interviewers(type="soft_skills")
         print("Available interviewers found:", available_interviewers)
 
         if available_interviewers:
             print("Trying to get available appointment dates...")
             # Generate appointment date options
-            appointment_date_options = generate_appointment_date_options(available_interviewers)
+            appointment_date_options = interview_slots.appointment_date_options(available_interviewers)
             print("Available appointment dates found:", appointment_date_options)
 
             # Create an appointment with the generated date options
             appointment = models.Appointment.objects.create(
                 freelancer=full_assessment.freelancer,
                 interview_type="soft_skills_assessment",
-                appointment_date_options=json.dumps(appointment_date_options, cls=DjangoJSONEncoder)
+                appointment_date_options=appointment_date_options
             )
             appointment.save()
 
             # Create a notification for the freelancer about the appointment
-            notification = models.Notification.objects.create(
-                user=full_assessment.freelancer,
-                type='alert',
-                title="Soft Skills Assessment Appointment",
-                description="Congratulations, You've passed the resume assessment and moved to the first round Soft Skills Assessment! Please select your appointment date.",
+            notify(
+                full_assessment.freelancer,
+                "Soft Skills Assessment Appointment",
+                "Congratulations, You've passed the resume assessment and moved to the first round Soft Skills Assessment! Please select your appointment date.",
             )
-            notification.save()
 
             # Return the updated FullAssessment object along with appointment details
             serializer = serializers.FullAssessmentSerializer(full_assessment)
@@ -669,13 +601,13 @@ def assign_live_assessment_appointment(request, freelancer_id):
         full_assessment.save()
 
         # Find available interviewers for the soft skills assessment
-        available_interviewers = get_available_interviewers("live_interview")
+        available_interviewers = get_available_interviewers(type="live_interview")
         print("Available interviewers found:", available_interviewers)
 
         if available_interviewers:
             print("Trying to get available appointment dates...")
             # Generate appointment date options
-            appointment_date_options = generate_appointment_date_options(available_interviewers)
+            appointment_date_options = interview_slots.appointment_date_options(available_interviewers)
             print("Available appointment dates found:", appointment_date_options)
 
             # Create an appointment with the generated date options
@@ -683,18 +615,11 @@ def assign_live_assessment_appointment(request, freelancer_id):
                 freelancer=full_assessment.freelancer,
                 interview_type="live_assessment",
                 category = "live_assessment",
-                appointment_date_options=json.dumps(appointment_date_options, cls=DjangoJSONEncoder)
+                appointment_date_options=appointment_date_options
             )
             appointment.save()
 
             # Create a notification for the freelancer about the appointment
-            notification = models.Notification.objects.create(
-                user=full_assessment.freelancer,
-                type='alert',
-                title="Live Assessment Appointment",
-                description="Congratulations, You've passed the depth skill assessment and moved to the live Assessment! Please select your appointment date.",
-            )
-            notification.save()
             message="Congratulations, You've passed the depth skill assessment and moved to the live Assessment! Please select your appointment date by loggin in..",
             subject = 'Interview appointment Notification'
             html_content = f"""
@@ -704,7 +629,14 @@ def assign_live_assessment_appointment(request, freelancer_id):
                 </body>
                 </html>
                 """
-            send_email(full_assessment.freelancer.email, subject, html_content)
+            notify(
+                full_assessment.freelancer,
+                "Live Assessment Appointment",
+                "Congratulations, You've passed the depth skill assessment and moved to the live Assessment! Please select your appointment date.",
+                channels=(IN_APP, EMAIL),
+                email_subject=subject,
+                email_html=html_content,
+            )
 
             # Return the updated FullAssessment object along with appointment details
             serializer = serializers.FullAssessmentSerializer(full_assessment)
@@ -858,114 +790,6 @@ def send_assessment_update_email(self, freelancer , message):
         print("Email sent successfully.")
 
 
-def get_available_interviewers(type):
-        """Get interviewers for soft skills and have availability."""
-                        
-        # Filter active interviewers
-        interviewers = models.Interviewer.objects.filter(
-            is_active=True,
-            interviews_per_week__gt=0,
-            type=type
-        )
-
-        available_interviewers = []
-        today = timezone.now()
-        start_of_week = today - timedelta(days=today.weekday())  # Start of the current week
-        end_of_week = start_of_week + timedelta(days=6)  # End of the current week
-        
-        for interviewer in interviewers:
-            # Count the number of interviews the interviewer has this week
-            interviews_this_week = models.FreelancerInterview.objects.filter(
-                interviewer=interviewer,
-                appointment__appointment_date__range=(start_of_week, end_of_week),
-                done=False
-            ).count()
-
-            # Count the number of interviews the interviewer has today
-            interviews_today = models.FreelancerInterview.objects.filter(
-                interviewer=interviewer,
-                appointment__appointment_date__date=today.date(),
-                done=False
-            ).count()
-
-            remaining_weekly_slots = interviewer.interviews_per_week - interviews_this_week
-            remaining_daily_slots = interviewer.max_interviews_per_day - interviews_today
-            available_interviewers.append({
-                    'interviewer': interviewer,
-                    'remaining_weekly_slots': remaining_weekly_slots,
-                    'remaining_daily_slots': remaining_daily_slots,
-                })
-
-        # Sort interviewers based on remaining slots (you can customize this sorting logic)
-        available_interviewers.sort(key=lambda x: (x['remaining_weekly_slots'], x['remaining_daily_slots'],), reverse=True)
-
-        # Return only the interviewer objects
-        return [entry['interviewer'] for entry in available_interviewers]
-
-def generate_appointment_date_options(interviewers):
-        """Generate a list of available appointment dates for a group of interviewers."""
-        date_options = []
-        today = timezone.now()
-        day_counter = 0
-
-        # Try to find 5 available appointment slots from the pool of interviewers
-        for interviewer in interviewers:
-            # Get the interviewer's working hours
-            working_hours_start = interviewer.working_hours_start
-            working_hours_end = interviewer.working_hours_end
-
-            # Calculate the start and end of the week for the current iteration
-            start_of_week = today + timedelta(days=day_counter)
-            end_of_week = start_of_week + timedelta(days=6)
-
-            # Generate potential appointment slots within working hours for each day of the week
-            for single_day in range(7):
-                print("day",single_day)
-                current_day = start_of_week + timedelta(days=single_day)
-                
-                # Create datetime objects for the start and end of working hours
-                appointment_start = timezone.make_aware(datetime.combine(current_day.date(), working_hours_start))
-                appointment_end = timezone.make_aware(datetime.combine(current_day.date(), working_hours_end))
-
-                # Count existing interviews for this interviewer in the given week
-                interviews_this_week = models.FreelancerInterview.objects.filter(
-                    interviewer=interviewer,
-                    appointment__appointment_date__range=(start_of_week, end_of_week),
-                    done=False
-                ).count()
-
-                # Count existing interviews for today
-                interviews_today = models.FreelancerInterview.objects.filter(
-                    interviewer=interviewer,
-                    appointment__appointment_date__date=current_day.date(),
-                    done=False
-                ).count()
-
-                # If the interviewer has availability this week and today, check the appointment time
-                if (interviews_this_week < interviewer.interviews_per_week and
-                    interviews_today < interviewer.max_interviews_per_day):
-                    # Check if the appointment time falls within the working hours
-                    print("passed check")
-                    if appointment_start < appointment_end:  # Valid working hours
-                        date_options.append({
-                            "interviewer_id":interviewer.id,
-                            "date": appointment_start.strftime('%Y-%m-%d %H:%M')
-                        })
-
-                # If we've generated 5 options, stop
-                if len(date_options) >= 5:
-                    break
-
-            # Move to the next week if not enough options were generated
-            if len(date_options) >= 5:
-                break
-        
-        day_counter += 7
-        return date_options
-
-
-
-
 class NotStartedAssessmentsView(APIView):
     """
     API endpoint to fetch Resumes and ScreeningResults for assessments assigned to the authenticated ResumeChecker.
@@ -0,0 +1,296 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+from core.models import Freelancer
+from .scoring import get_freelancer_skill_names
+
+TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+
+
+def normalize_rows(matrix):
+    """L2-normalize every row so a dot product is the cosine similarity."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (matrix / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder: every lowercased token is hashed into one of `dim`
+    buckets with a +/-1 sign. Needs no model download or network, which makes it the default
+    for tests and offline deployments.
+    """
+
+    def __init__(self, dim=None):
+        self.dim = dim or getattr(settings, 'FREELANCER_EMBEDDING_DIM', 256)
+        self.name = f'hashing-{self.dim}'
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_RE.findall((text or '').lower()):
+                value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+                matrix[row, value % self.dim] += -1.0 if value >> 63 else 1.0
+        return normalize_rows(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model; the package is only needed when this embedder is configured."""
+
+    def __init__(self, model_name=None):
+        from sentence_transformers import SentenceTransformer
+
+        model_name = model_name or getattr(settings, 'FREELANCER_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f'sentence-transformers-{model_name}'
+
+    def embed(self, texts):
+        vectors = self.model.encode(list(texts), normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_embedder = None
+
+
+def get_embedder():
+    """Return the embedder configured by FREELANCER_EMBEDDER (a dotted class path)."""
+    global _embedder
+    if _embedder is None:
+        _embedder = import_string(getattr(settings, 'FREELANCER_EMBEDDER', 'services.embeddings.HashingEmbedder'))()
+    return _embedder
+
+
+def build_profile_text(freelancer):
+    """Text embedded for a freelancer profile."""
+    certifications = []
+    if isinstance(freelancer.certifications, list):
+        certifications = [cert.get('name') for cert in freelancer.certifications if isinstance(cert, dict) and cert.get('name')]
+    return "\n".join([
+        freelancer.professional_title or '',
+        freelancer.bio or '',
+        ", ".join(get_freelancer_skill_names(freelancer)),
+        ", ".join(certifications),
+    ])
+
+
+class EmbeddingIndex:
+    """
+    Freelancer embeddings stored on disk as a float32 matrix (vectors.npy) and a matching id array
+    (ids.npy). Readers memory-map the current generation; writers build a new generation directory
+    and atomically swap the `current` symlink, except for updates of existing rows which are written
+    in place.
+    """
+
+    def __init__(self, path, embedder):
+        self.path = path
+        self.embedder = embedder
+        self._loaded_target = None
+        self._ids = None
+        self._vectors = None
+
+    @property
+    def current_path(self):
+        return os.path.join(self.path, 'current')
+
+    def load(self):
+        """Return (ids, vectors) of the current generation, or (None, None) if there is no usable index."""
+        try:
+            target = os.readlink(self.current_path)
+        except OSError:
+            return None, None
+        if target != self._loaded_target:
+            generation = os.path.join(self.path, target)
+            try:
+                with open(os.path.join(generation, 'meta.json')) as meta_file:
+                    meta = json.load(meta_file)
+                ids = np.load(os.path.join(generation, 'ids.npy'))
+                vectors = np.load(os.path.join(generation, 'vectors.npy'), mmap_mode='r')
+            except (OSError, ValueError) as e:
+                print(f"Error loading freelancer embedding index: {e}")
+                return None, None
+            if meta.get('embedder') != self.embedder.name:
+                # The index was built by another embedder and needs a rebuild
+                print(f"Embedding index built with {meta.get('embedder')}, expected {self.embedder.name}")
+                return None, None
+            self._loaded_target, self._ids, self._vectors = target, ids, vectors
+        return self._ids, self._vectors
+
+    def search(self, query_vector, k, candidate_ids=None):
+        """Return up to k (freelancer id, cosine similarity) pairs, best first."""
+        ids, vectors = self.load()
+        if ids is None or not len(ids) or k <= 0:
+            return []
+        rows = np.arange(len(ids))
+        if candidate_ids is not None:
+            rows = np.nonzero(np.isin(ids, [str(candidate_id) for candidate_id in candidate_ids]))[0]
+            if not len(rows):
+                return []
+        similarities = vectors[rows] @ np.asarray(query_vector, dtype=np.float32)
+        k = min(k, len(rows))
+        # argpartition finds the top k in linear time, only those k get sorted
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        return [(str(ids[rows[i]]), float(similarities[i])) for i in top]
+
+    def upsert(self, vectors_by_id):
+        """Add or replace the vectors of the given freelancer ids."""
+        if not vectors_by_id:
+            return
+        with self.lock():
+            ids, vectors = self.load()
+            if ids is None:
+                ids = np.array([], dtype='U36')
+                vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+            positions = {freelancer_id: row for row, freelancer_id in enumerate(ids.tolist())}
+            new_ids = [freelancer_id for freelancer_id in vectors_by_id if freelancer_id not in positions]
+
+            if not new_ids:
+                # Every row exists already: overwrite in place, readers keep their mapping
+                writable = np.load(os.path.join(self.path, self._loaded_target, 'vectors.npy'), mmap_mode='r+')
+                for freelancer_id, vector in vectors_by_id.items():
+                    writable[positions[freelancer_id]] = vector
+                writable.flush()
+                return
+
+            all_ids = np.concatenate([ids, np.array(new_ids, dtype='U36')])
+            all_vectors = np.concatenate([
+                np.asarray(vectors),
+                np.array([vectors_by_id[freelancer_id] for freelancer_id in new_ids], dtype=np.float32),
+            ])
+            for freelancer_id, vector in vectors_by_id.items():
+                if freelancer_id in positions:
+                    all_vectors[positions[freelancer_id]] = vector
+            self.write(all_ids, all_vectors)
+
+    def remove(self, freelancer_ids):
+        with self.lock():
+            ids, vectors = self.load()
+            if ids is None:
+                return
+            keep = ~np.isin(ids, [str(freelancer_id) for freelancer_id in freelancer_ids])
+            if not keep.all():
+                self.write(ids[keep], np.asarray(vectors)[keep])
+
+    def rebuild(self, freelancer_ids, vectors):
+        with self.lock():
+            self.write(np.array(freelancer_ids, dtype='U36'), np.asarray(vectors, dtype=np.float32))
+
+    def write(self, ids, vectors):
+        """Write a new generation and make it current. Callers hold the lock."""
+        generation = f'gen-{time.time_ns()}'
+        generation_path = os.path.join(self.path, generation)
+        os.makedirs(generation_path)
+        np.save(os.path.join(generation_path, 'ids.npy'), ids.astype('U36'))
+        np.save(os.path.join(generation_path, 'vectors.npy'), vectors.astype(np.float32))
+        with open(os.path.join(generation_path, 'meta.json'), 'w') as meta_file:
+            json.dump({'embedder': self.embedder.name, 'dim': int(vectors.shape[1]), 'count': len(ids)}, meta_file)
+
+        link = os.path.join(self.path, f'.current-{generation}')
+        os.symlink(generation, link)
+        os.replace(link, self.current_path)
+
+        # Old generations stay readable for processes that still map them until they reload
+        for name in os.listdir(self.path):
+            if name.startswith('gen-') and name != generation:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        return IndexLock(os.path.join(self.path, '.lock'))
+
+
+class IndexLock:
+    """Exclusive file lock so concurrent workers do not interleave index writes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'w')
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+_index = None
+
+
+def get_index():
+    global _index
+    path = getattr(settings, 'FREELANCER_EMBEDDING_INDEX_DIR', os.path.join(settings.BASE_DIR, 'embeddings'))
+    if _index is None or _index.path != path:
+        _index = EmbeddingIndex(path, get_embedder())
+    return _index
+
+
+def index_freelancers(freelancers):
+    """Embed the given freelancer profiles and store them in the index."""
+    freelancers = list(freelancers)
+    if not freelancers:
+        return
+    vectors = get_embedder().embed([build_profile_text(freelancer) for freelancer in freelancers])
+    get_index().upsert({str(freelancer.id): vector for freelancer, vector in zip(freelancers, vectors)})
+
+
+def rebuild_freelancer_index(chunk_size=500):
+    """Embed every active freelancer into a fresh index generation."""
+    embedder = get_embedder()
+    ids, chunks, batch = [], [], []
+    for freelancer in Freelancer.objects.filter(is_active=True).order_by('id').iterator(chunk_size=chunk_size):
+        batch.append(freelancer)
+        if len(batch) == chunk_size:
+            chunks.append(embedder.embed([build_profile_text(f) for f in batch]))
+            ids += [str(f.id) for f in batch]
+            batch = []
+    if batch:
+        chunks.append(embedder.embed([build_profile_text(f) for f in batch]))
+        ids += [str(f.id) for f in batch]
+    vectors = np.concatenate(chunks) if chunks else np.zeros((0, embedder.dim), dtype=np.float32)
+    get_index().rebuild(ids, vectors)
+    return len(ids)
+
+
+class SemanticScoringEngine:
+    """
+    Drop-in replacement for FreelancerScoringEngine that scores candidates by cosine similarity
+    between the project description and their profile embedding, without any network call.
+    """
+
+    def score(self, freelancers, position_applied_for, project_duration, project_budget):
+        scores = {str(freelancer.id): 0 for freelancer in freelancers}
+        for chunk in self.iter_scores(freelancers, position_applied_for, project_duration, project_budget):
+            scores.update(chunk)
+        return scores
+
+    def iter_scores(self, freelancers, position_applied_for, project_duration, project_budget):
+        freelancers = list(freelancers)
+        if not freelancers or not position_applied_for:
+            return
+        embedder = get_embedder()
+        query_vector = embedder.embed([position_applied_for])[0]
+
+        ids = [str(freelancer.id) for freelancer in freelancers]
+        similarities = dict(get_index().search(query_vector, len(ids), candidate_ids=ids))
+
+        # Profiles not indexed yet are embedded on the fly
+        missing = [freelancer for freelancer in freelancers if str(freelancer.id) not in similarities]
+        if missing:
+            vectors = embedder.embed([build_profile_text(freelancer) for freelancer in missing])
+            similarities.update(
+                (str(freelancer.id), float(vector @ query_vector)) for freelancer, vector in zip(missing, vectors)
+            )
+
+        # Same 0-100 scale as the AI scores
+        yield {freelancer_id: round(max(similarity, 0) * 100, 2) for freelancer_id, similarity in similarities.items()}
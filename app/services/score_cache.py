@@ -0,0 +1,99 @@
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from core.models import FreelancerScoreCache
+
+
+def content_hash(value):
+    """Return the sha256 hex digest of a string."""
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def normalize_project_params(position_applied_for, project_duration, project_budget):
+    """Normalize the project parameters that go into the scoring prompt."""
+    def normalize(value):
+        return " ".join(str(value or "").lower().split())
+
+    return {
+        'position_applied_for': normalize(position_applied_for),
+        'project_duration': normalize(project_duration),
+        'project_budget': normalize(project_budget),
+    }
+
+
+def project_hash(model_name, position_applied_for, project_duration, project_budget):
+    params = normalize_project_params(position_applied_for, project_duration, project_budget)
+    params['model'] = model_name
+    return content_hash(json.dumps(params, sort_keys=True))
+
+
+def get_cache_ttl():
+    return timedelta(seconds=getattr(settings, 'AI_SCORE_CACHE_TTL', 7 * 24 * 60 * 60))
+
+
+def get_cached_scores(profile_hashes, project_hash_value):
+    """
+    Return {freelancer id: score} for fresh cache entries.
+    profile_hashes maps freelancer id to the hash of its current scoring fields.
+    """
+    if not profile_hashes:
+        return {}
+    entries = FreelancerScoreCache.objects.filter(
+        project_hash=project_hash_value,
+        profile_hash__in=set(profile_hashes.values()),
+        freelancer_id__in=list(profile_hashes.keys()),
+        created_at__gte=timezone.now() - get_cache_ttl(),
+    ).values_list('id', 'freelancer_id', 'profile_hash', 'score')
+
+    scores = {}
+    hit_ids = []
+    for entry_id, freelancer_id, profile_hash_value, score in entries:
+        if profile_hashes.get(str(freelancer_id)) == profile_hash_value:
+            scores[str(freelancer_id)] = score
+            hit_ids.append(entry_id)
+
+    # Touch hits so LRU pruning keeps the entries that are still in use
+    if hit_ids:
+        FreelancerScoreCache.objects.filter(id__in=hit_ids).update(last_used_at=timezone.now())
+    return scores
+
+
+def store_scores(scores, profile_hashes, project_hash_value):
+    """Persist freshly computed {freelancer id: score} values."""
+    entries = [
+        FreelancerScoreCache(
+            freelancer_id=freelancer_id,
+            profile_hash=profile_hashes[freelancer_id],
+            project_hash=project_hash_value,
+            score=score,
+        )
+        for freelancer_id, score in scores.items()
+        if freelancer_id in profile_hashes
+    ]
+    if entries:
+        # A conflicting row holds a stale score for the same hashes, refresh it in place
+        FreelancerScoreCache.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['freelancer', 'profile_hash', 'project_hash'],
+            update_fields=['score', 'created_at', 'last_used_at'],
+        )
+
+
+def invalidate_freelancer_scores(freelancer):
+    """Drop every cached score of a freelancer, e.g. after a profile edit."""
+    FreelancerScoreCache.objects.filter(freelancer=freelancer).delete()
+
+
+def prune_score_cache():
+    """Delete expired entries and the least recently used ones above the configured maximum."""
+    deleted, _ = FreelancerScoreCache.objects.filter(created_at__lt=timezone.now() - get_cache_ttl()).delete()
+
+    max_entries = getattr(settings, 'AI_SCORE_CACHE_MAX_ENTRIES', 50000)
+    cutoff = FreelancerScoreCache.objects.order_by('-last_used_at').values_list('last_used_at', flat=True)[max_entries:max_entries + 1]
+    if cutoff:
+        evicted, _ = FreelancerScoreCache.objects.filter(last_used_at__lte=cutoff[0]).delete()
+        deleted += evicted
+    return deleted
@@ -0,0 +1,184 @@
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+import google.generativeai as genai
+from django.conf import settings
+from . import score_cache
+
+MODEL_NAME = 'gemini-1.5-flash'
+
+
+def get_freelancer_skill_names(freelancer):
+    """Return the skill names stored on a freelancer profile."""
+    skills = []
+    if freelancer.skills:
+        try:
+            # Parse skills JSON if stored as a string
+            skills_data = json.loads(freelancer.skills) if isinstance(freelancer.skills, str) else freelancer.skills
+            if isinstance(skills_data, list):
+                skills = [skill['skill'] if isinstance(skill, dict) else str(skill) for skill in skills_data
+                          if not isinstance(skill, dict) or 'skill' in skill]
+            elif isinstance(skills_data, dict):
+                skills = [skills_data.get('skill')]
+        except json.JSONDecodeError:
+            print(f"Error parsing skills JSON for freelancer {freelancer.full_name}")
+    return [skill for skill in skills if skill]
+
+
+def build_resume_text(freelancer):
+    """Build the resume text sent to the AI model for a freelancer."""
+    skills = get_freelancer_skill_names(freelancer)
+
+    # Extract certification names from dictionaries
+    certifications = []
+    if freelancer.certifications:
+        try:
+            # Assuming certifications is a list of dicts
+            certifications = [cert.get('name') for cert in freelancer.certifications if 'name' in cert]
+        except Exception as e:
+            print(f"Error processing certifications for freelancer {freelancer.full_name}: {e}")
+
+    return f"""
+        Name: {freelancer.full_name}
+        Title: {freelancer.professional_title}
+        Skills: {', '.join(skills)}
+        Experience: {freelancer.experience} years
+        Certifications: {', '.join(certifications)}
+        Portfolio: {freelancer.portfolio}
+        Previous Work Experience: {freelancer.prev_work_experience}
+        """
+
+
+def build_batch_prompt(candidates, position_applied_for, project_duration, project_budget):
+    """Build a single prompt that asks for a score for every candidate in the batch."""
+    resumes = "\n".join(
+        f"Candidate ID: {candidate_id}\nResume Text:\n{resume_text}"
+        for candidate_id, resume_text in candidates
+    )
+    prompt = f"""
+        You are a hiring expert for a top freelancing site. Given the following resumes and the position applied for, the project budget, and the project duration, please evaluate each candidate based on these criteria and provide a score from 0 to 100 for every candidate:
+
+        Position Applied For: {position_applied_for}
+        Project Duration: {project_duration}
+        Project Budget: {project_budget}
+        Criteria:
+        Based on the match between the freelancer resume and the project requirements
+
+        {resumes}
+        """
+    prompt += "\nResponse format (one entry per candidate ID):\n{\"<candidate id>\": float}"
+    return prompt
+
+
+def parse_batch_scores(response_text):
+    """Parse the {candidate_id: score} mapping returned by the AI model."""
+    json_text = response_text.strip().strip('```json').strip('```').strip()
+    try:
+        data = json.loads(json_text)
+    except json.JSONDecodeError as e:
+        print(f"JSON decode error: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    scores = {}
+    for candidate_id, value in data.items():
+        # Accept both {"id": 80} and {"id": {"score": 80}}
+        if isinstance(value, dict):
+            value = value.get('score', 0)
+        try:
+            scores[str(candidate_id)] = float(value)
+        except (TypeError, ValueError):
+            scores[str(candidate_id)] = 0
+    return scores
+
+
+class FreelancerScoringEngine:
+    """
+    Score freelancers against a project with a few batched AI prompts.
+    Batches run concurrently on a bounded thread pool and every call has a timeout,
+    so search latency grows with the number of batches instead of the number of candidates.
+    """
+
+    def __init__(self, client=None, batch_size=None, max_workers=None, timeout=None, use_cache=True):
+        self.client = client
+        self.use_cache = use_cache
+        self.batch_size = batch_size or getattr(settings, 'AI_SCORING_BATCH_SIZE', 20)
+        self.max_workers = max_workers or getattr(settings, 'AI_SCORING_MAX_WORKERS', 4)
+        self.timeout = timeout or getattr(settings, 'AI_SCORING_TIMEOUT', 30)
+
+    def get_client(self):
+        if self.client is None:
+            self.client = genai.GenerativeModel(MODEL_NAME)
+        return self.client
+
+    def score(self, freelancers, position_applied_for, project_duration, project_budget):
+        """Return a {freelancer id: score} mapping; failed or timed out batches score 0."""
+        scores = {str(freelancer.id): 0 for freelancer in freelancers}
+        for chunk in self.iter_scores(freelancers, position_applied_for, project_duration, project_budget):
+            scores.update(chunk)
+        return scores
+
+    def iter_scores(self, freelancers, position_applied_for, project_duration, project_budget):
+        """
+        Yield {freelancer id: score} chunks as soon as they are known: cached scores first,
+        then one chunk per finished batch. Candidates of failed batches are never yielded.
+        """
+        candidates = [(str(freelancer.id), build_resume_text(freelancer)) for freelancer in freelancers]
+        if not candidates:
+            return
+
+        if self.use_cache:
+            # Only candidates whose profile changed or was never scored for this project go to the model
+            profile_hashes = {
+                candidate_id: score_cache.content_hash(resume_text) for candidate_id, resume_text in candidates
+            }
+            project_hash = score_cache.project_hash(MODEL_NAME, position_applied_for, project_duration, project_budget)
+            cached_scores = score_cache.get_cached_scores(profile_hashes, project_hash)
+            if cached_scores:
+                yield cached_scores
+            candidates = [candidate for candidate in candidates if candidate[0] not in cached_scores]
+
+        for batch_scores in self.iter_batch_scores(candidates, position_applied_for, project_duration, project_budget):
+            if self.use_cache:
+                score_cache.store_scores(batch_scores, profile_hashes, project_hash)
+            yield batch_scores
+
+    def iter_batch_scores(self, candidates, position_applied_for, project_duration, project_budget):
+        """Score (id, resume text) candidates with the model, yielding each batch as it completes."""
+        if not candidates:
+            return
+
+        batches = [candidates[i:i + self.batch_size] for i in range(0, len(candidates), self.batch_size)]
+        prompts = [
+            build_batch_prompt(batch, position_applied_for, project_duration, project_budget)
+            for batch in batches
+        ]
+
+        # Batches beyond the pool size wait for a free worker, so allow one timeout per wave
+        waves = math.ceil(len(batches) / self.max_workers)
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches)))
+        try:
+            futures = {executor.submit(self.score_batch, prompt): batch for prompt, batch in zip(prompts, batches)}
+            try:
+                for future in as_completed(futures, timeout=self.timeout * waves):
+                    try:
+                        batch_scores = future.result()
+                    except Exception as e:
+                        print(f"Error scoring resumes with AI: {e}")
+                        continue
+                    batch_ids = {candidate_id for candidate_id, _ in futures[future]}
+                    batch_scores = {
+                        candidate_id: score for candidate_id, score in batch_scores.items() if candidate_id in batch_ids
+                    }
+                    if batch_scores:
+                        yield batch_scores
+            except FutureTimeoutError:
+                print(f"AI scoring batch timed out after {self.timeout}s")
+        finally:
+            # Do not block the request on calls that already timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def score_batch(self, prompt):
+        response = self.get_client().generate_content(prompt, request_options={'timeout': self.timeout})
+        return parse_batch_scores(response.text)
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Lower
+from core.models import Freelancer, FreelancerSkill
+from user.serializers import FreelancerSerializer
+
+# availability_status values that take a freelancer out of search results
+UNAVAILABLE_STATUSES = ['not avaliable', 'not available', 'unavailable']
+NO_WORKING_PREFERENCE = "I'll decide later"
+
+
+def get_rerank_top_k():
+    return getattr(settings, 'AI_RERANK_TOP_K', 50)
+
+
+def retrieve_candidates(tech_stack, working_preference=None, verified_only=False, offset=0, limit=None):
+    """
+    First search stage: filter freelancers in SQL and rank them with a cheap deterministic score.
+    Returns up to `limit` (freelancer, skill matches) pairs starting at `offset`, best first,
+    ready for the AI reranker.
+    """
+    names = {str(name).strip().lower() for name in tech_stack if name}
+    if not names:
+        return []
+
+    matching_skills = FreelancerSkill.objects.annotate(name_lower=Lower('name')).filter(name_lower__in=names)
+    skill_matches = (
+        matching_skills.filter(freelancer=OuterRef('pk'))
+        .order_by()
+        .values('freelancer')
+        .annotate(count=Count('name_lower', distinct=True))
+        .values('count')
+    )
+
+    unavailable = Q()
+    for availability_status in UNAVAILABLE_STATUSES:
+        unavailable |= Q(availability_status__iexact=availability_status)
+
+    freelancers = (
+        Freelancer.objects.filter(is_active=True, id__in=matching_skills.values('freelancer'))
+        .exclude(unavailable)
+        .annotate(skill_matches=Coalesce(Subquery(skill_matches, output_field=IntegerField()), 0))
+    )
+    if working_preference and working_preference != NO_WORKING_PREFERENCE:
+        freelancers = freelancers.filter(preferred_working_hours=working_preference)
+    if verified_only:
+        freelancers = freelancers.filter(verified=True)
+
+    # Skill overlap first, then verified profiles, rating and experience; id keeps the order stable
+    freelancers = freelancers.order_by(
+        '-skill_matches',
+        F('verified').desc(nulls_last=True),
+        F('average_rating').desc(nulls_last=True),
+        F('experience').desc(nulls_last=True),
+        'id',
+    )
+    if limit is not None:
+        freelancers = freelancers[offset:offset + limit]
+    elif offset:
+        freelancers = freelancers[offset:]
+    return [(freelancer, freelancer.skill_matches) for freelancer in freelancers]
+
+
+def total_score(ai_score, skill_matches):
+    return ai_score + (skill_matches * 10)  # Adjust the weight of skill matches
+
+
+def rank_candidates(candidates, scores):
+    """Order (freelancer, skill matches) pairs by AI score plus skill matches; ties keep the SQL ranking."""
+    ranked_freelancers = [
+        (total_score(scores.get(str(freelancer.id), 0), skill_matches), freelancer)
+        for freelancer, skill_matches in candidates
+    ]
+    ranked_freelancers.sort(key=lambda x: x[0], reverse=True)
+    return [freelancer for _, freelancer in ranked_freelancers]
+
+
+def candidate_payload(freelancer, skill_matches, ai_score):
+    return {
+        'freelancer': FreelancerSerializer(freelancer).data,
+        'score': total_score(ai_score, skill_matches),
+    }
@@ -0,0 +1,33 @@
+import json
+import uuid
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from core.redis_client import get_redis
+
+JOB_KEY = 'freelancer_search:job:{job_id}'
+
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+def get_job_ttl():
+    return getattr(settings, 'FREELANCER_SEARCH_JOB_TTL', 60 * 60)
+
+
+def save_job(job_id, job):
+    get_redis().set(JOB_KEY.format(job_id=job_id), json.dumps(job, cls=DjangoJSONEncoder), ex=get_job_ttl())
+
+
+def create_job():
+    """Register a pending search job and return its id."""
+    job_id = str(uuid.uuid4())
+    save_job(job_id, {'job_id': job_id, 'status': PENDING, 'total': None, 'scored': 0, 'results': []})
+    return job_id
+
+
+def get_job(job_id):
+    """Return the stored job state, or None if it never existed or has expired."""
+    data = get_redis().get(JOB_KEY.format(job_id=job_id))
+    return json.loads(data) if data else None
@@ -0,0 +1,50 @@
+import json
+from django.db import transaction
+from django.db.models.functions import Lower
+from core.models import FreelancerSkill, Technology
+
+
+def parse_skills(skills):
+    """Return the skill dicts stored in a Freelancer.skills value (JSON string or list)."""
+    if not skills:
+        return []
+    if isinstance(skills, str):
+        try:
+            skills = json.loads(skills)
+        except json.JSONDecodeError:
+            return []
+    if isinstance(skills, dict):
+        skills = [skills]
+    if not isinstance(skills, list):
+        return []
+    return [skill for skill in skills if isinstance(skill, dict) and skill.get('skill')]
+
+
+def sync_freelancer_skills(freelancer):
+    """Rebuild the FreelancerSkill rows of a freelancer from its skills JSON."""
+    skills = parse_skills(freelancer.skills)
+
+    # Resolve every skill name to a Technology with one query
+    names = {str(skill['skill']).strip().lower() for skill in skills}
+    technologies = {}
+    for technology_id, name in Technology.objects.annotate(name_lower=Lower('name')).filter(
+            name_lower__in=names).values_list('id', 'name_lower'):
+        technologies.setdefault(name, technology_id)
+
+    rows = []
+    for skill in skills:
+        name = str(skill['skill']).strip()
+        rows.append(FreelancerSkill(
+            freelancer=freelancer,
+            technology_id=technologies.get(name.lower()),
+            name=name[:255],
+            category=str(skill.get('category') or '')[:255],
+            type=skill.get('type') if skill.get('type') in ('practical', 'theoretical') else '',
+            both_practical_theoretical=bool(skill.get('both_practical_theoretical')),
+            verified=bool(skill.get('verified')),
+        ))
+
+    with transaction.atomic():
+        FreelancerSkill.objects.filter(freelancer=freelancer).delete()
+        FreelancerSkill.objects.bulk_create(rows)
+
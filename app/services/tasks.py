@@ -0,0 +1,73 @@
+from celery import shared_task
+from core.models import Freelancer
+from . import embeddings, score_cache, search_jobs
+from .scoring import FreelancerScoringEngine
+from .search import candidate_payload, get_rerank_top_k, retrieve_candidates
+
+
+@shared_task
+def prune_score_cache():
+    deleted = score_cache.prune_score_cache()
+    print(f"Pruned {deleted} cached AI scores")
+
+
+@shared_task
+def run_freelancer_search(job_id, params):
+    """
+    Rank freelancers for a search job in the background.
+    Partial results are written to the job after every scoring batch so clients can poll them.
+    """
+    job = {'job_id': job_id, 'status': search_jobs.RUNNING, 'total': None, 'scored': 0, 'results': []}
+    search_jobs.save_job(job_id, job)
+    try:
+        candidates = retrieve_candidates(
+            params.get('tech_stack') or [],
+            working_preference=params.get('working_preference'),
+            verified_only=params.get('verified_only', False),
+            limit=get_rerank_top_k(),
+        )
+        job['total'] = len(candidates)
+        search_jobs.save_job(job_id, job)
+
+        by_id = {str(freelancer.id): (freelancer, skill_matches) for freelancer, skill_matches in candidates}
+        engine = embeddings.SemanticScoringEngine() if params.get('semantic') else FreelancerScoringEngine()
+        for chunk in engine.iter_scores(
+                [freelancer for freelancer, _ in candidates],
+                position_applied_for=params.get('project_description'),
+                project_duration=params.get('project_duration'),
+                project_budget=params.get('project_budget')):
+            for freelancer_id, score in chunk.items():
+                if freelancer_id in by_id:
+                    freelancer, skill_matches = by_id.pop(freelancer_id)
+                    job['results'].append(candidate_payload(freelancer, skill_matches, score))
+            job['scored'] = len(job['results'])
+            job['results'].sort(key=lambda result: result['score'], reverse=True)
+            search_jobs.save_job(job_id, job)
+
+        # Candidates of failed or timed out batches keep only their skill score
+        for freelancer, skill_matches in by_id.values():
+            job['results'].append(candidate_payload(freelancer, skill_matches, 0))
+        job['results'].sort(key=lambda result: result['score'], reverse=True)
+        job['scored'] = len(job['results'])
+        job['status'] = search_jobs.COMPLETED
+    except Exception as e:
+        print(f"Freelancer search job {job_id} failed: {e}")
+        job['status'] = search_jobs.FAILED
+        job['error'] = str(e)
+    search_jobs.save_job(job_id, job)
+
+
+@shared_task
+def refresh_freelancer_embedding(freelancer_id):
+    """Re-embed one freelancer profile after it changed."""
+    freelancer = Freelancer.objects.filter(id=freelancer_id, is_active=True).first()
+    if freelancer is None:
+        embeddings.get_index().remove([freelancer_id])
+        return
+    embeddings.index_freelancers([freelancer])
+
+
+@shared_task
+def rebuild_freelancer_embeddings():
+    count = embeddings.rebuild_freelancer_index()
+    print(f"Embedded {count} freelancer profiles")
@@ -0,0 +1,134 @@
+import json
+import shutil
+import tempfile
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from services import embeddings
+from services.embeddings import EmbeddingIndex, HashingEmbedder, SemanticScoringEngine
+from services.tasks import refresh_freelancer_embedding
+from .test_freelancer_skills import create_freelancer
+
+
+class HashingEmbedderTests(TestCase):
+
+    def test_embeddings_are_deterministic_and_normalized(self):
+        embedder = HashingEmbedder(dim=64)
+        first, second, empty = embedder.embed(["Django REST developer", "Django REST developer", ""])
+
+        self.assertEqual(first.dtype, np.float32)
+        np.testing.assert_array_equal(first, second)
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+        self.assertFalse(empty.any())
+
+    def test_similar_texts_are_closer(self):
+        embedder = HashingEmbedder(dim=256)
+        query, close, far = embedder.embed([
+            "python django backend", "senior python django backend engineer", "graphic designer illustrator",
+        ])
+        self.assertGreater(query @ close, query @ far)
+
+
+class EmbeddingIndexTests(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+        self.embedder = HashingEmbedder(dim=32)
+        self.index = EmbeddingIndex(self.path, self.embedder)
+        self.vectors = self.embedder.embed(["python django", "react frontend", "go kubernetes"])
+
+    def test_search_returns_cosine_top_k(self):
+        self.index.rebuild(['a', 'b', 'c'], self.vectors)
+
+        results = self.index.search(self.vectors[1], k=2)
+
+        self.assertEqual(results[0][0], 'b')
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+        self.assertEqual(len(results), 2)
+        self.assertIsInstance(self.index.load()[1], np.memmap)
+
+    def test_search_restricted_to_candidates(self):
+        self.index.rebuild(['a', 'b', 'c'], self.vectors)
+
+        results = self.index.search(self.vectors[1], k=5, candidate_ids=['a', 'c'])
+
+        self.assertEqual({freelancer_id for freelancer_id, _ in results}, {'a', 'c'})
+        self.assertGreaterEqual(results[0][1], results[1][1])
+        self.assertEqual(self.index.search(self.vectors[1], k=5, candidate_ids=['x']), [])
+
+    def test_upsert_updates_in_place_and_appends(self):
+        self.index.rebuild(['a', 'b'], self.vectors[:2])
+        generation = self.index.load()
+
+        self.index.upsert({'a': self.vectors[2]})
+        self.assertEqual(self.index.search(self.vectors[2], k=1)[0][0], 'a')
+        self.assertIs(self.index.load()[0], generation[0])
+
+        self.index.upsert({'c': self.vectors[0]})
+        ids, vectors = self.index.load()
+        self.assertEqual(list(ids), ['a', 'b', 'c'])
+        self.assertEqual(vectors.shape, (3, 32))
+
+    def test_remove(self):
+        self.index.rebuild(['a', 'b', 'c'], self.vectors)
+        self.index.remove(['b'])
+        self.assertEqual(list(self.index.load()[0]), ['a', 'c'])
+
+    def test_index_built_by_another_embedder_is_ignored(self):
+        self.index.rebuild(['a'], self.vectors[:1])
+        other = EmbeddingIndex(self.path, HashingEmbedder(dim=16))
+        self.assertEqual(other.load(), (None, None))
+
+
+class SemanticSearchTests(TestCase):
+
+    def setUp(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        settings_override = override_settings(FREELANCER_EMBEDDING_INDEX_DIR=path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.backend = create_freelancer("backend@example.com", [{"skill": "Python"}, {"skill": "Django"}])
+        self.backend.professional_title = "Backend engineer"
+        self.backend.bio = "I build REST APIs and data pipelines"
+        self.backend.save()
+        self.data = create_freelancer("data@example.com", [{"skill": "Python"}, {"skill": "Pandas"}])
+        self.data.professional_title = "Data scientist"
+        self.data.bio = "Machine learning models and dashboards"
+        self.data.save()
+
+    def test_refresh_task_indexes_profile(self):
+        refresh_freelancer_embedding(str(self.backend.id))
+        ids, _ = embeddings.get_index().load()
+        self.assertEqual(list(ids), [str(self.backend.id)])
+
+        self.backend.is_active = False
+        self.backend.save()
+        refresh_freelancer_embedding(str(self.backend.id))
+        self.assertEqual(list(embeddings.get_index().load()[0]), [])
+
+    def test_semantic_engine_scores_without_network(self):
+        embeddings.rebuild_freelancer_index()
+        scores = SemanticScoringEngine().score(
+            [self.backend, self.data], "Backend engineer to build REST APIs", None, None
+        )
+        self.assertGreater(scores[str(self.backend.id)], scores[str(self.data.id)])
+        self.assertTrue(all(0 <= score <= 100 for score in scores.values()))
+
+    def test_semantic_search_view(self):
+        # data@ is not indexed yet and is embedded on the fly
+        refresh_freelancer_embedding(str(self.backend.id))
+
+        response = APIClient().get(reverse('freelancer_search'), {
+            'tech_stack': json.dumps(['python']),
+            'working_preference': 'full_time',
+            'project_description': 'Machine learning dashboards',
+            'semantic': 'true',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([f['id'] for f in response.data['freelancers']], [str(self.data.id), str(self.backend.id)])
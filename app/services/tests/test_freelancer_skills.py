@@ -0,0 +1,133 @@
+import json
+from unittest.mock import patch
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Freelancer, FreelancerSkill, Interviewer, Technology
+from services.scoring import FreelancerScoringEngine
+from services.skills import parse_skills, sync_freelancer_skills
+from .test_scoring import FakeGeminiClient
+
+
+def create_freelancer(email, skills, preferred_working_hours="full_time"):
+    freelancer = Freelancer.objects.create(
+        email=email,
+        full_name=email.split('@')[0],
+        skills=json.dumps(skills),
+        preferred_working_hours=preferred_working_hours,
+    )
+    sync_freelancer_skills(freelancer)
+    return freelancer
+
+
+class FreelancerSkillSyncTests(TestCase):
+
+    def test_parse_skills_accepts_strings_lists_and_dicts(self):
+        self.assertEqual(parse_skills('[{"skill": "Python"}]'), [{"skill": "Python"}])
+        self.assertEqual(parse_skills({"skill": "Go"}), [{"skill": "Go"}])
+        self.assertEqual(parse_skills("not json"), [])
+        self.assertEqual(parse_skills(None), [])
+
+    def test_sync_rebuilds_rows_from_json(self):
+        technology = Technology.objects.create(name="Django")
+        freelancer = create_freelancer("dev@example.com", [
+            {"skill": "django", "category": "Backend", "type": "practical", "verified": True},
+            {"skill": "React", "category": "Frontend", "type": "theoretical"},
+        ])
+
+        skills = {skill.name: skill for skill in FreelancerSkill.objects.filter(freelancer=freelancer)}
+        self.assertEqual(set(skills), {"django", "React"})
+        self.assertEqual(skills["django"].technology, technology)
+        self.assertTrue(skills["django"].verified)
+        self.assertFalse(skills["React"].verified)
+
+        freelancer.skills = json.dumps([{"skill": "Go"}])
+        freelancer.save()
+        sync_freelancer_skills(freelancer)
+        self.assertEqual(list(FreelancerSkill.objects.filter(freelancer=freelancer).values_list('name', flat=True)), ["Go"])
+
+
+class FreelancerSkillViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_search_filters_on_skill_table(self):
+        match = create_freelancer("match@example.com", [{"skill": "Python"}])
+        create_freelancer("part@example.com", [{"skill": "Python"}], preferred_working_hours="part_time")
+        create_freelancer("other@example.com", [{"skill": "Go"}])
+        engine = FreelancerScoringEngine(client=FakeGeminiClient())
+
+        with patch('services.views.FreelancerSearchView.get_scoring_engine', return_value=engine):
+            response = self.client.get(reverse('freelancer_search'), {
+                'tech_stack': json.dumps(['python']),
+                'working_preference': 'full_time',
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([freelancer['id'] for freelancer in response.data['freelancers']], [str(match.id)])
+
+    def test_profile_update_syncs_skills(self):
+        freelancer = create_freelancer("dev@example.com", [{"skill": "Python", "type": "practical"}])
+        self.client.force_authenticate(user=freelancer)
+
+        response = self.client.patch(reverse('user:manage-freelancer'), {
+            'skills': json.dumps([{"skill": "Go", "type": "practical"}]),
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(FreelancerSkill.objects.filter(freelancer=freelancer).values_list('name', flat=True)),
+            {"Python", "Go"},
+        )
+
+    def test_every_update_path_syncs_skills_and_refreshes_the_embedding(self):
+        freelancer = create_freelancer("dev@example.com", [{"skill": "Python", "type": "practical"}])
+        self.client.force_authenticate(user=freelancer)
+
+        with patch('services.tasks.refresh_freelancer_embedding') as refresh, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse('user:freelancer-detail', args=[freelancer.id]), {
+                'skills': json.dumps([{"skill": "Go", "type": "practical"}]),
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(FreelancerSkill.objects.filter(freelancer=freelancer).values_list('name', flat=True)), ["Go"])
+        refresh.delay.assert_called_once_with(str(freelancer.id))
+
+    def test_verify_skills_updates_skill_rows(self):
+        freelancer = create_freelancer("dev@example.com", [
+            {"skill": "Python", "category": "Backend", "type": "practical", "verified": False},
+            {"skill": "React", "category": "Frontend", "type": "practical", "verified": False},
+        ])
+        interviewer = Interviewer.objects.create(email="interviewer@example.com", full_name="Interviewer")
+        self.client.force_authenticate(user=interviewer)
+
+        response = self.client.post(reverse('user:verify-freelnacer-skills'), {
+            'skills_passed': ['Python'],
+            'category': 'Backend',
+            'freelancer_id': str(freelancer.id),
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        verified = dict(FreelancerSkill.objects.filter(freelancer=freelancer).values_list('name', 'verified'))
+        self.assertEqual(verified, {"Python": True, "React": False})
+
+    def test_verify_skills_ignores_case_and_whitespace(self):
+        freelancer = create_freelancer("dev@example.com", [
+            {"skill": " Python ", "category": "Backend", "type": "practical", "verified": False},
+        ])
+        interviewer = Interviewer.objects.create(email="interviewer@example.com", full_name="Interviewer")
+        self.client.force_authenticate(user=interviewer)
+
+        response = self.client.post(reverse('user:verify-freelnacer-skills'), {
+            'skills_passed': ['python '],
+            'category': 'Backend',
+            'freelancer_id': str(freelancer.id),
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(FreelancerSkill.objects.get(freelancer=freelancer, name="Python").verified)
+        freelancer.refresh_from_db()
+        self.assertTrue(json.loads(freelancer.skills)[0]["verified"])
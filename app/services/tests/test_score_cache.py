@@ -0,0 +1,85 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Freelancer, FreelancerScoreCache
+from services import score_cache
+from services.scoring import FreelancerScoringEngine
+from .test_scoring import FakeGeminiClient, create_freelancers
+
+
+class FreelancerScoreCacheTests(TestCase):
+
+    def setUp(self):
+        self.freelancers = create_freelancers(5)
+
+    def score(self, client, freelancers=None, description="Backend developer"):
+        engine = FreelancerScoringEngine(client=client, batch_size=10, timeout=5)
+        return engine.score(freelancers or self.freelancers, description, "1 month", "1000")
+
+    def test_repeat_search_is_served_from_cache(self):
+        self.score(FakeGeminiClient(score=70))
+
+        client = FakeGeminiClient(score=10)
+        scores = self.score(client)
+
+        self.assertEqual(client.calls, 0)
+        self.assertEqual(set(scores.values()), {70})
+
+    def test_project_params_are_normalized(self):
+        self.score(FakeGeminiClient(score=70))
+
+        client = FakeGeminiClient()
+        self.score(client, description="  backend   DEVELOPER ")
+
+        self.assertEqual(client.calls, 0)
+
+    def test_changed_profile_is_rescored(self):
+        self.score(FakeGeminiClient(score=70))
+        freelancer = Freelancer.objects.get(id=self.freelancers[0].id)
+        freelancer.experience = 12
+        freelancer.save()
+
+        client = FakeGeminiClient(score=90)
+        scores = self.score(client, freelancers=[freelancer] + self.freelancers[1:])
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(scores[str(freelancer.id)], 90)
+        self.assertEqual(scores[str(self.freelancers[1].id)], 70)
+
+    def test_failed_batches_are_not_cached(self):
+        engine = FreelancerScoringEngine(client=FakeGeminiClient(delay=1), batch_size=10, timeout=0.1)
+        engine.score(self.freelancers, "Timeout", "1 month", "1000")
+
+        self.assertFalse(FreelancerScoreCache.objects.exists())
+
+    def test_profile_update_invalidates_scores(self):
+        self.score(FakeGeminiClient(score=70))
+        freelancer = self.freelancers[0]
+        api_client = APIClient()
+        api_client.force_authenticate(user=freelancer)
+
+        response = api_client.patch(reverse('user:manage-freelancer'), {'experience': 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(FreelancerScoreCache.objects.filter(freelancer=freelancer).exists())
+        self.assertEqual(FreelancerScoreCache.objects.count(), 4)
+
+    @override_settings(AI_SCORE_CACHE_MAX_ENTRIES=3)
+    def test_prune_removes_expired_and_least_recently_used(self):
+        self.score(FakeGeminiClient(score=70))
+        now = timezone.now()
+        entries = list(FreelancerScoreCache.objects.order_by('freelancer__email'))
+        for i, entry in enumerate(entries):
+            FreelancerScoreCache.objects.filter(id=entry.id).update(last_used_at=now - timedelta(minutes=i))
+        FreelancerScoreCache.objects.filter(id=entries[0].id).update(created_at=now - timedelta(days=30))
+
+        deleted = score_cache.prune_score_cache()
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            set(FreelancerScoreCache.objects.values_list('id', flat=True)),
+            {entries[1].id, entries[2].id, entries[3].id},
+        )
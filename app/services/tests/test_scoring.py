@@ -0,0 +1,111 @@
+import json
+import re
+import threading
+import time
+from unittest.mock import patch
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from core.models import Freelancer
+from services.scoring import FreelancerScoringEngine, parse_batch_scores
+from services.skills import sync_freelancer_skills
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiClient:
+    """Local stand-in for genai.GenerativeModel that scores every candidate in a prompt."""
+
+    def __init__(self, score=80, delay=0):
+        self.score = score
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, request_options=None):
+        with self.lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        candidate_ids = re.findall(r"Candidate ID: (\S+)", prompt)
+        return FakeResponse(json.dumps({candidate_id: self.score for candidate_id in candidate_ids}))
+
+
+def create_freelancers(count, skills='[{"skill": "Python", "verified": true}]'):
+    freelancers = [
+        Freelancer.objects.create(
+            email=f"freelancer{i}@example.com",
+            full_name=f"Freelancer {i}",
+            skills=skills,
+            experience=i,
+            preferred_working_hours="full_time",
+        )
+        for i in range(count)
+    ]
+    for freelancer in freelancers:
+        sync_freelancer_skills(freelancer)
+    return freelancers
+
+
+class FreelancerScoringEngineTests(TestCase):
+
+    def test_candidates_are_batched(self):
+        freelancers = create_freelancers(45)
+        client = FakeGeminiClient(score=70)
+        engine = FreelancerScoringEngine(client=client, batch_size=20, max_workers=4, timeout=5)
+
+        scores = engine.score(freelancers, "Backend developer", "1 month", "1000")
+
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(len(scores), 45)
+        self.assertTrue(all(score == 70 for score in scores.values()))
+
+    def test_batches_run_concurrently(self):
+        freelancers = create_freelancers(8)
+        client = FakeGeminiClient(delay=0.3)
+        engine = FreelancerScoringEngine(client=client, batch_size=2, max_workers=4, timeout=5)
+
+        started = time.monotonic()
+        engine.score(freelancers, "Backend developer", "1 month", "1000")
+
+        self.assertEqual(client.calls, 4)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_timed_out_batch_scores_zero(self):
+        freelancers = create_freelancers(2)
+        client = FakeGeminiClient(delay=1)
+        engine = FreelancerScoringEngine(client=client, batch_size=2, max_workers=1, timeout=0.1)
+
+        scores = engine.score(freelancers, "Backend developer", "1 month", "1000")
+
+        self.assertEqual(set(scores.values()), {0})
+
+    def test_parse_batch_scores(self):
+        text = '```json\n{"a": 90, "b": {"score": 55.5}, "c": "bad"}\n```'
+        self.assertEqual(parse_batch_scores(text), {"a": 90.0, "b": 55.5, "c": 0})
+        self.assertEqual(parse_batch_scores("not json"), {})
+
+
+class FreelancerSearchScoringTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        create_freelancers(25)
+
+    def test_search_uses_batched_scoring(self):
+        fake_client = FakeGeminiClient()
+        engine = FreelancerScoringEngine(client=fake_client, batch_size=10)
+        with patch('services.views.FreelancerSearchView.get_scoring_engine', return_value=engine):
+            response = self.client.get(reverse('freelancer_search'), {
+                'tech_stack': json.dumps(['Python']),
+                'working_preference': 'full_time',
+                'project_description': 'Backend developer',
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['freelancers']), 25)
+        self.assertEqual(fake_client.calls, 3)
@@ -0,0 +1,145 @@
+import json
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from services.scoring import FreelancerScoringEngine
+from services.search import retrieve_candidates
+from .test_freelancer_skills import create_freelancer
+from .test_scoring import FakeGeminiClient, create_freelancers
+
+
+class RetrieveCandidatesTests(TestCase):
+
+    def test_filters_run_in_sql(self):
+        match = create_freelancer("match@example.com", [{"skill": "Python"}])
+        create_freelancer("part@example.com", [{"skill": "Python"}], preferred_working_hours="part_time")
+        create_freelancer("other@example.com", [{"skill": "Go"}])
+        busy = create_freelancer("busy@example.com", [{"skill": "Python"}])
+        busy.availability_status = "not avaliable"
+        busy.save()
+        inactive = create_freelancer("inactive@example.com", [{"skill": "Python"}])
+        inactive.is_active = False
+        inactive.save()
+
+        with self.assertNumQueries(1):
+            candidates = retrieve_candidates(["python"], working_preference="full_time")
+
+        self.assertEqual(candidates, [(match, 1)])
+
+    def test_no_preference_and_verified_only(self):
+        verified = create_freelancer("verified@example.com", [{"skill": "Python"}], preferred_working_hours="part_time")
+        verified.verified = True
+        verified.save()
+        unverified = create_freelancer("unverified@example.com", [{"skill": "Python"}])
+
+        candidates = retrieve_candidates(["Python"], working_preference="I'll decide later")
+        self.assertEqual({freelancer for freelancer, _ in candidates}, {verified, unverified})
+        self.assertEqual(retrieve_candidates(["Python"], verified_only=True), [(verified, 1)])
+
+    def test_ranks_by_matches_rating_and_experience(self):
+        experienced = create_freelancer("experienced@example.com", [{"skill": "Python"}])
+        experienced.experience = 10
+        experienced.save()
+        rated = create_freelancer("rated@example.com", [{"skill": "Python"}])
+        rated.average_rating = Decimal("4.50")
+        rated.save()
+        two_skills = create_freelancer("two@example.com", [{"skill": "Python"}, {"skill": "Django"}])
+        create_freelancer("plain@example.com", [{"skill": "Python"}])
+
+        candidates = retrieve_candidates(["python", "django"], limit=3)
+
+        self.assertEqual(
+            [(freelancer.email, matches) for freelancer, matches in candidates],
+            [(two_skills.email, 2), (rated.email, 1), (experienced.email, 1)],
+        )
+
+    def test_empty_tech_stack_returns_nothing(self):
+        create_freelancer("match@example.com", [{"skill": "Python"}])
+        self.assertEqual(retrieve_candidates([]), [])
+
+
+class FreelancerSearchTopKTests(TestCase):
+
+    @override_settings(AI_RERANK_TOP_K=5)
+    def test_only_top_k_candidates_are_reranked(self):
+        create_freelancers(12)
+        fake_client = FakeGeminiClient()
+        engine = FreelancerScoringEngine(client=fake_client, batch_size=20)
+
+        with patch('services.views.FreelancerSearchView.get_scoring_engine', return_value=engine):
+            response = APIClient().get(reverse('freelancer_search'), {
+                'tech_stack': json.dumps(['Python']),
+                'working_preference': 'full_time',
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['freelancers']), 5)
+        self.assertEqual(fake_client.calls, 1)
+        # Ties on the AI score keep the SQL ranking: most experienced first
+        self.assertEqual(response.data['freelancers'][0]['experience'], 11)
+
+
+class FreelancerSearchPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        create_freelancers(7)
+        self.fake_client = FakeGeminiClient()
+        self.engine = FreelancerScoringEngine(client=self.fake_client, batch_size=20)
+        self.params = {
+            'tech_stack': json.dumps(['Python']),
+            'working_preference': 'full_time',
+        }
+
+    def search(self, **params):
+        with patch('services.views.FreelancerSearchView.get_scoring_engine', return_value=self.engine):
+            return self.client.get(reverse('freelancer_search'), {**self.params, **params})
+
+    def test_pages_follow_the_cursor(self):
+        response = self.search(page_size=3)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([f['experience'] for f in response.data['freelancers']], [6, 5, 4])
+        # Only the first page was scored
+        self.assertEqual(self.fake_client.calls, 1)
+
+        seen = [f['id'] for f in response.data['freelancers']]
+        next_url = response.data['next']
+        while next_url:
+            with patch('services.views.FreelancerSearchView.get_scoring_engine', return_value=self.engine):
+                response = self.client.get(next_url)
+            seen += [f['id'] for f in response.data['freelancers']]
+            next_url = response.data['next']
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_invalid_cursor(self):
+        response = self.search(cursor='not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ndjson_stream(self):
+        response = self.search(stream='ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        events = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([event['event'] for event in events], ['candidate'] * 7 + ['done'])
+        self.assertEqual(events[0]['score'], 90)
+        self.assertEqual(events[-1]['count'], 7)
+
+    def test_sse_stream_includes_failed_batches(self):
+        self.engine = FreelancerScoringEngine(client=FakeGeminiClient(delay=1), batch_size=20, timeout=0.1)
+        response = self.search(stream='sse')
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('event: candidate\n'), 7)
+        self.assertIn('event: done\ndata: {"count": 7}\n\n', body)
+        self.assertIn('"score": 10', body)
+
+    def test_unknown_stream_format(self):
+        response = self.search(stream='xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,78 @@
+import json
+import uuid
+from unittest.mock import patch
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from services import search_jobs
+from services.scoring import FreelancerScoringEngine
+from services.tasks import run_freelancer_search
+from .test_scoring import FakeGeminiClient, create_freelancers
+
+
+class FreelancerSearchJobTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        create_freelancers(5)
+        self.fake_client = FakeGeminiClient()
+        self.engine = FreelancerScoringEngine(client=self.fake_client, batch_size=2)
+
+    def start_job(self):
+        # Run the Celery task inline so the job is finished when the response comes back
+        with patch('services.tasks.FreelancerScoringEngine', return_value=self.engine), \
+                patch('services.views.run_freelancer_search.delay', side_effect=run_freelancer_search):
+            return self.client.get(reverse('freelancer_search'), {
+                'tech_stack': json.dumps(['Python']),
+                'working_preference': 'full_time',
+                'async': 'true',
+            })
+
+    def test_async_search_returns_job_and_results(self):
+        response = self.start_job()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.data['job_id']
+        self.assertTrue(response.data['status_url'].endswith(reverse('freelancer_search_job', args=[job_id])))
+
+        response = self.client.get(reverse('freelancer_search_job', args=[job_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], search_jobs.COMPLETED)
+        self.assertEqual(response.data['total'], 5)
+        self.assertEqual(response.data['scored'], 5)
+        self.assertEqual([result['score'] for result in response.data['results']], [90] * 5)
+        self.assertEqual(self.fake_client.calls, 3)
+
+    def test_partial_results_are_saved_per_batch(self):
+        job_id = search_jobs.create_job()
+        saved = []
+        original_save_job = search_jobs.save_job
+
+        def record_save(job_id, job):
+            saved.append((job['status'], job['scored']))
+            original_save_job(job_id, job)
+
+        with patch('services.tasks.FreelancerScoringEngine', return_value=self.engine), \
+                patch('services.search_jobs.save_job', side_effect=record_save):
+            run_freelancer_search(job_id, {'tech_stack': ['Python'], 'working_preference': 'full_time'})
+
+        # Two saves before scoring starts, then one per finished batch
+        progress = [scored for job_status, scored in saved if job_status == search_jobs.RUNNING]
+        self.assertEqual(len(progress), 5)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(progress[-1], 5)
+        self.assertEqual(saved[-1], (search_jobs.COMPLETED, 5))
+
+    def test_failed_job(self):
+        job_id = search_jobs.create_job()
+        with patch('services.tasks.retrieve_candidates', side_effect=RuntimeError("database unavailable")):
+            run_freelancer_search(job_id, {'tech_stack': ['Python']})
+
+        job = search_jobs.get_job(job_id)
+        self.assertEqual(job['status'], search_jobs.FAILED)
+        self.assertEqual(job['error'], "database unavailable")
+
+    def test_unknown_job(self):
+        response = self.client.get(reverse('freelancer_search_job', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
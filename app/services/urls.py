@@ -1,6 +1,6 @@
 # urls.py
 from django.urls import path , include
-from .views import FreelancerSearchView , ServiceViewSet , TechnologyViewSet , SkillSearchViewSet ,ServicesByFieldView
+from .views import FreelancerSearchView , FreelancerSearchJobView , ServiceViewSet , TechnologyViewSet , SkillSearchViewSet ,ServicesByFieldView
 from rest_framework.routers import DefaultRouter
 router = DefaultRouter()
 router.register(r'services', ServiceViewSet)
@@ -10,5 +10,6 @@ router.register(r'skill-search', SkillSearchViewSet, basename='skill-search')
 urlpatterns = [
     path('', include(router.urls)),
     path('freelancers/search/', FreelancerSearchView.as_view(), name='freelancer_search'),
+    path('freelancers/search/jobs/<uuid:job_id>/', FreelancerSearchJobView.as_view(), name='freelancer_search_job'),
     path('field-services/', ServicesByFieldView.as_view(), name='services-by-field'),
 ]
@@ -1,4 +1,6 @@
 # views.py
+import base64
+import binascii
 import json
 from core.models import Freelancer
 from rest_framework.views import APIView
@@ -19,6 +21,16 @@ from datetime import timedelta
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 from rest_framework import generics
+from .scoring import FreelancerScoringEngine
+from .search import candidate_payload, get_rerank_top_k, rank_candidates, retrieve_candidates
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.utils.urls import replace_query_param
+from django.urls import reverse
+from . import search_jobs
+from .tasks import run_freelancer_search
+from .embeddings import SemanticScoringEngine
 
 # Configure the API key for generative AI
 genai.configure(api_key=os.environ["GEMINI_API_KEY"])
@@ -30,7 +42,6 @@ class FreelancerSearchView(APIView):
         project_duration = request.query_params.get('project_duration')
         project_budget = request.query_params.get('project_budget')
         project_description = request.query_params.get('project_description')
-        freelancers = Freelancer.objects.all()
         tech_stack_json = request.query_params.get('tech_stack')
         
         # Attempt to parse the JSON string
@@ -38,133 +49,156 @@ class FreelancerSearchView(APIView):
 
         print("tech stack", tech_stack)
         print("project description", project_description)
-        ranked_freelancers = []
-        
-        for freelancer in freelancers:
-            # Initialize an empty list for verified skills
-            verified_skills = []
-
-            # Check if freelancer.skills is not empty and try to parse the JSON string
-            if freelancer.skills:
-                try:
-                    # Parse the JSON string into a Python object
-                    skills_data = json.loads(freelancer.skills)
-
-                    # Check if it's a list
-                    if isinstance(skills_data, list):
-                        # Extract verified skills from the list of dictionaries
-                        verified_skills = [
-                            skill['skill'].lower() for skill in skills_data
-                            if isinstance(skill, dict) and skill['skill'].lower() not in verified_skills
-                        ]
-
-                    # Check if it's a dictionary (though based on your description it should be a list)
-                    elif isinstance(skills_data, dict):
-                        if skills_data.get("verified", False):
-                            skil_name = skills_data.get('skill').lower()
-                            if skil_name not in verified_skills :verified_skills.append(skills_data.get('skill').lower())
-
-                except json.JSONDecodeError:
-                    print(f"Error parsing skills JSON for freelancer {freelancer.full_name}")
-            
-            print("verified skills", verified_skills)
-
-            # Extract tech stack skills and convert them to lowercase
-            tech_stack_skills = [skill.lower() for skill in tech_stack]
-
-            # Perform case-insensitive matching
-            skill_matches = len(set(verified_skills) & set(tech_stack_skills)) if tech_stack else 0
-            print("skill match length", skill_matches)
-            print("working preference is ",working_preference)
-            if skill_matches > 0:
-                if working_preference != "I'll decide later" and freelancer.preferred_working_hours != working_preference:
-                    print("skipped....")
-                    continue
-
-                score = self.evaluate_freelancer(
-                    freelancer=freelancer,
-                    position_applied_for=project_description,
-                    project_duration=project_duration,
-                    project_budget=project_budget
-                )
-                total_score = score + (skill_matches * 10)  # Adjust the weight of skill matches
-                ranked_freelancers.append({
-                    'freelancer': freelancer,
-                    'score': total_score,
-                })
-
-        ranked_freelancers.sort(key=lambda x: x['score'], reverse=True)
-
-        top_freelancers = [rf['freelancer'] for rf in ranked_freelancers]
-        serializer = FreelancerSerializer(top_freelancers, many=True)
+
+        verified_only = request.query_params.get('verified_only') in ('true', '1')
+        scoring_params = {
+            'position_applied_for': project_description,
+            'project_duration': project_duration,
+            'project_budget': project_budget,
+        }
+
+        if request.query_params.get('async') in ('true', '1'):
+            # Heavy queries are ranked by a Celery worker; the client polls the job for results
+            job_id = search_jobs.create_job()
+            run_freelancer_search.delay(job_id, {
+                'tech_stack': tech_stack,
+                'working_preference': working_preference,
+                'verified_only': verified_only,
+                'semantic': self.use_semantic_scoring(),
+                'project_description': project_description,
+                'project_duration': project_duration,
+                'project_budget': project_budget,
+            })
+            return Response({
+                'job_id': job_id,
+                'status': search_jobs.PENDING,
+                'status_url': request.build_absolute_uri(reverse('freelancer_search_job', args=[job_id])),
+            }, status=status.HTTP_202_ACCEPTED)
+
+        stream = request.query_params.get('stream')
+        if stream:
+            if stream not in STREAM_CONTENT_TYPES:
+                return Response({"error": "stream must be 'ndjson' or 'sse'."}, status=status.HTTP_400_BAD_REQUEST)
+            # Cheap SQL retrieval and ranking; only the top K candidates reach the AI reranker
+            candidates = retrieve_candidates(
+                tech_stack, working_preference=working_preference, verified_only=verified_only, limit=get_rerank_top_k()
+            )
+            response = StreamingHttpResponse(
+                stream_candidates(self.get_scoring_engine(), candidates, scoring_params, stream),
+                content_type=STREAM_CONTENT_TYPES[stream],
+            )
+            response['Cache-Control'] = 'no-cache'
+            return response
+
+        if 'cursor' in request.query_params or 'page_size' in request.query_params:
+            return self.paginated_response(request, tech_stack, working_preference, verified_only, scoring_params)
+
+        candidates = retrieve_candidates(
+            tech_stack, working_preference=working_preference, verified_only=verified_only, limit=get_rerank_top_k()
+        )
+        # Score every candidate with a few batched AI calls instead of one call per freelancer
+        scores = self.get_scoring_engine().score([freelancer for freelancer, _ in candidates], **scoring_params)
+
+        serializer = FreelancerSerializer(rank_candidates(candidates, scores), many=True)
         return Response({
             'freelancers': serializer.data,
         })
-    def evaluate_freelancer(self, freelancer, position_applied_for, project_duration, project_budget):
-        # Extract skill names from dictionaries
-        skills = []
-        if freelancer.skills:
-            try:
-                # Parse skills JSON if stored as a string
-                skills_data = json.loads(freelancer.skills)
-                if isinstance(skills_data, list):
-                    skills = [skill['skill'] for skill in skills_data if 'skill' in skill]
-                elif isinstance(skills_data, dict):
-                    skills = [skills_data.get('skill')]
-            except json.JSONDecodeError:
-                print(f"Error parsing skills JSON for freelancer {freelancer.full_name}")
-
-        # Extract certification names from dictionaries
-        certifications = []
-        if freelancer.certifications:
-            try:
-                # Assuming certifications is a list of dicts
-                certifications = [cert.get('name') for cert in freelancer.certifications if 'name' in cert]
-            except Exception as e:
-                print(f"Error processing certifications for freelancer {freelancer.full_name}: {e}")
-
-        # Build the resume text
-        resume_text = f"""
-        Name: {freelancer.full_name}
-        Title: {freelancer.professional_title}
-        Skills: {', '.join(skills)}
-        Experience: {freelancer.experience} years
-        Certifications: {', '.join(certifications)}
-        Portfolio: {freelancer.portfolio}
-        Previous Work Experience: {freelancer.prev_work_experience}
+
+    def paginated_response(self, request, tech_stack, working_preference, verified_only, scoring_params):
+        """
+        Return one page of the SQL-ranked candidates, reranked by AI score.
+        Only the page is scored, so the first page is ready after a single scoring batch.
         """
-        prompt = f"""
-        You are a hiring expert for a top freelancing site. Given the following resume text and the position applied for, the project budget, and the project duration, please evaluate it based on these criteria and provide a score from 0 to 100:
+        try:
+            offset = decode_cursor(request.query_params.get('cursor'))
+            page_size = int(request.query_params.get('page_size') or getattr(settings, 'FREELANCER_SEARCH_PAGE_SIZE', 10))
+        except ValueError:
+            return Response({"error": "Invalid cursor or page_size."}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = max(1, min(page_size, get_rerank_top_k()))
+
+        # Fetch one extra row to know whether there is a next page
+        candidates = retrieve_candidates(
+            tech_stack, working_preference=working_preference, verified_only=verified_only,
+            offset=offset, limit=page_size + 1,
+        )
+        has_next = len(candidates) > page_size
+        candidates = candidates[:page_size]
+
+        scores = self.get_scoring_engine().score([freelancer for freelancer, _ in candidates], **scoring_params)
+        serializer = FreelancerSerializer(rank_candidates(candidates, scores), many=True)
+
+        next_url = None
+        if has_next:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', encode_cursor(offset + page_size))
+        return Response({
+            'freelancers': serializer.data,
+            'next': next_url,
+        })
 
-        Position Applied For: {position_applied_for}
-        Project Duration: {project_duration}
-        Project Budget: {project_budget}
-        Criteria:
-        Based on the match between the freelancer resume and the project requirements
+    def get_scoring_engine(self):
+        if self.use_semantic_scoring():
+            return SemanticScoringEngine()
+        return FreelancerScoringEngine()
 
-        Resume Text:
-        {resume_text}
+    def use_semantic_scoring(self):
+        """?semantic=true ranks candidates by embedding similarity instead of AI prompts."""
+        return self.request.query_params.get('semantic') in ('true', '1')
 
-        Score (0-100):
-        """
-        prompt += "\nResponse format:\n{\"score\": float}"
 
-        try:
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(prompt)
-            evaluation_json = self.parse_json_from_response(response.text)
-            score = evaluation_json.get("score", 0)
-            return score
-        except Exception as e:
-            print(f"Error scoring resume with AI: {e}")
-            return 0
-
-    def parse_json_from_response(self, response_text):
-        try:
-            return json.loads(response_text)
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            return {"score": 0}
+class FreelancerSearchJobView(APIView):
+    """Progress and partial results of an asynchronous freelancer search."""
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = search_jobs.get_job(job_id)
+        if job is None:
+            return Response({"error": "Search job not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
+
+
+STREAM_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+
+def stream_candidates(engine, candidates, scoring_params, stream):
+    """Yield every candidate with its score as soon as its scoring batch finishes."""
+    by_id = {str(freelancer.id): (freelancer, skill_matches) for freelancer, skill_matches in candidates}
+    for chunk in engine.iter_scores([freelancer for freelancer, _ in candidates], **scoring_params):
+        for freelancer_id, score in chunk.items():
+            if freelancer_id in by_id:
+                freelancer, skill_matches = by_id.pop(freelancer_id)
+                yield format_stream_event(stream, 'candidate', candidate_payload(freelancer, skill_matches, score))
+
+    # Candidates of failed or timed out batches keep only their skill score
+    for freelancer, skill_matches in by_id.values():
+        yield format_stream_event(stream, 'candidate', candidate_payload(freelancer, skill_matches, 0))
+    yield format_stream_event(stream, 'done', {'count': len(candidates)})
+
+
+def format_stream_event(stream, event, payload):
+    data = json.dumps(payload, cls=DjangoJSONEncoder)
+    if stream == 'sse':
+        return f"event: {event}\ndata: {data}\n\n"
+    return json.dumps({'event': event, **payload}, cls=DjangoJSONEncoder) + "\n"
+
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps({'offset': offset}).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the candidate offset stored in a cursor; raises ValueError for a tampered cursor."""
+    if not cursor:
+        return 0
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())['offset']
+    except (TypeError, KeyError, UnicodeDecodeError, json.JSONDecodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
 
 class TechnologyViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Technology.objects.all()
@@ -0,0 +1,33 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .realtime import unread_message_count, user_group
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes chat events to an authenticated user: new messages, read receipts and unread counters.
+    Messages are still sent and persisted through the REST API (MessageViewSet); this socket only delivers.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.group_name = user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        # Replaces the first unread-count poll of the page
+        count = await database_sync_to_async(unread_message_count)(user)
+        await self.send_json({'type': 'unread_count', 'count': count})
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def chat_event(self, event):
+        await self.send_json(event['event'])
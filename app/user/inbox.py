@@ -0,0 +1,121 @@
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+from core import models
+from core.unread_counters import MESSAGES, adjust_unread_counts
+
+PREVIEW_LENGTH = 255
+
+
+def message_preview(message):
+    if message.content:
+        return message.content[:PREVIEW_LENGTH]
+    return "Attachment" if message.file else ''
+
+
+def unread_count(chat, user_id):
+    """The participant's unread messages in the chat."""
+    if user_id == chat.client_id:
+        return chat.client_unread_count
+    if user_id == chat.freelancer_id:
+        return chat.freelancer_unread_count
+    return 0
+
+
+def record_message(message):
+    """
+    Update the chat's inbox summary for a new message in the same transaction: the last message,
+    unless a newer one was already recorded, and the unread counter of the other participant.
+    """
+    chat = message.chat
+    is_newer = Q(last_message_at__isnull=True) | Q(last_message_at__lte=message.timestamp)
+    updates = {
+        'last_message_at': Case(When(is_newer, then=Value(message.timestamp)), default=F('last_message_at')),
+        'last_message_preview': Case(When(is_newer, then=Value(message_preview(message))), default=F('last_message_preview')),
+    }
+    recipients = {}
+    for user_id, field in ((chat.client_id, 'client_unread_count'), (chat.freelancer_id, 'freelancer_unread_count')):
+        if user_id and user_id != message.sender_id:
+            updates[field] = F(field) + 1
+            recipients[user_id] = 1
+    models.Chat.objects.filter(pk=chat.pk).update(**updates)
+    adjust_unread_counts(MESSAGES, recipients)
+
+
+def unread_contribution(message):
+    """{(chat id, counter field, user id): 1} for a message its recipient hasn't read, else empty."""
+    if message.read:
+        return {}
+    chat = message.chat
+    return {
+        (chat.pk, field, user_id): 1
+        for user_id, field in ((chat.client_id, 'client_unread_count'), (chat.freelancer_id, 'freelancer_unread_count'))
+        if user_id and user_id != message.sender_id
+    }
+
+
+def apply_unread_deltas(deltas):
+    """Add {(chat id, counter field, user id): delta} to the chats' counters and the users' Redis counters."""
+    user_deltas = {}
+    for (chat_id, field, user_id), delta in deltas.items():
+        if delta:
+            models.Chat.objects.filter(pk=chat_id).update(**{field: Greatest(F(field) + delta, 0)})
+            user_deltas[user_id] = user_deltas.get(user_id, 0) + delta
+    adjust_unread_counts(MESSAGES, user_deltas)
+
+
+def refresh_last_message(chat_id):
+    """Recompute the chat's last message summary from its newest remaining message."""
+    latest = models.Message.objects.filter(chat_id=chat_id).order_by('-timestamp').first()
+    models.Chat.objects.filter(pk=chat_id).update(
+        last_message_at=latest.timestamp if latest else None,
+        last_message_preview=message_preview(latest) if latest else '',
+    )
+
+
+def record_message_update(previous, message):
+    """
+    Update the inbox summary and unread counters for an edited message, in the same transaction;
+    `previous` is the message as it was before the edit.
+    """
+    deltas = unread_contribution(message)
+    for key, count in unread_contribution(previous).items():
+        deltas[key] = deltas.get(key, 0) - count
+    apply_unread_deltas(deltas)
+    for chat_id in {previous.chat_id, message.chat_id}:
+        refresh_last_message(chat_id)
+
+
+def record_message_deletion(message):
+    """Update the inbox summary and unread counters for a deleted message, in the same transaction."""
+    apply_unread_deltas({key: -count for key, count in unread_contribution(message).items()})
+    refresh_last_message(message.chat_id)
+
+
+def mark_messages_read(message_ids, reader_id):
+    """
+    Mark the messages read and lower their recipients' unread counters by the messages that actually changed.
+    Only messages of the reader's chats that someone else sent are marked.
+    Returns (message id, chat id, client id, freelancer id) of those messages.
+    """
+    with transaction.atomic():
+        # Locking the rows keeps two concurrent requests from decrementing for the same message
+        read_messages = list(
+            models.Message.objects.select_for_update(of=('self',))
+            .filter(Q(chat__client_id=reader_id) | Q(chat__freelancer_id=reader_id), id__in=message_ids, read=False)
+            .exclude(sender_id=reader_id)
+            .values_list('id', 'chat_id', 'chat__client_id', 'chat__freelancer_id', 'sender_id')
+        )
+        models.Message.objects.filter(id__in=[row[0] for row in read_messages]).update(read=True)
+
+        decrements, user_decrements = {}, {}
+        for _, chat_id, client_id, freelancer_id, sender_id in read_messages:
+            # Counters track messages from the other participant
+            for user_id, field in ((client_id, 'client_unread_count'), (freelancer_id, 'freelancer_unread_count')):
+                if user_id and user_id != sender_id:
+                    decrements[(chat_id, field)] = decrements.get((chat_id, field), 0) + 1
+                    user_decrements[user_id] = user_decrements.get(user_id, 0) - 1
+        for (chat_id, field), count in decrements.items():
+            models.Chat.objects.filter(pk=chat_id).update(**{field: Greatest(F(field) - count, 0)})
+        adjust_unread_counts(MESSAGES, user_decrements)
+    return [row[:4] for row in read_messages]
@@ -0,0 +1,71 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+from django.conf import settings
+from django.db.models import Q
+
+
+def encode_message_cursor(message):
+    """Opaque cursor pointing at a message's (timestamp, id) position."""
+    position = {'timestamp': message.timestamp.isoformat(), 'id': str(message.id)}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_message_cursor(cursor):
+    """Return the (timestamp, id) stored in a cursor; raises ValueError for a tampered cursor."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return datetime.fromisoformat(position['timestamp']), UUID(position['id'])
+    except (TypeError, KeyError, AttributeError, UnicodeDecodeError, json.JSONDecodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def get_page_size(value):
+    default = getattr(settings, 'CHAT_MESSAGES_PAGE_SIZE', 50)
+    if value in (None, ''):
+        return default
+    page_size = int(value)
+    if page_size < 1:
+        raise ValueError("Invalid page size")
+    return min(page_size, getattr(settings, 'CHAT_MESSAGES_MAX_PAGE_SIZE', 200))
+
+
+def message_page(queryset, before=None, after=None, page_size=None):
+    """
+    One page of messages in chronological order, seeking on the (chat, timestamp, id) index.
+    Without a cursor the newest page is returned; `before` loads older history and `after` returns only
+    messages newer than a previous response, for incremental sync.
+    Returns {'messages', 'previous', 'after', 'has_more'}: `previous` is the cursor for older messages
+    (None at the start of the chat), `after` the cursor to sync from next time.
+    """
+    page_size = page_size or get_page_size(None)
+    if after:
+        timestamp, message_id = decode_message_cursor(after)
+        rows = list(
+            queryset.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=message_id))
+            .order_by('timestamp', 'id')[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return {
+            'messages': rows,
+            'previous': None,
+            'after': encode_message_cursor(rows[-1]) if rows else after,
+            'has_more': has_more,
+        }
+
+    if before:
+        timestamp, message_id = decode_message_cursor(before)
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id))
+    rows = list(queryset.order_by('-timestamp', '-id')[:page_size + 1])
+    has_older = len(rows) > page_size
+    rows = rows[:page_size][::-1]
+    return {
+        'messages': rows,
+        'previous': encode_message_cursor(rows[0]) if has_older else None,
+        # An older page is not where new messages arrive, so it has no sync cursor
+        'after': encode_message_cursor(rows[-1]) if rows and not before else None,
+        'has_more': False,
+    }
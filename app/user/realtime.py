@@ -0,0 +1,70 @@
+import json
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from core import models
+from core.unread_counters import MESSAGES, get_unread_count
+
+
+def user_group(user_id):
+    """Channel layer group of every WebSocket connection of one user."""
+    return f"user.{user_id}"
+
+
+def chat_participant_ids(chat):
+    return [user_id for user_id in (chat.client_id, chat.freelancer_id) if user_id]
+
+
+def unread_message_count(user):
+    """Unread messages sent to the user in any of their chats."""
+    return get_unread_count(MESSAGES, user.id)
+
+
+def publish(user_ids, event):
+    """
+    Push an event to the connected users once the transaction commits.
+    Real-time delivery is best effort: clients resync over the REST API, so errors are only logged.
+    """
+    # Channel layers only carry plain JSON/msgpack types, serializer output may hold UUIDs and datetimes
+    event = json.loads(json.dumps(event, cls=DjangoJSONEncoder))
+
+    def send():
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        for user_id in set(user_ids):
+            try:
+                async_to_sync(channel_layer.group_send)(user_group(user_id), {'type': 'chat.event', 'event': event})
+            except Exception as e:
+                print(f"Error publishing {event['type']} to user {user_id}: {e}")
+    transaction.on_commit(send)
+
+
+def publish_message(message, data):
+    """Send a new message to both participants and the new unread count to the recipient."""
+    chat = message.chat
+    participant_ids = chat_participant_ids(chat)
+    publish(participant_ids, {'type': 'message', 'chat': str(chat.id), 'message': data})
+    for user_id in participant_ids:
+        if user_id != message.sender_id:
+            publish_unread_count(models.User(id=user_id))
+
+
+def publish_read_receipts(reader, messages):
+    """Tell the participants which messages were read and update the reader's unread count."""
+    by_chat = {}
+    participants = {}
+    for message_id, chat_id, client_id, freelancer_id in messages:
+        by_chat.setdefault(chat_id, []).append(str(message_id))
+        participants[chat_id] = [user_id for user_id in (client_id, freelancer_id) if user_id]
+    for chat_id, message_ids in by_chat.items():
+        publish(participants[chat_id], {
+            'type': 'read', 'chat': str(chat_id), 'message_ids': message_ids, 'reader': str(reader.id),
+        })
+    publish_unread_count(reader)
+
+
+def publish_unread_count(user):
+    # Read the counter after commit, a rebuild inside the transaction would count its changes twice
+    transaction.on_commit(lambda: publish([user.id], {'type': 'unread_count', 'count': unread_message_count(user)}))
@@ -1,6 +1,11 @@
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework import serializers
-from core import models
+from core import models, uploads
+from core.roles import add_role_claim
+from django.db import transaction
+from services.score_cache import invalidate_freelancer_scores
+from services.skills import sync_freelancer_skills
+from .inbox import unread_count
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
@@ -35,7 +40,7 @@ class FreelancerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
     def update(self, instance, validated_data):
-        """Update and return a freelancer"""
+        """Update and return a freelancer, keeping its skill rows, match scores and embedding in step"""
         password = validated_data.pop('password', None)
         freelancer = super().update(instance, validated_data)
 
@@ -43,6 +48,13 @@ class FreelancerSerializer(serializers.ModelSerializer):
             freelancer.set_password(password)
             freelancer.save()
 
+        if 'skills' in validated_data:
+            sync_freelancer_skills(freelancer)
+        # Cached AI match scores and the embedding were computed from the old profile
+        invalidate_freelancer_scores(freelancer)
+        # services.tasks imports this module through services.search
+        from services.tasks import refresh_freelancer_embedding
+        transaction.on_commit(lambda: refresh_freelancer_embedding.delay(str(freelancer.id)))
         return freelancer
 
 class InterviewerSerializer(serializers.ModelSerializer):
@@ -144,17 +156,35 @@ class ClientCreateSerializer(serializers.ModelSerializer):
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom serializer for obtaining JWT tokens"""
     
+    @classmethod
+    def get_token(cls, user):
+        return add_role_claim(super().get_token(user), user)
+
     def validate(self, attrs):
         data = super().validate(attrs)
         data.update({'email': self.user.email})
         return data
 
 class MessageSerializer(serializers.ModelSerializer):
+    upload = serializers.UUIDField(write_only=True, required=False, help_text="Completed upload to attach instead of a multipart file.")
+
     class Meta:
         model = models.Message
-        fields = ['id', 'chat', 'sender', 'content','file', 'timestamp','read']
+        fields = ['id', 'chat', 'sender', 'content','file', 'upload', 'timestamp','read']
         read_only_fields = ['id', 'timestamp']
 
+    def validate(self, attrs):
+        # Attachments are stored once per content, the message points at the blob
+        try:
+            blob = uploads.attachment_blob(attrs.pop('upload', None), attrs.get('file'), self.context['request'].user)
+        except uploads.UploadError as e:
+            raise serializers.ValidationError({'upload': str(e)})
+        if blob:
+            attrs['file'] = blob.file.name
+            attrs['blob'] = blob
+        return attrs
+
+
 
 class MarkMessagesAsReadSerializer(serializers.Serializer):
     message_ids = serializers.ListField(
@@ -179,6 +209,49 @@ class ChatSerializer(serializers.ModelSerializer):
         fields = ['id', 'client', 'freelancer', 'created_at', 'messages']
         read_only_fields = ['id', 'created_at', 'messages']
 
+class ChatInfoSerializer(serializers.ModelSerializer):
+    """Chat without its messages, which are paginated separately."""
+    class Meta:
+        model = models.Chat
+        fields = ['id', 'client', 'freelancer', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+class InboxChatSerializer(serializers.ModelSerializer):
+    """Inbox row of a chat, seen from the requesting participant."""
+    peer = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Chat
+        fields = ['id', 'peer', 'last_message_at', 'last_message_preview', 'unread_count', 'created_at']
+
+    def get_peer(self, chat):
+        if self.context['request'].user.id == chat.client_id:
+            freelancer = chat.freelancer
+            return freelancer and {'id': freelancer.id, 'name': freelancer.full_name, 'role': 'freelancer'}
+        client = chat.client
+        return client and {'id': client.id, 'name': client.company_name, 'role': 'client'}
+
+    def get_unread_count(self, chat):
+        return unread_count(chat, self.context['request'].user.id)
+
+class UploadSerializer(serializers.ModelSerializer):
+    blob = serializers.SlugRelatedField(slug_field='sha256', read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.Upload
+        fields = ['id', 'filename', 'size', 'sha256', 'offset', 'status', 'blob', 'chunk_size', 'created_at']
+        read_only_fields = ['id', 'offset', 'status', 'blob', 'created_at']
+
+    def validate_sha256(self, value):
+        if value and (len(value) != 64 or any(c not in '0123456789abcdef' for c in value.lower())):
+            raise serializers.ValidationError("Expected a hex sha256 digest.")
+        return value
+
+    def get_chunk_size(self, upload):
+        return uploads.max_chunk_size()
+
 class MessageCountSerializer(serializers.Serializer):
     count = serializers.IntegerField()
 
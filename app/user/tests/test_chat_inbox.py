@@ -0,0 +1,118 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Chat, Client, Freelancer, Message
+
+
+class ChatInboxTests(TestCase):
+
+    def setUp(self):
+        self.client_user = Client.objects.create(email='client@gmail.com', password='test123', company_name='Client Company')
+        self.freelancer_user = Freelancer.objects.create(email='freelancer@gmail.com', password='test123', full_name='Freelancer')
+        self.other_freelancer = Freelancer.objects.create(email='other@gmail.com', password='test123', full_name='Other')
+        self.chat = Chat.objects.create(client=self.client_user, freelancer=self.freelancer_user)
+        self.quiet_chat = Chat.objects.create(client=self.client_user, freelancer=self.other_freelancer)
+
+    def api_for(self, user):
+        api = APIClient()
+        api.force_authenticate(user=user)
+        return api
+
+    def send(self, sender, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_for(sender).post(
+                reverse('user:chat-messages-list', kwargs={'chat_pk': self.chat.id}), {'content': content}
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def test_sending_updates_summary_and_recipient_counter(self):
+        self.send(self.client_user, "Hello")
+        self.send(self.client_user, "Are you available?")
+        self.send(self.freelancer_user, "Yes")
+
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_preview, "Yes")
+        self.assertEqual(self.chat.last_message_at, Message.objects.latest('timestamp').timestamp)
+        self.assertEqual(self.chat.freelancer_unread_count, 2)
+        self.assertEqual(self.chat.client_unread_count, 1)
+
+    def test_marking_read_decrements_once(self):
+        first = self.send(self.client_user, "Hello")
+        second = self.send(self.client_user, "Are you available?")
+        api = self.api_for(self.freelancer_user)
+
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = api.patch(reverse('user:mark-messages-as-read'), {'message_ids': [first]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.freelancer_unread_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            api.patch(reverse('user:mark-messages-as-read'), {'message_ids': [first, second]}, format='json')
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.freelancer_unread_count, 0)
+        self.assertEqual(api.get(reverse('user:unread_message_count')).data['count'], 0)
+
+    def test_only_received_messages_of_own_chats_are_marked(self):
+        sent = self.send(self.client_user, "Hello")
+        outsider = self.api_for(self.other_freelancer)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outsider.patch(reverse('user:mark-messages-as-read'), {'message_ids': [sent]}, format='json')
+            self.api_for(self.client_user).patch(reverse('user:mark-messages-as-read'), {'message_ids': [sent]}, format='json')
+
+        self.assertFalse(Message.objects.get(pk=sent).read)
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.freelancer_unread_count, 1)
+
+    def test_editing_and_deleting_keep_the_summary(self):
+        self.send(self.client_user, "Hello")
+        latest = self.send(self.client_user, "Are you available?")
+        api = self.api_for(self.client_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api.patch(reverse('user:message-detail', args=[latest]), {'content': "Are you free?"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_preview, "Are you free?")
+        freelancer_api = self.api_for(self.freelancer_user)
+        self.assertEqual(freelancer_api.get(reverse('user:unread_message_count')).data['count'], 2)  # seeds the counter
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api.delete(reverse('user:message-detail', args=[latest]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_preview, "Hello")
+        self.assertEqual(self.chat.freelancer_unread_count, 1)
+        self.assertEqual(freelancer_api.get(reverse('user:unread_message_count')).data['count'], 1)
+
+    def test_only_the_sender_changes_a_message(self):
+        sent = self.send(self.client_user, "Hello")
+
+        response = self.api_for(self.freelancer_user).delete(reverse('user:message-detail', args=[sent]))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Message.objects.filter(pk=sent).exists())
+
+    def test_inbox_in_one_query(self):
+        self.send(self.freelancer_user, "Proposal attached")
+        api = self.api_for(self.client_user)
+
+        with self.assertNumQueries(1):
+            response = api.get(reverse('user:chat-inbox'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data], [str(self.chat.id), str(self.quiet_chat.id)])
+        latest = response.data[0]
+        self.assertEqual(latest['peer'], {'id': self.freelancer_user.id, 'name': 'Freelancer', 'role': 'freelancer'})
+        self.assertEqual(latest['last_message_preview'], "Proposal attached")
+        self.assertEqual(latest['unread_count'], 1)
+        self.assertEqual(response.data[1]['unread_count'], 0)
+
+        freelancer_inbox = self.api_for(self.freelancer_user).get(reverse('user:chat-inbox')).data
+        self.assertEqual(len(freelancer_inbox), 1)
+        self.assertEqual(freelancer_inbox[0]['peer']['role'], 'client')
+        self.assertEqual(freelancer_inbox[0]['unread_count'], 0)
@@ -0,0 +1,97 @@
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.models import Chat, Client, Freelancer, Message
+from user.inbox import record_message
+from user.middleware import JWTAuthMiddleware
+from user.routing import websocket_urlpatterns
+
+application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ChatWebSocketTests(TransactionTestCase):
+
+    def setUp(self):
+        self.client_user = Client.objects.create(email='client@gmail.com', password='test123', company_name='Client Company')
+        self.freelancer_user = Freelancer.objects.create(email='freelancer@gmail.com', password='test123', full_name='Freelancer')
+        self.chat = Chat.objects.create(client=self.client_user, freelancer=self.freelancer_user)
+
+    async def connect(self, user):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(user).access_token))()
+        communicator = WebsocketCommunicator(application, f"/ws/chat/?token={token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    def post_message(self, user, content):
+        api = APIClient()
+        api.force_authenticate(user=user)
+        return api.post(reverse('user:chat-messages-list', kwargs={'chat_pk': self.chat.id}), {'content': content})
+
+    async def test_rejects_missing_or_invalid_token(self):
+        for path in ("/ws/chat/", "/ws/chat/?token=invalid"):
+            communicator = WebsocketCommunicator(application, path)
+            connected, code = await communicator.connect()
+            self.assertFalse(connected)
+            self.assertEqual(code, 4401)
+
+    async def test_new_message_is_pushed_with_unread_count(self):
+        freelancer_socket = await self.connect(self.freelancer_user)
+        self.assertEqual(await freelancer_socket.receive_json_from(), {'type': 'unread_count', 'count': 0})
+        client_socket = await self.connect(self.client_user)
+        await client_socket.receive_json_from()
+
+        response = await sync_to_async(self.post_message)(self.client_user, "Hello Freelancer")
+        self.assertEqual(response.status_code, 201)
+
+        event = await freelancer_socket.receive_json_from()
+        self.assertEqual(event['type'], 'message')
+        self.assertEqual(event['chat'], str(self.chat.id))
+        self.assertEqual(event['message']['content'], "Hello Freelancer")
+        self.assertEqual(await freelancer_socket.receive_json_from(), {'type': 'unread_count', 'count': 1})
+
+        # The sender gets its own message for other open tabs, but no counter
+        self.assertEqual((await client_socket.receive_json_from())['type'], 'message')
+        self.assertTrue(await client_socket.receive_nothing())
+
+        await freelancer_socket.disconnect()
+        await client_socket.disconnect()
+
+    async def test_read_receipts(self):
+        def create_message():
+            message = Message.objects.create(chat=self.chat, sender=self.client_user, content="Hi")
+            record_message(message)
+            return message
+        message = await sync_to_async(create_message)()
+        freelancer_socket = await self.connect(self.freelancer_user)
+        self.assertEqual(await freelancer_socket.receive_json_from(), {'type': 'unread_count', 'count': 1})
+        client_socket = await self.connect(self.client_user)
+        await client_socket.receive_json_from()
+
+        def mark_read():
+            api = APIClient()
+            api.force_authenticate(user=self.freelancer_user)
+            return api.patch(reverse('user:mark-messages-as-read'), {'message_ids': [str(message.id)]}, format='json')
+        response = await sync_to_async(mark_read)()
+        self.assertEqual(response.status_code, 200)
+
+        receipt = await client_socket.receive_json_from()
+        self.assertEqual(receipt['type'], 'read')
+        self.assertEqual(receipt['message_ids'], [str(message.id)])
+        self.assertEqual((await freelancer_socket.receive_json_from())['type'], 'read')
+        self.assertEqual(await freelancer_socket.receive_json_from(), {'type': 'unread_count', 'count': 0})
+
+        await freelancer_socket.disconnect()
+        await client_socket.disconnect()
+
+    async def test_ping(self):
+        socket = await self.connect(self.client_user)
+        await socket.receive_json_from()
+        await socket.send_json_to({'type': 'ping'})
+        self.assertEqual(await socket.receive_json_from(), {'type': 'pong'})
+        await socket.disconnect()
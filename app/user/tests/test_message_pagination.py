@@ -0,0 +1,81 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Chat, Client, Freelancer, Message
+
+
+class MessagePaginationTests(TestCase):
+
+    def setUp(self):
+        self.client_user = Client.objects.create(email='client@gmail.com', password='test123', company_name='Client Company')
+        self.freelancer_user = Freelancer.objects.create(email='freelancer@gmail.com', password='test123', full_name='Freelancer')
+        self.chat = Chat.objects.create(client=self.client_user, freelancer=self.freelancer_user)
+        start = timezone.now() - timedelta(hours=1)
+        for i in range(7):
+            message = Message.objects.create(chat=self.chat, sender=self.client_user, content=f"message {i}")
+            # Messages 3 and 4 share a timestamp, so the id decides their order
+            Message.objects.filter(id=message.id).update(timestamp=start + timedelta(minutes=min(i, 3) if i < 5 else i))
+        self.ordered = list(Message.objects.filter(chat=self.chat).order_by('timestamp', 'id').values_list('content', flat=True))
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.client_user)
+        self.url = reverse('user:chat-messages-list', kwargs={'chat_pk': self.chat.id})
+
+    def contents(self, response):
+        return [message['content'] for message in response.data['messages']]
+
+    def test_latest_page_then_older_history(self):
+        response = self.api.get(self.url, {'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.contents(response), self.ordered[4:])
+
+        older = self.api.get(self.url, {'page_size': 3, 'before': response.data['previous']})
+        self.assertEqual(self.contents(older), self.ordered[1:4])
+        self.assertIsNone(older.data['after'])
+
+        oldest = self.api.get(self.url, {'page_size': 3, 'before': older.data['previous']})
+        self.assertEqual(self.contents(oldest), self.ordered[:1])
+        self.assertIsNone(oldest.data['previous'])
+
+    def test_after_returns_only_new_messages(self):
+        response = self.api.get(self.url)
+        self.assertEqual(len(response.data['messages']), 7)
+        cursor = response.data['after']
+
+        response = self.api.get(self.url, {'after': cursor})
+        self.assertEqual(response.data['messages'], [])
+        self.assertEqual(response.data['after'], cursor)
+
+        Message.objects.create(chat=self.chat, sender=self.freelancer_user, content="new")
+        Message.objects.create(chat=self.chat, sender=self.freelancer_user, content="newer")
+        response = self.api.get(self.url, {'after': cursor, 'page_size': 1})
+        self.assertEqual(self.contents(response), ["new"])
+        self.assertTrue(response.data['has_more'])
+        response = self.api.get(self.url, {'after': response.data['after']})
+        self.assertEqual(self.contents(response), ["newer"])
+        self.assertFalse(response.data['has_more'])
+
+    def test_invalid_cursor(self):
+        response = self.api.get(self.url, {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_participant_is_rejected(self):
+        other = Client.objects.create(email='other@gmail.com', password='test123', company_name='Other')
+        self.api.force_authenticate(user=other)
+        self.assertEqual(self.api.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_chat_between_client_and_freelancer_serializes_messages_once(self):
+        response = self.api.get(reverse('user:chat-client-freelancer'), {
+            'client_id': self.client_user.id, 'freelancer_id': self.freelancer_user.id, 'page_size': 2,
+        })
+        self.assertNotIn('messages', response.data['chat'])
+        self.assertEqual(self.contents(response), self.ordered[5:])
+        self.assertIsNotNone(response.data['previous'])
+
+    def test_chat_lists_return_latest_page(self):
+        response = self.api.get(reverse('user:client-chats'), {'client_id': self.client_user.id})
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual([m['content'] for m in response.data[0]['messages']], self.ordered)
+        self.assertNotIn('messages', response.data[0]['chat'])
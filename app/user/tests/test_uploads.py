@@ -0,0 +1,184 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import uploads
+from core.models import Blob, Chat, Client, Freelancer, Message, Upload
+
+UPLOADS_URL = reverse('user:upload-create')
+CONTENT = b"%PDF-1.4 evidence " * 100
+
+
+def detail_url(upload_id):
+    return reverse('user:upload-detail', args=[upload_id])
+
+
+def complete_url(upload_id):
+    return reverse('user:upload-complete', args=[upload_id])
+
+
+class ChunkedUploadTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, UPLOAD_TEMP_DIR=self.temp_dir, UPLOAD_CHUNK_MAX_SIZE=1000)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client_user = Client.objects.create(email='client@gmail.com', password='test123', company_name='Client Company')
+        self.freelancer_user = Freelancer.objects.create(email='freelancer@gmail.com', password='test123', full_name='Freelancer')
+        self.api = APIClient()
+        self.api.force_authenticate(user=self.client_user)
+
+    def start(self, content=CONTENT, **extra):
+        response = self.api.post(UPLOADS_URL, {'filename': 'evidence.pdf', 'size': len(content), **extra}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def send_chunk(self, upload_id, offset, data):
+        return self.api.patch(
+            detail_url(upload_id), data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def upload(self, content=CONTENT):
+        upload_id = self.start(content)
+        for offset in range(0, len(content), 1000):
+            self.assertEqual(self.send_chunk(upload_id, offset, content[offset:offset + 1000]).status_code, status.HTTP_200_OK)
+        response = self.api.post(complete_url(upload_id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return upload_id, response
+
+    def test_chunked_upload_becomes_blob(self):
+        upload_id, response = self.upload()
+
+        blob = Blob.objects.get()
+        self.assertEqual(response.data['blob'], hashlib.sha256(CONTENT).hexdigest())
+        self.assertEqual(blob.size, len(CONTENT))
+        with blob.file.open('rb') as stored:
+            self.assertEqual(stored.read(), CONTENT)
+        self.assertFalse(os.path.exists(uploads.part_path(Upload.objects.get(pk=upload_id))))
+
+    def test_resume_after_interrupted_chunk(self):
+        upload_id = self.start()
+        self.send_chunk(upload_id, 0, CONTENT[:1000])
+
+        # A retried chunk at a stale offset is rejected with the offset to resume from
+        response = self.send_chunk(upload_id, 0, CONTENT[:1000])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 1000)
+
+        response = self.api.get(detail_url(upload_id))
+        self.assertEqual(response['Upload-Offset'], '1000')
+        self.assertEqual(self.api.post(complete_url(upload_id)).status_code, status.HTTP_409_CONFLICT)
+
+        for offset in range(1000, len(CONTENT), 1000):
+            self.send_chunk(upload_id, offset, CONTENT[offset:offset + 1000])
+        self.assertEqual(self.api.post(complete_url(upload_id)).data['status'], 'complete')
+
+    def test_oversized_chunk_is_rejected(self):
+        upload_id = self.start(CONTENT[:500])
+
+        response = self.send_chunk(upload_id, 0, CONTENT[:501])
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(Upload.objects.get(pk=upload_id).offset, 0)
+
+    @override_settings(UPLOAD_MAX_SIZE=100)
+    def test_oversized_file_is_rejected(self):
+        response = self.api.post(UPLOADS_URL, {'filename': 'big.pdf', 'size': 101}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_checksum_mismatch_restarts_upload(self):
+        upload_id = self.start(CONTENT[:10], sha256=hashlib.sha256(b"other").hexdigest())
+        self.send_chunk(upload_id, 0, CONTENT[:10])
+
+        response = self.api.post(complete_url(upload_id))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Upload.objects.get(pk=upload_id).offset, 0)
+        self.assertFalse(Blob.objects.exists())
+
+    def test_identical_uploads_share_one_blob(self):
+        first, _ = self.upload()
+        second, _ = self.upload()
+        uploads.store_uploaded_file(SimpleUploadedFile('evidence.pdf', CONTENT))
+
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertEqual(Upload.objects.get(pk=first).blob_id, Upload.objects.get(pk=second).blob_id)
+
+    def test_other_users_cannot_use_an_upload(self):
+        upload_id, _ = self.upload()
+        other = APIClient()
+        other.force_authenticate(user=self.freelancer_user)
+
+        self.assertEqual(other.get(detail_url(upload_id)).status_code, status.HTTP_403_FORBIDDEN)
+        with self.assertRaises(uploads.UploadError):
+            uploads.completed_blobs([upload_id], self.freelancer_user)
+
+    def test_message_attachment_references_blob(self):
+        upload_id, _ = self.upload()
+        chat = Chat.objects.create(client=self.client_user, freelancer=self.freelancer_user)
+
+        response = self.api.post(
+            reverse('user:chat-messages-list', kwargs={'chat_pk': chat.id}), {'content': "Evidence", 'upload': upload_id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        message = Message.objects.get()
+        blob = Blob.objects.get()
+        self.assertEqual(message.blob, blob)
+        self.assertEqual(message.file.name, blob.file.name)
+
+    def test_stale_sessions_are_purged(self):
+        upload_id = self.start()
+        Upload.objects.filter(pk=upload_id).update(updated_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(uploads.purge_stale_uploads(), 1)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(os.listdir(self.temp_dir))
+
+    def test_anonymous_users_cannot_upload(self):
+        response = APIClient().post(UPLOADS_URL, {'filename': 'evidence.pdf', 'size': len(CONTENT)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Upload.objects.exists())
+
+    @override_settings(UPLOAD_SESSIONS_PER_HOUR=2, UPLOAD_BYTES_PER_DAY=len(CONTENT) * 3)
+    def test_uploads_are_rate_limited_per_user(self):
+        self.start()
+        self.start()
+        response = self.api.post(UPLOADS_URL, {'filename': 'evidence.pdf', 'size': len(CONTENT)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        Upload.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        response = self.api.post(UPLOADS_URL, {'filename': 'evidence.pdf', 'size': len(CONTENT) + 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)  # over the daily bytes
+
+        other = APIClient()
+        other.force_authenticate(user=self.freelancer_user)
+        response = other.post(UPLOADS_URL, {'filename': 'evidence.pdf', 'size': len(CONTENT)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_unreferenced_blobs_are_collected(self):
+        upload_id, _ = self.upload()
+        chat = Chat.objects.create(client=self.client_user, freelancer=self.freelancer_user)
+        self.api.post(reverse('user:chat-messages-list', kwargs={'chat_pk': chat.id}), {'content': "Evidence", 'upload': upload_id})
+        self.upload(CONTENT + b"unsent")
+        old = timezone.now() - timedelta(days=2)
+        Upload.objects.update(updated_at=old)
+        Blob.objects.update(created_at=old)
+
+        uploads.purge_stale_uploads()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(uploads.purge_unreferenced_blobs(), 1)
+
+        kept = Blob.objects.get()
+        self.assertEqual(Message.objects.get().blob, kept)
+        self.assertEqual(os.listdir(os.path.dirname(kept.file.path)), [os.path.basename(kept.file.name)])
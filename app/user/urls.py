@@ -12,11 +12,15 @@ router.register('notifications', views.NotificationViewSet, basename='notificati
 router.register('message', views.MessageViewSet, basename='message')
 
 urlpatterns = [
+    path('uploads/', views.UploadCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', views.UploadDetailView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:pk>/complete/', views.UploadCompleteView.as_view(), name='upload-complete'),
+    path('inbox/', views.ChatInboxView.as_view(), name='chat-inbox'),
     path('clientFreelancerChat/', views.ChatBetweenClientFreelancerView.as_view(), name='chat-client-freelancer'),
     path('clientChats/', views.ClientChatListView.as_view(), name='client-chats'),
     path('freelancerChats/', views.FreelancerChatListView.as_view(), name='freelancer-chats'),
     path('clientChats/', views.ClientChatListView.as_view(), name='client-chats'),
-    path('chats/<uuid:chat_pk>/messages/', views.MessageViewSet.as_view({'post': 'create'})),
+    path('chats/<uuid:chat_pk>/messages/', views.MessageViewSet.as_view({'get': 'list', 'post': 'create'}), name='chat-messages-list'),
     path('freelancer/remove/', views.RemoveFreelancerView.as_view(), name='remove-freelancer'),
     path('client/remove/', views.RemoveClientView.as_view(), name='remove-client'),
     path('token/obtain/', views.CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -37,6 +41,7 @@ urlpatterns = [
     path('notifications/unread-count/', views.unread_notification_count, name='unread_notification_count'),
     path('change-password/', views.PasswordChangeView.as_view(), name='change-password'),
     path('select-appointment/', views.SelectAppointmentDateView.as_view(), name='select-appointment'),
+    path('messages/<uuid:pk>/file/', views.MessageFileView.as_view(), name='message-file'),
     path('messages/read/', views.MarkMessagesAsReadView.as_view(), name='mark-messages-as-read'),
     path('verify-skills/', views.VerifyFreelancerSkillsView.as_view(), name='verify-freelnacer-skills'),
     path('user-type/', views.UserTypeView.as_view(), name='user-type'),
@@ -13,8 +13,7 @@ from django.utils.crypto import get_random_string
 from rest_framework.decorators import action
 from core import models
 from django.conf import settings
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from core.emails import send_email
 def generate_password_reset_link(user):
     """Generate a password reset link."""
     token = default_token_generator.make_token(user)
@@ -63,21 +62,5 @@ def send_password_reset_email(to_email):
         </body>
     </html>
     """
-    message = f'Click the following link to reset your password: {reset_link}'
-    message = Mail(
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to_emails=to_email,
-        subject=subject,
-        html_content = html_content
-    )
-    print("from email is",settings.DEFAULT_FROM_EMAIL)
-    print("api key is ",settings.EMAIL_HOST_USER)
-    print("message is ",message)
-    try:
-        sg = SendGridAPIClient(settings.EMAIL_HOST_USER)
-        response = sg.send(message)
-        print("email sent")
-        return response.status_code
-    except Exception as e:
-        print("error sending email ",str(e))
-        return str(e)
\ No newline at end of file
+    send_email(to_email, subject, html_content)
+    print(f"Password reset link queued for {to_email}")
\ No newline at end of file
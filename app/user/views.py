@@ -6,7 +6,7 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from user import serializers
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.authentication import JWTAuthentication
 from core import models
 from project.serializers import ProjectSerializer
 from rest_framework.generics import get_object_or_404
@@ -19,6 +19,7 @@ from django.shortcuts import get_object_or_404
 from .utils import send_password_reset_email
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -40,14 +41,24 @@ from django.utils.crypto import get_random_string
 from rest_framework.decorators import action
 from core import models
 from django.conf import settings
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from core.emails import send_email
+from core.interviewer_capacity import invalidate_interviewer_capacity
+from core.notifications import EMAIL, IN_APP, notify, notify_many
+from core.tasks import refresh_appointment_date_options
+from . import inbox, realtime
+from core import interview_slots, roles, uploads
+from core.roles import add_role_claim, get_role, get_role_by_id, get_role_instance
+from core.media import serve_file
+from core.unread_counters import NOTIFICATIONS, adjust_unread_counts, get_unread_count
+from .pagination import get_page_size, message_page
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
 import json
+from django.db import transaction
+from django.db.models import F, Q
 def get_tokens_for_user(user):
-    """Generate JWT tokens for a user"""
-    refresh = RefreshToken.for_user(user)
+    """Generate JWT tokens for a user, carrying the user's role"""
+    refresh = add_role_claim(RefreshToken.for_user(user), user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -67,25 +78,11 @@ class LoginView(APIView):
 
         if user is not None:
             # Generate tokens using SimpleJWT
-            refresh = RefreshToken.for_user(user)
-            token = {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
+            token = get_tokens_for_user(user)
 
             # Determine user role (Freelancer, Client, Interviewer, Dispute Manager)
-            role = None
-            if models.Freelancer.objects.filter(id=user.id).exists():
-                role = 'freelancer'
-            elif models.Client.objects.filter(id=user.id).exists():
-                role = 'client'
-            elif models.Interviewer.objects.filter(id=user.id).exists():
-                role = 'interviewer'
-            elif models.DisputeManager.objects.filter(id=user.id).exists():
-                role = 'dispute-manager'
-            elif models.ResumeChecker.objects.filter(id=user.id).exists():
-                role = 'resume-checker'
-            
+            role = get_role(user) or None
+
             # Check if there's an unfinished assessment if the user is a freelancer
            # Check freelancer assessment status
             assessment_complete = False
@@ -126,18 +123,7 @@ class UserRoleView(APIView):
         print("Received request with data:", request.data)
         user = request.user
         print("user is ",user)
-        if models.Freelancer.objects.filter(id=user.id).exists():
-            role = 'freelancer'
-        elif models.Client.objects.filter(id=user.id).exists():
-            role = 'client'
-        elif models.Interviewer.objects.filter(id=user.id).exists():
-            role = 'interviewer'
-        elif models.DisputeManager.objects.filter(id=user.id).exists():
-            role = 'dispute-manager'
-        elif models.ResumeChecker.objects.filter(id=user.id).exists():
-            role = 'resume-checker'
-        else:
-            role = 'Admin'
+        role = get_role(request) or 'Admin'
         # Check if there's an unfinished assessment if the user is a freelancer
         # Check freelancer assessment status
         assessment_complete = False
@@ -165,16 +151,7 @@ class UserTypeView(APIView):
             return Response({"error": "User ID not provided"}, status=status.HTTP_400_BAD_REQUEST)
         print("******* user id is ********",user_id)
         # Check user type based on the ID
-        if models.DisputeManager.objects.filter(id=str(user_id)).exists():
-            user_type = "dispute-manager"
-        elif models.Client.objects.filter(id=str(user_id)).exists():
-            user_type = "client"
-        elif models.Freelancer.objects.filter(id=str(user_id)).exists():
-            user_type = "freelancer"
-        elif models.Interviewer.objects.filter(id=str(user_id)).exists():
-            user_type = "interviewer"
-        else:
-            user_type = "Unknown"  # Default if no specific type is found
+        user_type = get_role_by_id(str(user_id)) or "Unknown"  # Default if no specific type is found
         
         return Response({"user_type": user_type}, status=status.HTTP_200_OK)
 
@@ -234,29 +211,6 @@ def send_email_verification_link(request):
     return Response(status=status.HTTP_200_OK)
 
 
-def send_email(to_email, subject, html_content):
-    print("to email is ",to_email)
-    print("subject is ",subject)
-    print("html_content is ",html_content)
-    message = Mail(
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
-    )
-    print("from email is",settings.DEFAULT_FROM_EMAIL)
-    print("api key is ",settings.EMAIL_HOST_USER)
-    print("message is ",message)
-    try:
-        sg = SendGridAPIClient(settings.EMAIL_HOST_USER)
-        response = sg.send(message)
-        print("email sent")
-        return response.status_code
-    except Exception as e:
-        print("error sending email ",str(e))
-        return str(e)
-
-
 @api_view(['POST'])
 def send_email_(request):
     
@@ -278,18 +232,7 @@ def send_email_(request):
         </html>
         """
 
-        message = Mail(
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to_emails=to_email,
-        subject=subject,
-        html_content=html_content
-        )
-        print("from email is",settings.DEFAULT_FROM_EMAIL)
-        print("api key is ",settings.EMAIL_HOST_USER)
-        print("message is ",message)
-        sg = SendGridAPIClient(settings.EMAIL_HOST_USER)
-        response = sg.send(message)
-        print("email sent")
+        send_email(to_email, subject, html_content)
         return Response(status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -368,7 +311,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 class TokenRefreshView(APIView):
     """
     View to handle refreshing JWT tokens.
-    Accepts a refresh token and returns a new access and refresh token.
+    Accepts a refresh token and returns a new access and refresh token, carrying the user's current role.
     """
     
     def post(self, request):
@@ -379,6 +322,11 @@ class TokenRefreshView(APIView):
         
         try:
             refresh = RefreshToken(refresh_token)
+            # Stateless access tokens are trusted without a user lookup, so the user is checked here instead
+            user = models.User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM), is_active=True).first()
+            if user is None:
+                return Response({'detail': 'User not found or inactive.'}, status=status.HTTP_401_UNAUTHORIZED)
+            add_role_claim(refresh, user)
             new_access_token = refresh.access_token
 
             # Optionally, rotate the refresh token
@@ -477,6 +425,7 @@ class ManageFreelancerView(generics.RetrieveUpdateAPIView):
         # Perform the update
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
+        # The serializer syncs the skill rows and refreshes the match scores and embedding
         self.perform_update(serializer)
 
         # Check the freelancer's skills to create an appointment if necessary
@@ -549,125 +498,6 @@ class ManageFreelancerView(generics.RetrieveUpdateAPIView):
 
 
 
-def get_available_interviewers( category):
-        """Get interviewers who match the category and have availability."""
-        print("Trying to get interviewers for category:", category)
-        
-        # Normalize the category string
-        expertise = models.Services.objects.filter(name__icontains=category).first()
-        
-        # Check if expertise was found
-        if not expertise:
-            return []  # Return an empty list if no matching expertise is found
-        
-        # Filter active interviewers
-        interviewers = models.Interviewer.objects.filter(
-            expertise=expertise,
-            is_active=True,
-            interviews_per_week__gt=0
-        )
-
-        available_interviewers = []
-        today = timezone.now()
-        start_of_week = today - timedelta(days=today.weekday())  # Start of the current week
-        end_of_week = start_of_week + timedelta(days=6)  # End of the current week
-
-        for interviewer in interviewers:
-            # Count the number of interviews the interviewer has this week
-            interviews_this_week = models.FreelancerInterview.objects.filter(
-                interviewer=interviewer,
-                appointment__appointment_date__range=(start_of_week, end_of_week),
-                done=False
-            ).count()
-
-            # Count the number of interviews the interviewer has today
-            interviews_today = models.FreelancerInterview.objects.filter(
-                interviewer=interviewer,
-                appointment__appointment_date__date=today.date(),
-                done=False
-            ).count()
-
-            # Check if the current time exceeds the interviewer's end working hour
-            if today.time() <= interviewer.working_hours_end:
-                # Calculate available slots
-                remaining_weekly_slots = interviewer.interviews_per_week - interviews_this_week
-                remaining_daily_slots = interviewer.max_interviews_per_day - interviews_today
-                
-                # Store only those who have slots available
-                if remaining_weekly_slots > 0 and remaining_daily_slots > 0:
-                    available_interviewers.append({
-                        'interviewer': interviewer,
-                        'remaining_weekly_slots': remaining_weekly_slots,
-                        'remaining_daily_slots': remaining_daily_slots
-                    })
-
-        # Sort interviewers based on remaining slots (you can customize this sorting logic)
-        available_interviewers.sort(key=lambda x: (x['remaining_weekly_slots'], x['remaining_daily_slots']), reverse=True)
-
-        # Return only the interviewer objects
-        return [entry['interviewer'] for entry in available_interviewers]
-
-def generate_appointment_date_options(interviewers):
-        """Generate a list of available appointment dates for a group of interviewers."""
-        date_options = []
-        today = timezone.now()
-        day_counter = 0
-
-        # Try to find 5 available appointment slots from the pool of interviewers
-        while len(date_options) < 5:
-            for interviewer in interviewers:
-                # Get the interviewer's working hours
-                working_hours_start = interviewer.working_hours_start
-                working_hours_end = interviewer.working_hours_end
-
-                # Calculate the start and end of the week for the current iteration
-                start_of_week = today + timedelta(days=day_counter)
-                end_of_week = start_of_week + timedelta(days=6)
-
-                # Generate potential appointment slots within working hours for each day of the week
-                for single_day in range(7):
-                    current_day = start_of_week + timedelta(days=single_day)
-                    
-                    # Create datetime objects for the start and end of working hours
-                    appointment_start = timezone.make_aware(datetime.combine(current_day.date(), working_hours_start))
-                    appointment_end = timezone.make_aware(datetime.combine(current_day.date(), working_hours_end))
-
-                    # Count existing interviews for this interviewer in the given week
-                    interviews_this_week = models.FreelancerInterview.objects.filter(
-                        interviewer=interviewer,
-                        appointment__appointment_date__range=(start_of_week, end_of_week),
-                        done=False
-                    ).count()
-
-                    # Count existing interviews for today
-                    interviews_today = models.FreelancerInterview.objects.filter(
-                        interviewer=interviewer,
-                        appointment__appointment_date__date=current_day.date(),
-                        done=False
-                    ).count()
-
-                    # If the interviewer has availability this week and today, check the appointment time
-                    if (interviews_this_week < interviewer.interviews_per_week and
-                        interviews_today < interviewer.max_interviews_per_day):
-                        # Check if the appointment time falls within the working hours
-                        if appointment_start < appointment_end:  # Valid working hours
-                            date_options.append({
-                                "interviewer_id":interviewer.id,
-                                "date": appointment_start.strftime('%Y-%m-%d %H:%M')
-                            })
-
-                    # If we've generated 5 options, stop
-                    if len(date_options) >= 5:
-                        break
-
-                # Move to the next week if not enough options were generated
-                if len(date_options) >= 5:
-                    break
-            
-            day_counter += 7
-
-        return date_options
-
 class ManageClientView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated client"""
     serializer_class = serializers.ClientSerializer
@@ -698,6 +528,11 @@ class ManageInterviewerView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         """Retrieve and return the authenticated interviewer"""
         return models.Interviewer.objects.get(id=self.request.user.id)
+
+    def perform_update(self, serializer):
+        interviewer = serializer.save()
+        # Working hours may have changed
+        interview_slots.sync_interview_slots(interviewer)
     
 
 class ManageDisputeMangerView(generics.RetrieveUpdateAPIView):
@@ -795,11 +630,11 @@ class ChatViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter chats to only include those involving the authenticated user"""
-        user = self.request.user
-        if hasattr(user, 'client'):
-            return self.queryset.filter(client=user.client)
-        elif hasattr(user, 'freelancer'):
-            return self.queryset.filter(freelancer=user.freelancer)
+        role = get_role(self.request)
+        if role == roles.CLIENT:
+            return self.queryset.filter(client_id=self.request.user.id)
+        elif role == roles.FREELANCER:
+            return self.queryset.filter(freelancer_id=self.request.user.id)
         else:
             return self.queryset.none()
 
@@ -815,11 +650,52 @@ class MessageViewSet(viewsets.ModelViewSet):
         print(f"Received request data: {request.data}")  # Debugging line
         return super().create(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        """Messages of one chat, paginated with ?before=/?after= cursors"""
+        chat_id = self.kwargs.get('chat_pk')
+        if chat_id is None:
+            return super().list(request, *args, **kwargs)
+        chat = generics.get_object_or_404(models.Chat, pk=chat_id)
+        if request.user.id not in (chat.client_id, chat.freelancer_id):
+            raise PermissionDenied("You are not a participant of this chat.")
+        try:
+            page = paginated_messages(chat, request)
+        except ValueError:
+            return Response({"error": "Invalid cursor or page_size."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page, status=status.HTTP_200_OK)
+
     def perform_create(self, serializer):
         """Create a message in a chat"""
         chat_id = self.kwargs.get('chat_pk')
         chat = generics.get_object_or_404(models.Chat, pk=chat_id)
-        serializer.save(chat=chat, sender=self.request.user)
+        with transaction.atomic():
+            message = serializer.save(chat=chat, sender=self.request.user)
+            inbox.record_message(message)
+        realtime.publish_message(message, serializer.data)
+
+    def get_sent_message(self):
+        """The message being changed, locked; only its sender may edit or delete it."""
+        message = generics.get_object_or_404(
+            models.Message.objects.select_for_update(of=('self',)).select_related('chat'), pk=self.kwargs['pk']
+        )
+        if message.sender_id != self.request.user.id:
+            raise PermissionDenied("Only the sender can change this message.")
+        return message
+
+    def perform_update(self, serializer):
+        """Edit a message, keeping the chat's summary and unread counters in step"""
+        with transaction.atomic():
+            previous = self.get_sent_message()
+            # A message stays in its chat and with its sender
+            message = serializer.save(chat=previous.chat, sender_id=previous.sender_id)
+            inbox.record_message_update(previous, message)
+
+    def perform_destroy(self, instance):
+        """Delete a message, keeping the chat's summary and unread counters in step"""
+        with transaction.atomic():
+            message = self.get_sent_message()
+            message.delete()
+            inbox.record_message_deletion(message)
 
 class MarkMessagesAsReadView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -830,14 +706,11 @@ class MarkMessagesAsReadView(APIView):
         serializer.is_valid(raise_exception=True)
         message_ids = serializer.validated_data['message_ids']
         
-        # Fetch messages that belong to the authenticated user and are unread
-        messages = models.Message.objects.filter(
-            id__in=message_ids,
-            read=False,
-        )
-
-        # Update the 'read' status
-        updated_count = messages.update(read=True)
+        # Update the 'read' status and the chats' unread counters
+        read_messages = inbox.mark_messages_read(message_ids, request.user.id)
+        updated_count = len(read_messages)
+        if updated_count:
+            realtime.publish_read_receipts(request.user, read_messages)
 
         return Response(
             {"message": f"{updated_count} message(s) marked as read."},
@@ -845,6 +718,105 @@ class MarkMessagesAsReadView(APIView):
         )
 
 
+class ChatInboxView(generics.ListAPIView):
+    """The authenticated user's chats with their peer, last message and unread count, most recent first"""
+    serializer_class = serializers.InboxChatSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        user_id = self.request.user.id
+        return models.Chat.objects.filter(
+            Q(client_id=user_id) | Q(freelancer_id=user_id)
+        ).select_related('client', 'freelancer').order_by(
+            F('last_message_at').desc(nulls_last=True), '-created_at'
+        )
+
+
+def upload_error_response(error):
+    data = {"error": str(error)}
+    if isinstance(error, uploads.UploadConflict):
+        data["offset"] = error.offset
+    return Response(data, status=error.status_code)
+
+
+def get_upload(request, pk):
+    """An upload session of the requesting user."""
+    upload = get_object_or_404(models.Upload, pk=pk)
+    if upload.user_id != request.user.id:
+        raise PermissionDenied("You do not have permission to access this upload.")
+    return upload
+
+
+class UploadCreateView(APIView):
+    """Open a chunked upload session for a file of `size` bytes, within the user's upload rate limits."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = serializers.UploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = uploads.start_upload(request.user, **serializer.validated_data)
+        except uploads.UploadError as e:
+            return upload_error_response(e)
+        return Response(serializers.UploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class UploadDetailView(APIView):
+    """
+    GET returns the session with the offset to resume from.
+    PATCH appends the raw request body at the `Upload-Offset` header, streaming it to disk.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        upload = get_upload(request, pk)
+        return Response(serializers.UploadSerializer(upload).data, headers={'Upload-Offset': str(upload.offset)})
+
+    def patch(self, request, pk, *args, **kwargs):
+        upload = get_upload(request, pk)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            return Response({"error": "Upload-Offset header is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # request.data is never touched, so the body is read straight from the socket
+            upload = uploads.write_chunk(upload.id, offset, request.stream)
+        except uploads.UploadError as e:
+            return upload_error_response(e)
+        return Response(serializers.UploadSerializer(upload).data, headers={'Upload-Offset': str(upload.offset)})
+
+
+class UploadCompleteView(APIView):
+    """Verify a fully received upload and store it as a content-addressed blob."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, *args, **kwargs):
+        upload = get_upload(request, pk)
+        try:
+            upload = uploads.complete_upload(upload.id)
+        except uploads.UploadError as e:
+            return upload_error_response(e)
+        return Response(serializers.UploadSerializer(upload).data, status=status.HTTP_200_OK)
+
+
+class MessageFileView(APIView):
+    """Download a message attachment; only the chat's participants may read it."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        message = get_object_or_404(models.Message.objects.select_related('chat', 'blob'), pk=pk)
+        chat = message.chat
+        if chat is None or request.user.id not in (chat.client_id, chat.freelancer_id):
+            raise PermissionDenied("You do not have permission to access this file.")
+        return serve_file(request, message.file)
+
+
 class ChatBetweenClientFreelancerView(generics.GenericAPIView):
     """
     Fetch the chat between a client and a freelancer using their IDs.
@@ -869,13 +841,15 @@ class ChatBetweenClientFreelancerView(generics.GenericAPIView):
         if not chat:
             return Response([], status=status.HTTP_200_OK)
 
-        # Serialize the chat and its messages
-        chat_serializer = serializers.ChatSerializer(chat)
-        messages_serializer = serializers.MessageSerializer(chat.messages.all(), many=True)
+        # Serialize the chat and one page of its messages
+        try:
+            page = paginated_messages(chat, request)
+        except ValueError:
+            return Response({"error": "Invalid cursor or page_size."}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
-            "chat": chat_serializer.data,
-            "messages": messages_serializer.data
+            "chat": serializers.ChatInfoSerializer(chat).data,
+            **page,
         }, status=status.HTTP_200_OK)
 
 
@@ -897,15 +871,12 @@ class ClientChatListView(generics.GenericAPIView):
             print("no chats found")
             return Response({"error": "No chats found for this client."}, status=status.HTTP_404_NOT_FOUND)
 
-        # Serialize the chats
+        # Serialize the chats with their latest page of messages
         chat_data = []
         for chat in chats:
-            messages = models.Message.objects.filter(chat=chat).order_by('timestamp')
-            message_serializer = serializers.MessageSerializer(messages, many=True)
-            chat_serializer = serializers.ChatSerializer(chat)
             chat_data.append({
-                "chat": chat_serializer.data,
-                "messages": message_serializer.data,
+                "chat": serializers.ChatInfoSerializer(chat).data,
+                **paginated_messages(chat),
             })
         
         return Response(chat_data, status=status.HTTP_200_OK)
@@ -929,14 +900,11 @@ class FreelancerChatListView(generics.GenericAPIView):
         if not chats.exists():
             return Response(chat_data, status=status.HTTP_200_OK)
 
-        # Serialize the chats
+        # Serialize the chats with their latest page of messages
         for chat in chats:
-            messages = models.Message.objects.filter(chat=chat).order_by('timestamp')
-            message_serializer = serializers.MessageSerializer(messages, many=True)
-            chat_serializer = serializers.ChatSerializer(chat)
             chat_data.append({
-                "chat": chat_serializer.data,
-                "messages": message_serializer.data,
+                "chat": serializers.ChatInfoSerializer(chat).data,
+                **paginated_messages(chat),
             })
         
         return Response(chat_data, status=status.HTTP_200_OK)
@@ -959,40 +927,40 @@ class ClientChatListView(generics.GenericAPIView):
         if not chats.exists():
             return Response(chat_data, status=status.HTTP_200_OK)
 
-        # Serialize the chats
+        # Serialize the chats with their latest page of messages
         for chat in chats:
-            messages = models.Message.objects.filter(chat=chat).order_by('timestamp')
-            message_serializer = serializers.MessageSerializer(messages, many=True)
-            chat_serializer = serializers.ChatSerializer(chat)
             chat_data.append({
-                "chat": chat_serializer.data,
-                "messages": message_serializer.data,
+                "chat": serializers.ChatInfoSerializer(chat).data,
+                **paginated_messages(chat),
             })
         
         return Response(chat_data, status=status.HTTP_200_OK)
 
 
+def paginated_messages(chat, request=None):
+    """A serialized page of the chat's messages; cursors and page size come from the query string."""
+    params = request.query_params if request is not None else {}
+    page = message_page(
+        chat.messages.all(),
+        before=params.get('before'),
+        after=params.get('after'),
+        page_size=get_page_size(params.get('page_size')),
+    )
+    page['messages'] = serializers.MessageSerializer(page['messages'], many=True).data
+    return page
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def unread_message_count(request):
     user = request.user
 
     # Determine if the user is a client or freelancer
-    if hasattr(user, 'client'):
-        chats = user.client.chats.all()
-    elif hasattr(user, 'freelancer'):
-        chats = user.freelancer.chats.all()
-    else:
+    if get_role(request) not in (roles.CLIENT, roles.FREELANCER):
         return Response({'detail': 'User not associated with a client or freelancer profile.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Filter for unread messages that were not sent by the current user
-    unread_messages = models.Message.objects.filter(chat__in=chats, read=False).exclude(sender=user)
-
-    # Count unread messages
-    unread_count = unread_messages.count()
-
-    # Optionally, if you want to return the actual unread messages
-    # unread_message_data = serializers.MessageSerializer(unread_messages, many=True).data
+    # Count unread messages that were not sent by the current user
+    unread_count = realtime.unread_message_count(user)
 
     # Serialize the response with count and message details
     data = {
@@ -1006,7 +974,7 @@ def unread_message_count(request):
 def unread_notification_count(request):
     user = request.user
     
-    unread_count = models.Notification.objects.filter(user=user, read=False).count()
+    unread_count = get_unread_count(NOTIFICATIONS, user.id)
     
     # Serialize the response
     data = {'count': unread_count}
@@ -1059,8 +1027,28 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter notifications to only include those for the authenticated user"""
-        user = self.request.user
-        return self.queryset.filter(user=user)
+        return self.queryset.filter(user_id=self.request.user.id)
+
+    def perform_create(self, serializer):
+        notification = serializer.save()
+        if not notification.read:
+            adjust_unread_counts(NOTIFICATIONS, {notification.user_id: 1})
+
+    def perform_update(self, serializer):
+        was_unread = not serializer.instance.read
+        previous_user_id = serializer.instance.user_id
+        notification = serializer.save()
+        deltas = {previous_user_id: -1} if was_unread else {}
+        if not notification.read:
+            deltas[notification.user_id] = deltas.get(notification.user_id, 0) + 1
+        adjust_unread_counts(NOTIFICATIONS, deltas)
+
+    def perform_destroy(self, instance):
+        was_unread = not instance.read
+        user_id = instance.user_id
+        instance.delete()
+        if was_unread:
+            adjust_unread_counts(NOTIFICATIONS, {user_id: -1})
 
 class PasswordChangeView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -1082,13 +1070,7 @@ class PasswordChangeView(APIView):
         serializer = serializers.PasswordChangeSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        notification = models.Notification.objects.create(
-                user=user,
-                type='alert',
-                title="Passowrd Changed",
-                description="You've successfully changed your password!",
-            )
-        notification.save()
+        notify(user, "Passowrd Changed", "You've successfully changed your password!")
         
         return Response({'detail': 'Password has been updated successfully.'}, status=status.HTTP_200_OK)
     
@@ -1099,12 +1081,9 @@ class SelectAppointmentDateView(APIView):
 
     def get_object(self):
         """Retrieve and return the authenticated freelancer or interviewer"""
-        if models.Freelancer.objects.filter(id=self.request.user.id).exists():
-            return models.Freelancer.objects.get(id=self.request.user.id)
-        elif models.Interviewer.objects.filter(id=self.request.user.id).exists():
-            return models.Interviewer.objects.get(id=self.request.user.id)
-        else:
-            return None
+        if get_role(self.request) in (roles.FREELANCER, roles.INTERVIEWER):
+            return get_role_instance(self.request)
+        return None
 
     def post(self, request):
         """Create a new appointment date"""
@@ -1123,49 +1102,39 @@ class SelectAppointmentDateView(APIView):
             appointment = models.Appointment.objects.get(pk=UUID(appointment_id))
             interviewer = models.Interviewer.objects.get(pk=UUID(interviewer_id))
 
-            # Update the appointment with the selected date
-            appointment.appointment_date = selected_date
-            appointment.save()
-
-            # Create FreelancerInterview instance
-            freelancer_interview = models.FreelancerInterview.objects.create(
-                interviewer=interviewer,
-                freelancer=appointment.freelancer,
-                appointment=appointment,
-                passed=False,  # Initial state is not passed
-                done=False  # Initial state is not done
-            )
+            with transaction.atomic():
+                # Take the interviewer's slot, set the appointment's date and create (or move) the interview
+                start, freelancer_interview = interview_slots.book_interview(appointment, interviewer, selected_date)
+                invalidate_interviewer_capacity()
+                updateAppointmentDateOptions(interviewer, start)
 
             # Format appointment date and send notifications
-            appointment_date_str = appointment.appointment_date
+            appointment_date_str = selected_date
             appointment_date = datetime.fromisoformat(appointment_date_str[:-1])  # Remove the 'Z' for UTC
             formatted_date = appointment_date.strftime("%B %d, %Y at %H:%M %p")
 
-            # Notification for the freelancer
-            models.Notification.objects.create(
-                user=instance,
-                type='alert',
-                title="Interview Appointment selection successful",
-                description=f"You have selected your appointment date for {appointment.category} interview on {formatted_date}",
-            )
             notification_reciever = instance
             if user_freelancer:
                 notification_reciever =  freelancer_interview.freelancer
             else: 
                 notification_reciever = interviewer
-            # Notification for the interviewer
-            models.Notification.objects.create(
-                user=notification_reciever,
-                type='alert',
-                title=f"Interview Appointment Date for {appointment.category} changed!",
-                description=f"Your appointment date for {appointment.category} interview has been changed to {formatted_date}",
-            )
-
-            updateAppointmentDateOptions(freelancer_interview)
-
-            # Send email to interviewer
             html_content = f"<html><body><p>Appointment date for {appointment.category} interview has been selected to {formatted_date}</p></body></html>"
-            send_email(notification_reciever.email, "Appointment Date Selected", html_content)
+            notify_many([
+                {
+                    'users': instance,
+                    'title': "Interview Appointment selection successful",
+                    'description': f"You have selected your appointment date for {appointment.category} interview on {formatted_date}",
+                },
+                {
+                    'users': notification_reciever,
+                    'title': f"Interview Appointment Date for {appointment.category} changed!",
+                    'description': f"Your appointment date for {appointment.category} interview has been changed to {formatted_date}",
+                    'channels': (IN_APP, EMAIL),
+                    'email_subject': "Appointment Date Selected",
+                    'email_html': html_content,
+                },
+            ])
+
             return Response({
                 'message': 'Appointment date and interview created successfully',
                 'interview_id': str(freelancer_interview.id)
@@ -1173,6 +1142,10 @@ class SelectAppointmentDateView(APIView):
 
         except models.Appointment.DoesNotExist:
             return Response({'error': 'Appointment not found'}, status=status.HTTP_404_NOT_FOUND)
+        except interview_slots.SlotBusy as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+        except interview_slots.SlotUnavailable as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         except models.Interviewer.DoesNotExist:
             return Response({'error': 'Interviewer not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -1195,37 +1168,43 @@ class SelectAppointmentDateView(APIView):
             # Fetch appointment
             appointment = models.Appointment.objects.get(pk=UUID(appointment_id))
 
-            # Update the appointment with the new date
-            appointment.appointment_date = selected_date
-            appointment.save()
+            with transaction.atomic():
+                # Move the booking to the interviewer's new slot; an appointment without an interviewer just gets the new date
+                interview = models.FreelancerInterview.objects.select_related('interviewer').filter(appointment=appointment).first()
+                if interview and interview.interviewer:
+                    start, interview = interview_slots.book_interview(appointment, interview.interviewer, selected_date)
+                    updateAppointmentDateOptions(interview.interviewer, start)
+                else:
+                    appointment.appointment_date = selected_date
+                    appointment.save()
+                invalidate_interviewer_capacity()
 
             # Format the appointment date
-            appointment_date_str = appointment.appointment_date
+            appointment_date_str = selected_date
             appointment_date = datetime.fromisoformat(appointment_date_str[:-1])  # Remove 'Z' for UTC
             formatted_date = appointment_date.strftime("%B %d, %Y at %H:%M %p")
 
-            # Notification for the freelancer
-            models.Notification.objects.create(
-                user=instance,
-                type='alert',
-                title="Interview Appointment Date updated",
-                description=f"Your appointment date for {appointment.category} interview has been updated to {formatted_date}",
-            )
             notification_reciever = instance
             if user_freelancer:
                 notification_reciever =  appointment.freelancer
             else: 
                 notification_reciever = appointment.interviewer
-            models.Notification.objects.create(
-                    user=notification_reciever,
-                    type='alert',
-                    title=f"Interview Appointment Date for {appointment.category} updated",
-                    description=f"Your appointment date for {appointment.category} interview has been updated to {formatted_date}",
-                )
-            updateAppointmentDateOptions(appointment)
-             # Send email to interviewer
             html_content = f"<html><body><p>Appointment date for {appointment.category} interview has been selected to {formatted_date}</p></body></html>"
-            send_email(notification_reciever.email, "Appointment Date Selected", html_content)
+            notify_many([
+                {
+                    'users': instance,
+                    'title': "Interview Appointment Date updated",
+                    'description': f"Your appointment date for {appointment.category} interview has been updated to {formatted_date}",
+                },
+                {
+                    'users': notification_reciever,
+                    'title': f"Interview Appointment Date for {appointment.category} updated",
+                    'description': f"Your appointment date for {appointment.category} interview has been updated to {formatted_date}",
+                    'channels': (IN_APP, EMAIL),
+                    'email_subject': "Appointment Date Selected",
+                    'email_html': html_content,
+                },
+            ])
             return Response({
                 'message': 'Appointment date updated successfully',
                 'appointment_id': str(appointment.id)
@@ -1233,38 +1212,22 @@ class SelectAppointmentDateView(APIView):
 
         except models.Appointment.DoesNotExist:
             return Response({'error': 'Appointment not found'}, status=status.HTTP_404_NOT_FOUND)
+        except interview_slots.SlotBusy as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
+        except interview_slots.SlotUnavailable as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-def updateAppointmentDateOptions(freelancer_interview):
-    try:
-        interviews = models.FreelancerInterview.objects.filter(interviewer=freelancer_interview.interviewer)
-        for interview in interviews:
-            available_interviewers = get_available_interviewers(interview.appointment.category)
-            if available_interviewers:
-                print("trying to get available appointment dates...")
-                # Generate appointment date options for available interviewers
-                appointment_date_options = generate_appointment_date_options(available_interviewers)
-                print("available appointment dates found", appointment_date_options)
-                print("appointment id is ", interview.appointment.id)
-                
-                # Convert interviewer_id UUIDs to strings
-                appointment_date_options_serializable = [
-                    {
-                        'interviewer_id': str(option['interviewer_id']),
-                        'date': option['date']
-                    } for option in appointment_date_options
-                ]
-                print("serializable appointment_date_options:", appointment_date_options_serializable)
-    
-                # Assign the serializable data
-                appointment = models.Appointment.objects.get(pk=interview.appointment.id)
-                appointment.appointment_date_options = appointment_date_options_serializable       
-                appointment.save()
-                print("appointment is saved ")
-    except Exception as e:
-        print(f"Error in updateAppointmentDateOptions: {e}")
-        raise
+def updateAppointmentDateOptions(interviewer, start):
+    """
+    Withdraw the booked slot (and any day or week it filled) from other freelancers' date options right away;
+    appointments left short of options get a fresh set in the background.
+    """
+    short = interview_slots.withdraw_unavailable_options(interviewer, start)
+    if short:
+        appointment_ids = [str(appointment_id) for appointment_id in short]
+        transaction.on_commit(lambda: refresh_appointment_date_options.delay(appointment_ids))
 
 
 class VerifyFreelancerSkillsView(APIView):
@@ -1273,7 +1236,7 @@ class VerifyFreelancerSkillsView(APIView):
 
     def post(self, request):
         # Check if the user is an interviewer
-        if not models.Interviewer.objects.filter(id=request.user.id).exists():
+        if get_role(request) != roles.INTERVIEWER:
             raise PermissionDenied("You do not have permission to verify skills.")
 
         # Get passed skills, category, and freelancer ID from the request data
@@ -1300,17 +1263,22 @@ class VerifyFreelancerSkillsView(APIView):
             )
 
         updated_skills = []
+        # Skill names are matched as sync_freelancer_skills stores them: stripped, in any case
+        passed_names = {str(name).strip().lower() for name in passed_skills}
 
         # Loop through the freelancer's skills to update the verified field
         for skill in freelancer_skills:
             if isinstance(skill, dict):
-                if skill.get("category") == category and skill.get("skill") in passed_skills:
+                if skill.get("category") == category and str(skill.get("skill")).strip().lower() in passed_names:
                     skill["verified"] = True  # Mark the skill as verified
             updated_skills.append(skill)
 
         # Update the freelancer's skills
         freelancer.skills = json.dumps(updated_skills)  # Serialize back to JSON string
         freelancer.save()
+        models.FreelancerSkill.objects.annotate(name_lower=Lower('name')).filter(
+            freelancer=freelancer, category=category, name_lower__in=passed_names
+        ).update(verified=True)
 
         return Response(
             {"detail": "Skills have been successfully updated."},